@@ -0,0 +1,64 @@
+"""
+Measures AddressResolver.resolve on synthetic misspelled and partial addresses against a large
+set of distance table sources.
+
+Usage: python benchmarks/bench_address_resolver.py [--sources 20000] [--queries 20000]
+"""
+import argparse
+import random
+import time
+
+import common  # noqa: F401
+
+from deliveries_v2 import AddressResolver, canonicalize_address
+
+SYLLABLES = ['OAK', 'LAND', 'DAL', 'TON', 'LES', 'TER', 'CAN', 'YON', 'PRI', 'CE', 'VAL', 'LEY', 'BEN', 'NI',
+             'HER', 'IT', 'AGE', 'SU', 'GAR', 'MILL', 'CREEK', 'RIV', 'ER', 'WOOD', 'FIELD']
+SUFFIXES = ['STREET', 'AVENUE', 'BOULEVARD', 'ROAD', 'DRIVE', 'LANE', 'WAY', 'LOOP']
+DIRECTIONS = ['NORTH', 'SOUTH', 'EAST', 'WEST']
+
+
+def make_source(generator, streets):
+    return (f"{generator.randint(1, 9999)} {generator.choice(DIRECTIONS)} {generator.choice(streets)} "
+            f"{generator.choice(SUFFIXES)} #{generator.randint(1, 500)}")
+
+
+def misspell(generator, address):
+    """
+    Returns an address written differently: abbreviated, with a word misspelled or dropped.
+    """
+    tokens = canonicalize_address(address).split() if generator.random() < 0.5 else address.split()
+    position = generator.randrange(1, len(tokens))
+    if generator.random() < 0.5:
+        tokens[position] = tokens[position][:-1] + 'X'
+    else:
+        del tokens[position]
+    return ' '.join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sources', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    # Street names drawn from a vocabulary growing with the network, as in a real city
+    streets = sorted({''.join(generator.sample(SYLLABLES, 3)) for _ in range(args.sources // 10)})
+    sources = [make_source(generator, streets) for _ in range(args.sources)]
+    start = time.perf_counter()
+    resolver = AddressResolver(sources)
+    print(f"Index of {args.sources} sources built in {time.perf_counter() - start:.2f} s")
+
+    nodes = [generator.randrange(args.sources) for _ in range(args.queries)]
+    queries = [misspell(generator, sources[node]) for node in nodes]
+    start = time.perf_counter()
+    matches = [resolver.resolve(query) for query in queries]
+    seconds = time.perf_counter() - start
+    correct = sum(match is not None and sources[match[0]] == sources[node] for match, node in zip(matches, nodes))
+    print(f"{args.queries} misspelled or partial addresses: {seconds / args.queries * 1e6:.1f} us each, "
+          f"{correct / args.queries:.1%} resolved to their source")
+
+
+if __name__ == '__main__':
+    main()
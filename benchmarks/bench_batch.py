@@ -0,0 +1,54 @@
+"""
+Measures how run_batch scales with the number of worker processes, planning copies of
+package_data.csv. Speedup is relative to one worker and is bounded by the CPU count.
+
+Usage: python benchmarks/bench_batch.py [--manifests 16] [--workers 1 2 4 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from common import DISTANCE_FILE, PACKAGE_FILE
+
+from deliveries_v2 import WGUPS, run_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--manifests', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per worker count, the fastest is reported')
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.manifests} manifests")
+    with tempfile.TemporaryDirectory() as directory:
+        manifest_dir = os.path.join(directory, 'days')
+        os.makedirs(manifest_dir)
+        for day in range(args.manifests):
+            shutil.copy(PACKAGE_FILE, os.path.join(manifest_dir, f"day_{day:03d}.csv"))
+        cache_dir = os.path.join(directory, 'cache')
+        # Compute the shortest path cache up front so the first run is not charged for it
+        warm = WGUPS()
+        warm.load_distance_data(DISTANCE_FILE)
+        warm.compute_shortest_paths(cache_dir)
+
+        baseline = None
+        for workers in args.workers:
+            seconds = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                # Manifest loading prints a line per manifest
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run_batch(manifest_dir, DISTANCE_FILE, os.path.join(directory, f"plans_{workers}"), workers,
+                              cache_dir=cache_dir)
+                seconds = min(seconds, time.perf_counter() - start)
+            baseline = baseline or seconds
+            print(f"{workers} workers: {seconds:.2f} s, speedup {baseline / seconds:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Measures FleetAssigner.assign on a synthetic fleet: packages spread over random stops, some
+restricted to a truck, delayed or due early.
+
+Usage: python benchmarks/bench_fleet_assigner.py [--packages 2000] [--trucks 30] [--nodes 300]
+"""
+import argparse
+import random
+import time
+
+from common import euclidean_matrix, random_points
+
+from deliveries_v2 import DAY_START, EOD, FleetAssigner, LoadUnit, Truck
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--packages', type=int, default=2000)
+    parser.add_argument('--trucks', type=int, default=30)
+    parser.add_argument('--nodes', type=int, default=300)
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    matrix = euclidean_matrix(random_points(args.nodes))
+    trucks = [Truck(truck_id, max_capacity=-(-args.packages * 5 // (args.trucks * 4)), distance_restriction=1000,
+                    departure_time=DAY_START + 65 * (truck_id % 3)) for truck_id in range(1, args.trucks + 1)]
+    units = [LoadUnit(package_ids=[str(package_id)], nodes=[generator.randrange(1, args.nodes)],
+                      required_truck=generator.randint(1, args.trucks) if generator.random() < 0.05 else None,
+                      ready_time=DAY_START + 65 if generator.random() < 0.1 else DAY_START,
+                      deadline=generator.choice([10 * 60 + 30, EOD, EOD, EOD]))
+             for package_id in range(args.packages)]
+
+    start = time.perf_counter()
+    loads, unassigned = FleetAssigner(neighbor_graph=matrix.nearest_neighbors(16)).assign(matrix, 0, trucks, units)
+    seconds = time.perf_counter() - start
+    print(f"{args.packages} packages on {args.trucks} trucks: {seconds:.2f} s, "
+          f"{sum(map(len, loads.values()))} loaded, {len(unassigned)} unassigned")
+
+
+if __name__ == '__main__':
+    main()
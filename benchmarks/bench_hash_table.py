@@ -0,0 +1,33 @@
+"""
+Measures PackageHashTable lookups as the table grows, to check that get stays O(1).
+
+Usage: python benchmarks/bench_hash_table.py [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deliveries_v2 import PackageHashTable  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        table = PackageHashTable()
+        for key in range(size):
+            table.insert(str(key), key)
+        keys = [str(random.randrange(size)) for _ in range(args.lookups)]
+        seconds = min(timeit.repeat(lambda: [table.get(key) for key in keys], number=1, repeat=3))
+        print(f"{size:>9} entries, {len(table.buckets):>9} buckets: get {seconds / len(keys) * 1e6:.2f} us")
+
+
+if __name__ == '__main__':
+    main()
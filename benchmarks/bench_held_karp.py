@@ -0,0 +1,59 @@
+"""
+Measures the exact Held-Karp route solver: its run time with and without NumPy, the optimality gap of
+the heuristic on random loads from the distance table, and the gap of the routes the trucks drive.
+
+Usage: python benchmarks/bench_held_karp.py [--stops 12] [--loads 300]
+"""
+import argparse
+import random
+import time
+
+from common import prepared_wgups
+
+import deliveries_v2
+from deliveries_v2 import RouteOptimizer
+
+
+def time_held_karp(optimizer, matrix, hub_node, stops):
+    start = time.perf_counter()
+    optimizer.optimize(matrix, hub_node, stops, hub_node)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stops', type=int, default=12)
+    parser.add_argument('--loads', type=int, default=300)
+    args = parser.parse_args()
+
+    wgups = prepared_wgups()
+    matrix = wgups.shortest_paths
+    hub_node = wgups.distance_matrix.node(wgups.hub_address)
+    optimizer = RouteOptimizer(exact_stop_limit=args.stops)
+    nodes = [node for node in range(matrix.size) if node != hub_node]
+    generator = random.Random(0)
+
+    stops = generator.sample(nodes, args.stops)
+    print(f"Held-Karp on {args.stops} stops: {time_held_karp(optimizer, matrix, hub_node, stops) * 1000:.0f} ms with NumPy")
+    numpy = deliveries_v2.np
+    deliveries_v2.np = None
+    try:
+        print(f"Held-Karp on {args.stops} stops: {time_held_karp(optimizer, matrix, hub_node, stops):.2f} s without NumPy")
+    finally:
+        deliveries_v2.np = numpy
+
+    gaps = []
+    for _ in range(args.loads):
+        heuristic, exact = optimizer.optimality_gap(matrix, hub_node, generator.sample(nodes, args.stops), hub_node)
+        gaps.append((heuristic - exact) / exact * 100)
+    print(f"Heuristic on {args.loads} random {args.stops}-stop loads: mean gap {sum(gaps) / len(gaps):.2f}%, "
+          f"max {max(gaps):.1f}%, optimal on {sum(gap < 1e-9 for gap in gaps)}")
+
+    wgups.load_trucks(time_windows=True)
+    for truck_id, stop_count, miles, exact in wgups.route_optimality_gaps():
+        print(f"Truck {truck_id}: {stop_count} stops, route {miles:.1f} miles, shortest route {exact:.1f} miles "
+              f"({(miles - exact) / exact * 100:.1f}% gap)")
+
+
+if __name__ == '__main__':
+    main()
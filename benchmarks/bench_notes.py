@@ -0,0 +1,77 @@
+"""
+Compares parsing special notes with parse_note against the three separate extract_* scans
+update_packages_with_notes made before, which are reproduced here as the baseline.
+
+Usage: python benchmarks/bench_notes.py [--notes 1000000] [--distinct 1000]
+"""
+import argparse
+import random
+import re
+import time
+
+import common  # noqa: F401
+
+from deliveries_v2 import parse_note
+
+
+def extract_delayed_time(text):
+    if 'Delayed on flight' in text:
+        match = re.compile(r'(\d{1,2}:\d{2} [APMapm]{2})').search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_truck_id(text):
+    if 'Can only be on truck' in text:
+        match = re.search(r'\d+', text)
+        if match:
+            return int(match.group())
+    return None
+
+
+def extract_package_ids(text):
+    if 'Must be delivered with' in text:
+        match = re.search(r'\d+(,\s*\d+)*', text)
+        if match:
+            return [int(package_id) for package_id in match.group().split(',')]
+    return None
+
+
+def make_notes(count, distinct, seed=0):
+    """
+    Returns count notes drawn from distinct note strings of every kind.
+    """
+    generator = random.Random(seed)
+    templates = [
+        lambda: f"Delayed on flight---will not arrive to depot until {generator.randint(8, 11)}:"
+                f"{generator.randrange(60):02d} am",
+        lambda: f"Can only be on truck {generator.randint(1, 30)}",
+        lambda: "Must be delivered with " + ", ".join(str(generator.randint(1, 10 ** 6)) for _ in range(2)),
+        lambda: "Wrong address listed",
+    ]
+    pool = [templates[index % len(templates)]() for index in range(distinct)]
+    return [generator.choice(pool) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--notes', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=1000)
+    args = parser.parse_args()
+    notes = make_notes(args.notes, args.distinct)
+
+    start = time.perf_counter()
+    for note in notes:
+        extract_delayed_time(note), extract_truck_id(note), extract_package_ids(note)
+    print(f"extract_* scans: {time.perf_counter() - start:.2f} s")
+
+    parse_note.cache_clear()
+    start = time.perf_counter()
+    for note in notes:
+        parse_note(note)
+    print(f"parse_note:      {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Measures the memory used per Package with tracemalloc, building packages from the rows of
+package_data.csv repeated under fresh ids.
+
+Usage: python benchmarks/bench_package_memory.py [--count 1000000]
+"""
+import argparse
+import tracemalloc
+
+from common import PACKAGE_FILE
+
+from deliveries_v2 import WGUPS, Package, format_deadline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    # Rows as the loader sees them, with text deadlines and weights
+    rows = [(package.address, package.city, package.state, package.zip_code, format_deadline(package.deadline),
+             str(package.weight), package.notes)
+            for chunk in WGUPS().iter_package_chunks(PACKAGE_FILE) for package in chunk]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    packages = [Package(str(index), *rows[index % len(rows)]) for index in range(args.count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{len(packages)} packages: {used / len(packages):.0f} bytes per package (ids and the list included)")
+
+
+if __name__ == '__main__':
+    main()
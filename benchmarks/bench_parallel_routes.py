@@ -0,0 +1,45 @@
+"""
+Compares optimizing a fleet's routes one after another with optimize_routes_parallel at several
+worker counts. Speedup is relative to the sequential run and is bounded by the CPU count.
+
+Usage: python benchmarks/bench_parallel_routes.py [--trucks 50] [--stops 60] [--nodes 600] [--workers 1 2 4]
+"""
+import argparse
+import os
+import random
+import time
+
+from common import euclidean_matrix, random_points
+
+from deliveries_v2 import RouteOptimizer, optimize_routes_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trucks', type=int, default=50)
+    parser.add_argument('--stops', type=int, default=60)
+    parser.add_argument('--nodes', type=int, default=600)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    matrix = euclidean_matrix(random_points(args.nodes))
+    optimizer = RouteOptimizer(neighbor_graph=matrix.nearest_neighbors(16))
+    tasks = [(0, generator.sample(range(1, args.nodes), args.stops), 0) for _ in range(args.trucks)]
+    print(f"{os.cpu_count()} CPUs, {args.trucks} trucks of {args.stops} stops on {args.nodes} nodes")
+
+    start = time.perf_counter()
+    expected = [optimizer.optimize(matrix, *task) for task in tasks]
+    sequential = time.perf_counter() - start
+    print(f"sequential: {sequential:.2f} s")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        routes = optimize_routes_parallel(matrix, optimizer, tasks, workers)
+        seconds = time.perf_counter() - start
+        print(f"{workers} workers: {seconds:.2f} s, speedup {sequential / seconds:.2f}, "
+              f"{'identical' if routes == expected else 'DIFFERENT'} routes")
+
+
+if __name__ == '__main__':
+    main()
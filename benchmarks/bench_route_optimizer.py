@@ -0,0 +1,44 @@
+"""
+Measures the RouteOptimizer heuristic: route lengths on package_data.csv and the time to route a
+large random instance.
+
+Usage: python benchmarks/bench_route_optimizer.py [--stops 200]
+"""
+import argparse
+import time
+
+from common import euclidean_matrix, prepared_wgups, random_points, route_length
+
+from deliveries_v2 import RouteOptimizer, Truck
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stops', type=int, default=200)
+    args = parser.parse_args()
+
+    wgups = prepared_wgups()
+    # Route with the heuristic alone, without time windows, as the engine did when it was introduced
+    wgups.route_optimizer = RouteOptimizer(exact_stop_limit=0)
+    wgups.build_neighbor_graph()
+    hub_node = wgups.distance_matrix.node(wgups.hub_address)
+    matrix = wgups.shortest_paths
+
+    route = wgups.optimize_delivery_route_for_all_packages()
+    nodes = list(wgups.group_stops(route))
+    print(f"Single route through all {len(route)} packages: {route_length(matrix, hub_node, nodes, hub_node):.1f} miles")
+
+    wgups.load_trucks()
+    print(f"Three truck loads: {sum(wgups.truck_mileage(truck) for truck in wgups.trucks):.1f} miles")
+
+    points = random_points(args.stops + 1)
+    matrix = euclidean_matrix(points)
+    optimizer = RouteOptimizer(exact_stop_limit=0)
+    start = time.perf_counter()
+    route = optimizer.optimize(matrix, 0, list(range(1, args.stops + 1)), 0)
+    seconds = time.perf_counter() - start
+    print(f"{args.stops} random stops: {route_length(matrix, 0, route, 0):.1f} miles in {seconds * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures main.StatusArrays.snapshot: the status of every package at many times in one call.
+
+Usage: python benchmarks/bench_status_snapshot.py [--packages 1000000] [--times 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import common  # noqa: F401
+
+import main as prototype
+
+
+def make_arrays(count, seed=0):
+    """
+    Returns StatusArrays of count packages with random ready, departure and delivery times over the day.
+    """
+    generator = np.random.default_rng(seed)
+    arrays = prototype.StatusArrays(prototype.StatusTimeline())
+    arrays.package_ids = [str(package_id) for package_id in range(1, count + 1)]
+    arrays.ready = np.where(generator.random(count) < 0.1, 9 * 60 + 5, -np.inf).astype(np.float32)
+    arrays.departure = generator.uniform(8 * 60, 11 * 60, count).astype(np.float32)
+    arrays.delivery = (arrays.departure + generator.uniform(5, 300, count)).astype(np.float32)
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--packages', type=int, default=1000000)
+    parser.add_argument('--times', type=int, default=100)
+    args = parser.parse_args()
+
+    arrays = make_arrays(args.packages)
+    times = np.linspace(8 * 60, 17 * 60, args.times)
+    start = time.perf_counter()
+    codes = arrays.snapshot(times)
+    seconds = time.perf_counter() - start
+    print(f"{args.packages} packages at {args.times} times: {seconds:.2f} s, result {codes.shape} {codes.dtype}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the benchmark scripts. Importing this module puts the repository root on sys.path.
+"""
+import math
+import os
+import random
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from deliveries_v2 import WGUPS, DistanceMatrix  # noqa: E402
+
+PACKAGE_FILE = os.path.join(REPO_DIR, 'package_data.csv')
+DISTANCE_FILE = os.path.join(REPO_DIR, 'distance_table.csv')
+
+
+def prepared_wgups(package_file=PACKAGE_FILE, distance_file=DISTANCE_FILE):
+    """
+    Returns a WGUPS with packages and distances loaded, addresses confirmed, notes applied and
+    shortest paths computed, the state main() routes from.
+    """
+    wgups = WGUPS()
+    wgups.load_packages(package_file)
+    wgups.load_distance_data(distance_file)
+    wgups.compute_shortest_paths(cache_dir=None)
+    wgups.confirm_matching_addresses()
+    wgups.update_packages_with_notes()
+    return wgups
+
+
+def random_points(size, seed=0):
+    """
+    Returns size random points in a 20 by 20 mile square.
+    """
+    generator = random.Random(seed)
+    return [(generator.uniform(0, 20), generator.uniform(0, 20)) for _ in range(size)]
+
+
+def euclidean_matrix(points):
+    """
+    Returns a DistanceMatrix of the straight-line distances between points, one node per point.
+    """
+    matrix = DistanceMatrix([f"NODE {node}" for node in range(len(points))])
+    for source, (x1, y1) in enumerate(points):
+        for destination, (x2, y2) in enumerate(points):
+            matrix.set(source, destination, math.hypot(x1 - x2, y1 - y2))
+    return matrix
+
+
+def route_length(matrix, start_node, route, end_node):
+    """
+    Returns the length of a route of nodes from start_node to end_node.
+    """
+    nodes = [start_node, *route, end_node]
+    return sum(matrix.get(source, destination) for source, destination in zip(nodes, nodes[1:]))
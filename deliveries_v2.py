@@ -1,34 +1,2069 @@
 import csv, re
-from importlib.metadata import PackageNotFoundError
+import argparse
+import glob
+import hashlib
 import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
 from datetime import datetime, timedelta
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, pure Python fallbacks are used without it
+    np = None
+
+SHORTEST_PATHS_MAGIC = b'WGUPSAP1'  # Header identifying a cached all-pairs shortest path file
+SNAPSHOT_MAGIC = b'WGUPSSNP'  # Header identifying a prepared state snapshot file
+MAPPED_MATRIX_MAGIC = b'WGUPSDM1'  # Header identifying a memory-mapped distance matrix file
+SNAPSHOT_VERSION = 2  # Incremented whenever the layout of a snapshot section changes
+SNAPSHOT_ALIGNMENT = 64  # Sections start on this boundary so they can be viewed as typed arrays in place
+SNAPSHOT_TEXT_FIELDS = ('package_id', 'address', 'city', 'state', 'zip_code', 'notes')
+SNAPSHOT_SECTIONS = ('digest', 'addresses', 'distances', 'closure', 'predecessors', 'columns', 'groups',
+                     'text_offsets', 'text', 'truck_rows', 'truck_sizes')
+
+EOD = 24 * 60  # Deadline in minutes since midnight used for packages due by end of day
+DAY_START = 8 * 60  # Minutes since midnight when the first trucks leave the hub
+ADDRESS_CORRECTION_TIME = 10 * 60 + 20  # Minutes since midnight when wrong addresses are corrected
+# Address, city, state and zip code each package listed with a wrong address is corrected to at ADDRESS_CORRECTION_TIME
+ADDRESS_CORRECTIONS = {'9': ('410 S STATE ST', 'SALT LAKE CITY', 'UT', '84111')}
+SPEED_MPH = 18  # Average truck speed used to turn route distances into travel times
+
+
+@lru_cache(maxsize=None)
+def parse_deadline(deadline):
+    """
+    Converts a deadline such as '10:30 AM' or 'EOD' to minutes since midnight.
+
+    Args:
+        deadline (str): The deadline text from the package file.
+
+    Returns:
+        int: The deadline in minutes since midnight, EOD for end of day.
+    """
+    text = deadline.strip().upper()
+    if text in ('', 'EOD'):
+        return EOD
+    parsed = datetime.strptime(text, '%I:%M %p')
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_deadline(minutes):
+    """
+    Converts a deadline in minutes since midnight back to text such as '10:30 AM' or 'EOD'.
+    """
+    if minutes == EOD:
+        return 'EOD'
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+# Record of the constraints found in a package's special notes
+NoteConstraints = namedtuple('NoteConstraints', ['delay_time', 'required_truck', 'delivered_with', 'wrong_address'])
+
+NO_CONSTRAINTS = NoteConstraints(None, None, None, False)
+
+# Group of packages that must be loaded onto the same truck together
+LoadUnit = namedtuple('LoadUnit', ['package_ids', 'nodes', 'required_truck', 'ready_time', 'deadline'])
+
+# Single pattern matching every kind of special note, so a note is classified in one pass
+NOTE_PATTERN = re.compile(
+    r'(?P<delayed>Delayed on flight)\D*(?P<delay_time>\d{1,2}:\d{2} [APMapm]{2})?'
+    r'|(?P<truck>Can only be on truck)\D*(?P<truck_id>\d+)?'
+    r'|(?P<with>Must be delivered with)\D*(?P<package_ids>\d+(?:,\s*\d+)*)?'
+    r'|(?P<wrong>Wrong address listed)'
+)
+
+
+@lru_cache(maxsize=65536)
+def parse_note(note):
+    """
+    Parses the constraints out of a package's special note. Results are memoized, so
+    identical notes are only parsed once.
+
+    Args:
+        note (str): The special note text.
+
+    Returns:
+        NoteConstraints: The delay time text, required truck id, tuple of package ids the package
+            must be delivered with, and whether the address is listed as wrong.
+    """
+    if not note:
+        return NO_CONSTRAINTS
+
+    delay_time = required_truck = delivered_with = None
+    wrong_address = False
+    for match in NOTE_PATTERN.finditer(note):
+        if match.group('delayed'):
+            delay_time = match.group('delay_time')
+        elif match.group('truck'):
+            if match.group('truck_id'):
+                required_truck = int(match.group('truck_id'))
+        elif match.group('with'):
+            if match.group('package_ids'):
+                delivered_with = tuple(int(package_id) for package_id in match.group('package_ids').split(','))
+        else:
+            wrong_address = True
+
+    return NoteConstraints(delay_time, required_truck, delivered_with, wrong_address)
+
 
 class Package:
+    __slots__ = ('package_id', 'address', 'city', 'state', 'zip_code', 'deadline', 'weight', 'notes',
+                 'location', 'no_load_before', 'required_truck', 'package_accompaniment')
+
     def __init__(self, package_id, address, city, state, zip_code, deadline, weight, notes=None):
-        self.hub_address = "4001 SOUTH 700 EAST"  # Hub address
         # Initialize Package attributes with provided values
+        # Repeated strings are interned so packages at the same address share one copy
         self.package_id = package_id
-        self.address = address.upper()
-        self.city = city.upper()
-        self.state = state.upper()
-        self.zip_code = zip_code
-        self.deadline = deadline.upper()
-        self.weight = weight
+        self.address = sys.intern(address.upper())
+        self.city = sys.intern(city.upper())
+        self.state = sys.intern(state.upper())
+        self.zip_code = sys.intern(zip_code)
+        self.deadline = parse_deadline(deadline)  # Minutes since midnight
+        self.weight = float(weight)
         self.notes = notes
-        self.location = self.hub_address
+        self.location = None  # None while the package is at the hub
         self.no_load_before = None  # Initialize load time as None
         self.required_truck = None  # Initialize required truck as None
         self.package_accompaniment = None  # Initialize required package accompaniments
 
 
 class Truck:
-    def __init__(self, truck_id, max_capacity=16, distance_restriction=140):
-        self.hub_address = "4001 SOUTH 700 EAST"  # Hub address
+    __slots__ = ('truck_id', 'max_capacity', 'distance_restriction', 'departure_time', 'packages', 'location',
+                 'route_length', 'last_node', 'stops', 'legs')
+
+    def __init__(self, truck_id, max_capacity=16, distance_restriction=140, departure_time=DAY_START):
         # Initialize Truck attributes with provided values
         self.truck_id = truck_id
         self.max_capacity = max_capacity
+        self.distance_restriction = distance_restriction
+        self.departure_time = departure_time  # Minutes since midnight when the truck leaves the hub
         self.packages = []  # Set to store package ids for packages loaded onto the truck
-        self.location = self.hub_address
+        self.location = None  # None while the truck is at the hub
+        self.route_length = 0.0  # Running length of the route from the hub through the loaded packages
+        self.last_node = None  # Node index of the last stop, None while the route is empty
+        self.stops = []  # Node index of each loaded package, parallel to packages
+        self.legs = []  # Distance of the leg leading to each loaded package, parallel to packages
+
+    def append_package(self, package_id, node, leg_distance):
+        """
+        Appends a package to the end of the route and updates the running route length.
+
+        Args:
+            package_id (str): The package ID to append.
+            node (int): The distance matrix node index of the package address.
+            leg_distance (float): The distance from the previous stop to the package address.
+        """
+        self.packages.append(package_id)
+        self.stops.append(node)
+        self.legs.append(leg_distance)
+        self.route_length += leg_distance
+        self.last_node = node
+
+    def remove_last_package(self):
+        """
+        Removes the last package from the route and updates the running route length.
+
+        Returns:
+            str: The package ID that was removed.
+        """
+        package_id = self.packages.pop()
+        self.stops.pop()
+        self.route_length -= self.legs.pop()
+        self.last_node = self.stops[-1] if self.stops else None
+        return package_id
+
+    def clear_route(self):
+        """
+        Removes all packages from the route.
+        """
+        self.packages = []
+        self.stops = []
+        self.legs = []
+        self.route_length = 0.0
+        self.last_node = None
+
+
+def normalize_address(address):
+    """
+    Returns the normalized form of an address used for address lookups.
+    """
+    return " ".join(address.upper().split())
+
+
+# Canonical abbreviations of street suffixes and directions, applied to whole address tokens
+ADDRESS_ABBREVIATIONS = {
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'AVENUE': 'AVE', 'AV': 'AVE', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR', 'COURT': 'CT', 'DRIVE': 'DR',
+    'HIGHWAY': 'HWY', 'LANE': 'LN', 'PARKWAY': 'PKWY', 'PLACE': 'PL', 'ROAD': 'RD', 'STATION': 'STA',
+    'STREET': 'ST', 'SUITE': 'STE', 'TERRACE': 'TER',
+}
+ADDRESS_PUNCTUATION = re.compile(r"[.,']")
+
+
+@lru_cache(maxsize=65536)
+def canonicalize_address(address):
+    """
+    Returns the canonical form of an address used to match addresses written differently,
+    for example '5100 South 2700 West' and '5100 S 2700 W'.
+    """
+    tokens = ADDRESS_PUNCTUATION.sub(' ', address.upper()).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def fnv1a_hash(key):
+    """
+    Returns the 64-bit FNV-1a hash of a key.
+    Unlike the built-in hash(), the result is the same in every process.
+    """
+    value = 0xcbf29ce484222325
+    for byte in str(key).encode():
+        value = ((value ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return value
+
+
+class PackageHashTable:
+    """
+    PackageHashTable stores packages keyed by package_id using separate chaining.
+    Keys are hashed with FNV-1a so the bucket layout is deterministic, and the number of
+    buckets doubles whenever the load factor is exceeded so lookups stay O(1).
+    """
+
+    def __init__(self, capacity=64, load_factor=0.75):
+        """
+        Initializes an empty hash table.
+
+        Args:
+            capacity (int): The initial number of buckets. Default is 64.
+            load_factor (float): The maximum ratio of entries to buckets before resizing. Default is 0.75.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        if load_factor <= 0:
+            raise ValueError("Load factor must be greater than 0")
+        self.load_factor = load_factor
+        self.buckets = [[] for _ in range(capacity)]  # Each bucket is a list of [key, package] entries
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        return self.find_entry(key) is not None
+
+    def __iter__(self):
+        """
+        Iterates over the packages in the hash table.
+        """
+        for bucket in self.buckets:
+            for entry in bucket:
+                yield entry[1]
+
+    def items(self):
+        """
+        Iterates over the (package_id, package) pairs in the hash table.
+        """
+        for bucket in self.buckets:
+            for entry in bucket:
+                yield entry[0], entry[1]
+
+    def keys(self):
+        """
+        Iterates over the package ids in the hash table.
+        """
+        for bucket in self.buckets:
+            for entry in bucket:
+                yield entry[0]
+
+    def bucket_for(self, key):
+        """
+        Returns the bucket a key hashes to.
+        """
+        return self.buckets[fnv1a_hash(key) % len(self.buckets)]
+
+    def find_entry(self, key):
+        """
+        Returns the [key, package] entry for a key, or None if the key is not present.
+        """
+        for entry in self.bucket_for(key):
+            if entry[0] == key:
+                return entry
+        return None
+
+    def insert(self, key, package):
+        """
+        Inserts a package, replacing any package already stored under the same key.
+
+        Args:
+            key (str): The package_id to store the package under.
+            package (Package): The package to store.
+        """
+        entry = self.find_entry(key)
+        if entry is not None:
+            entry[1] = package
+            return
+
+        self.bucket_for(key).append([key, package])
+        self.count += 1
+        if self.count > self.load_factor * len(self.buckets):
+            self.resize(len(self.buckets) * 2)
+
+    def get(self, key, default=None):
+        """
+        Returns the package stored under a key, or default if the key is not present.
+        """
+        entry = self.find_entry(key)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def update(self, key, package):
+        """
+        Replaces the package stored under an existing key.
+
+        Raises:
+            KeyError: If the key is not present.
+        """
+        entry = self.find_entry(key)
+        if entry is None:
+            raise KeyError(key)
+        entry[1] = package
+
+    def delete(self, key):
+        """
+        Removes and returns the package stored under a key.
+
+        Raises:
+            KeyError: If the key is not present.
+        """
+        bucket = self.bucket_for(key)
+        for position, entry in enumerate(bucket):
+            if entry[0] == key:
+                # Swap the last entry into the removed slot so removal is O(1)
+                bucket[position] = bucket[-1]
+                bucket.pop()
+                self.count -= 1
+                return entry[1]
+        raise KeyError(key)
+
+    def resize(self, capacity):
+        """
+        Rehashes every entry into the given number of buckets.
+        """
+        old_buckets = self.buckets
+        self.buckets = [[] for _ in range(capacity)]
+        for bucket in old_buckets:
+            for entry in bucket:
+                self.bucket_for(entry[0]).append(entry)
+
+    def reserve(self, count):
+        """
+        Grows the table ahead of a bulk insert so it holds count entries without further resizing.
+        """
+        capacity = len(self.buckets)
+        while count > self.load_factor * capacity:
+            capacity *= 2
+        if capacity != len(self.buckets):
+            self.resize(capacity)
+
+
+class DisjointSet:
+    """
+    DisjointSet merges package ids into co-delivery groups in near-linear time using union by
+    size and path halving. The group id of a package is the id of its group's root package.
+    """
+
+    def __init__(self):
+        self.parent = {}  # Dictionary mapping package_id to its parent package_id
+        self.size = {}  # Dictionary mapping a root package_id to the size of its group
+
+    def __contains__(self, package_id):
+        return package_id in self.parent
+
+    def add(self, package_id):
+        """
+        Adds a package as its own group if it is not already present.
+        """
+        if package_id not in self.parent:
+            self.parent[package_id] = package_id
+            self.size[package_id] = 1
+
+    def find(self, package_id):
+        """
+        Returns the group id of a package, adding the package if it is not present.
+        """
+        self.add(package_id)
+        parent = self.parent
+        while parent[package_id] != package_id:
+            # Point every other node on the path at its grandparent
+            parent[package_id] = parent[parent[package_id]]
+            package_id = parent[package_id]
+        return package_id
+
+    def union(self, first_id, second_id):
+        """
+        Merges the groups of two packages and returns the group id of the merged group.
+        """
+        first_root = self.find(first_id)
+        second_root = self.find(second_id)
+        if first_root == second_root:
+            return first_root
+        if self.size[first_root] < self.size[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parent[second_root] = first_root
+        self.size[first_root] += self.size.pop(second_root)
+        return first_root
+
+    def group_size(self, package_id):
+        """
+        Returns the number of packages in a package's group.
+        """
+        return self.size[self.find(package_id)]
+
+
+# A package address that does not appear verbatim in the distance table, and the table address it resolved to
+AddressMismatch = namedtuple('AddressMismatch', ['address', 'source', 'score', 'package_ids'])
+# Result of WGUPS.confirm_matching_addresses
+AddressReport = namedtuple('AddressReport', ['unconnected_sources', 'corrected', 'unmatched'])
+
+
+class AddressResolver:
+    """
+    AddressResolver resolves free-form addresses to distance table nodes. Exact matches of the
+    canonical address are found with one dictionary lookup, other addresses are scored against
+    only the sources that share a token with them through an inverted index of address tokens.
+    """
+
+    def __init__(self, addresses, min_common_tokens=3):
+        """
+        Initializes the resolver for the given distance table addresses.
+
+        Args:
+            addresses (list): The addresses in node index order.
+            min_common_tokens (int): The number of tokens a partial match must share with a source. Default is 3.
+        """
+        self.min_common_tokens = min_common_tokens
+        self.canonical = {}  # Dictionary mapping canonical address to node index
+        self.node_tokens = []  # Distinct tokens of each node's canonical address
+        self.postings = {}  # Dictionary mapping token to the node indices whose address contains it
+        for node, address in enumerate(addresses):
+            canonical = canonicalize_address(address)
+            self.canonical.setdefault(canonical, node)
+            tokens = frozenset(canonical.split())
+            self.node_tokens.append(tokens)
+            for token in tokens:
+                self.postings.setdefault(token, []).append(node)
+
+    def resolve(self, address):
+        """
+        Finds the distance table node that best matches an address.
+
+        Args:
+            address (str): The address to resolve.
+
+        Returns:
+            tuple: The node index and a match score between 0 and 1, where 1 is a canonical match,
+                or None if no source shares enough tokens with the address.
+        """
+        canonical = canonicalize_address(address)
+        node = self.canonical.get(canonical)
+        if node is not None:
+            return node, 1.0
+
+        tokens = set(canonical.split())
+        if len(tokens) < self.min_common_tokens:
+            return None
+
+        # A source sharing min_common_tokens tokens must contain one of the rarest
+        # len(tokens) - min_common_tokens + 1 tokens, so only their postings are scanned
+        rarest = sorted(tokens, key=lambda token: len(self.postings.get(token, ())))
+        candidates = set()
+        for token in rarest[:len(tokens) - self.min_common_tokens + 1]:
+            candidates.update(self.postings.get(token, ()))
+
+        best = None
+        for node in candidates:
+            count = len(tokens & self.node_tokens[node])
+            if count < self.min_common_tokens:
+                continue
+            score = count / max(len(tokens), len(self.node_tokens[node]))
+            if best is None or (score, -node) > (best[1], -best[0]):
+                best = (node, score)
+        return best
+
+
+class DistanceMatrix:
+    """
+    DistanceMatrix stores the distances between addresses as a dense square matrix.
+    Each address is interned to an integer node index and the distances are kept in a flat
+    array of doubles, so a lookup between two nodes is a single index operation.
+    """
+
+    def __init__(self, addresses, distances=None):
+        """
+        Initializes the distance matrix for the given addresses.
+
+        Args:
+            addresses (iterable): The addresses to intern as nodes, in node index order.
+            distances (array): Optional existing flat buffer of size * size distances to use, for
+                example a view of shared or mapped memory. By default every distance is unknown.
+        """
+        self.addresses = []  # List mapping node index to address
+        self.node_index = {}  # Dictionary mapping address to node index
+        for address in addresses:
+            if address not in self.node_index:
+                self.node_index[address] = len(self.addresses)
+                self.addresses.append(address)
+
+        self.size = len(self.addresses)
+        if distances is not None:
+            self.distances = distances
+            return
+        # Unknown distances are infinite, the distance from a node to itself is zero
+        self.distances = array('d', [float('inf')]) * (self.size * self.size)
+        for node in range(self.size):
+            self.distances[node * self.size + node] = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, address):
+        return address in self.node_index
+
+    def node(self, address):
+        """
+        Returns the node index for an address.
+
+        Raises:
+            KeyError: If the address is not in the matrix.
+        """
+        return self.node_index[address]
+
+    def get(self, source_node, destination_node):
+        """
+        Returns the distance between two node indices.
+        """
+        return self.distances[source_node * self.size + destination_node]
+
+    def set(self, source_node, destination_node, distance):
+        """
+        Sets the distance between two node indices.
+        """
+        self.distances[source_node * self.size + destination_node] = distance
+
+    def distance(self, source, destination):
+        """
+        Returns the distance between two addresses.
+        """
+        return self.distances[self.node_index[source] * self.size + self.node_index[destination]]
+
+    def row(self, node):
+        """
+        Returns the distances from a node to every node, indexed by node.
+        """
+        start = node * self.size
+        return self.distances[start:start + self.size]
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the distance buffer.
+        """
+        return self.distances.itemsize * len(self.distances)
+
+    def to_dense(self):
+        """
+        Returns the matrix as a DistanceMatrix backed by a flat array of doubles.
+        """
+        return self
+
+    def block(self, start, stop):
+        """
+        Returns the rows of nodes start to stop - 1 as a 2-D NumPy array.
+        """
+        return np.frombuffer(self.distances, dtype=np.float64, count=(stop - start) * self.size,
+                             offset=start * self.size * 8).reshape(stop - start, self.size)
+
+    def nearest_neighbors(self, k, block_size=1024):
+        """
+        Returns the k nearest other nodes of every node, closest first with ties broken by node index.
+        With NumPy the rows are processed in blocks with a vectorized argpartition, so memory use
+        stays bounded for large matrices.
+
+        Args:
+            k (int): The number of neighbors per node, at most size - 1.
+            block_size (int): The number of rows processed at once. Default is 1024.
+
+        Returns:
+            list: The neighbor node indices of each node, an int32 array of shape (size, k) with NumPy.
+        """
+        k = max(min(k, self.size - 1), 0)
+        if np is None:
+            return [sorted((other for other in range(self.size) if other != node),
+                           key=lambda other: (self.get(node, other), other))[:k] for node in range(self.size)]
+
+        neighbors = np.empty((self.size, k), dtype=np.int32)
+        if k == 0:
+            return neighbors
+        for start in range(0, self.size, block_size):
+            stop = min(start + block_size, self.size)
+            block = np.array(self.block(start, stop), dtype=np.float64)
+            rows = np.arange(stop - start)
+            block[rows, rows + start] = np.inf  # A node is not its own neighbor
+            # Keep every node closer than the k-th distance, then the lowest indexed nodes at that distance
+            kth = np.partition(block, k - 1, axis=1)[:, k - 1:k]
+            closer = block < kth
+            tied = block == kth
+            # A row with fewer than k reachable nodes ties at infinity, which must not include the node itself
+            tied[rows, rows + start] = False
+            selected = closer | (tied & (np.cumsum(tied, axis=1) <= k - closer.sum(axis=1, keepdims=True)))
+            candidates = np.nonzero(selected)[1].reshape(stop - start, k)
+            order = np.lexsort((candidates, np.take_along_axis(block, candidates, axis=1)), axis=1)
+            neighbors[start:stop] = np.take_along_axis(candidates, order, axis=1)
+        return neighbors
+
+    def shortest_paths(self):
+        """
+        Computes the all-pairs shortest paths (metric closure) of the matrix with Floyd-Warshall.
+        The computation is vectorized with NumPy when it is installed.
+
+        Returns:
+            tuple: A DistanceMatrix of shortest path distances and an array('i') of predecessors, where
+                entry source * size + destination is the node before destination on the path, or -1.
+        """
+        size = self.size
+        closure = DistanceMatrix(self.addresses)
+
+        if np is not None:
+            distances = np.frombuffer(self.distances, dtype=np.float64).reshape(size, size).copy()
+            nodes = np.arange(size, dtype=np.int32)
+            predecessors = np.where(np.isfinite(distances), nodes[:, None], -1).astype(np.int32)
+            np.fill_diagonal(predecessors, -1)
+            for k in range(size):
+                via = distances[:, k, None] + distances[None, k, :]
+                shorter = via < distances
+                distances[shorter] = via[shorter]
+                predecessors[shorter] = np.broadcast_to(predecessors[k], (size, size))[shorter]
+            closure.distances = array('d', distances.tobytes())
+            return closure, array('i', predecessors.tobytes())
+
+        distances = [list(self.row(node)) for node in range(size)]
+        predecessors = [[source if distances[source][destination] < float('inf') and source != destination else -1
+                         for destination in range(size)] for source in range(size)]
+        for k in range(size):
+            row_k = distances[k]
+            predecessors_k = predecessors[k]
+            for source in range(size):
+                row = distances[source]
+                to_k = row[k]
+                if to_k == float('inf'):
+                    continue
+                for destination in range(size):
+                    via = to_k + row_k[destination]
+                    if via < row[destination]:
+                        row[destination] = via
+                        predecessors[source][destination] = predecessors_k[destination]
+        closure.distances = array('d', [distance for row in distances for distance in row])
+        return closure, array('i', [node for row in predecessors for node in row])
+
+
+class MappedDistanceMatrix(DistanceMatrix):
+    """
+    MappedDistanceMatrix keeps the distances of a large network in a float32 np.memmap file
+    instead of memory. Pages are read on demand and every process mapping the same file shares
+    one physical copy. A packed matrix stores only the upper triangle, halving the file for the
+    symmetric distances load_distance_data writes, so set stores a distance for both directions.
+    Create one with create_mapped_distance_matrix and open it again with open_mapped_distance_matrix.
+    """
+
+    def __init__(self, addresses, distances, packed, file_path, digest=None):
+        """
+        Initializes the matrix over an existing memmap.
+
+        Args:
+            addresses (list): The addresses in node index order.
+            distances (np.memmap): The float32 distances, size * size entries or the packed upper triangle.
+            packed (bool): Whether distances holds only the upper triangle.
+            file_path (str): The path of the mapped file.
+            digest (str): The SHA-256 hex digest of the distance CSV stored in the file header, if any.
+        """
+        super().__init__(addresses, distances)
+        self.packed = packed
+        self.file_path = file_path
+        self.digest = digest
+
+    def __reduce__(self):
+        # Pickle as the file path, so worker processes map the file instead of receiving a copy
+        return open_mapped_distance_matrix, (self.file_path,)
+
+    def offset(self, source_node, destination_node):
+        """
+        Returns the position of a distance in the flat buffer.
+        """
+        if not self.packed:
+            return source_node * self.size + destination_node
+        if source_node > destination_node:
+            source_node, destination_node = destination_node, source_node
+        # Rows before source_node hold size, size - 1, ... entries
+        return source_node * (2 * self.size - source_node + 1) // 2 + destination_node - source_node
+
+    def get(self, source_node, destination_node):
+        """
+        Returns the distance between two node indices.
+        """
+        return float(self.distances[self.offset(source_node, destination_node)])
+
+    def set(self, source_node, destination_node, distance):
+        """
+        Sets the distance between two node indices. A packed matrix sets it for both directions.
+        """
+        self.distances[self.offset(source_node, destination_node)] = distance
+
+    def distance(self, source, destination):
+        """
+        Returns the distance between two addresses.
+        """
+        return self.get(self.node_index[source], self.node_index[destination])
+
+    def row(self, node):
+        """
+        Returns the distances from a node to every node, indexed by node.
+        """
+        if not self.packed:
+            start = node * self.size
+            return self.distances[start:start + self.size]
+        nodes = np.arange(self.size)
+        low = np.minimum(nodes, node)
+        high = np.maximum(nodes, node)
+        return self.distances[low * (2 * self.size - low + 1) // 2 + high - low]
+
+    def nbytes(self):
+        """
+        Returns the number of bytes of the mapped distances.
+        """
+        return self.distances.nbytes
+
+    def block(self, start, stop):
+        """
+        Returns the rows of nodes start to stop - 1 as a 2-D NumPy array.
+        """
+        if not self.packed:
+            return self.distances[start * self.size:stop * self.size].reshape(stop - start, self.size)
+        return np.stack([self.row(node) for node in range(start, stop)])
+
+    def to_dense(self):
+        """
+        Returns an in-memory copy of the matrix backed by a flat array of doubles. The copy takes
+        size * size * 8 bytes, so only call it on matrices known to fit in memory.
+        """
+        distances = np.empty((self.size, self.size), dtype=np.float64)
+        for node in range(self.size):
+            distances[node] = self.row(node)
+        return DistanceMatrix(self.addresses, array('d', distances.tobytes()))
+
+    def shortest_paths(self, file_path=None, block_size=1024):
+        """
+        Computes the all-pairs shortest paths (metric closure) with Floyd-Warshall into mapped files
+        instead of memory, see DistanceMatrix.shortest_paths. The closure is an unpacked float32 matrix
+        file and the predecessors an int32 file next to it, and rows are relaxed block_size at a time,
+        so memory use stays at a few blocks of rows however large the network is.
+
+        Args:
+            file_path (str): The path of the closure file. Default is the matrix file path plus '.closure'.
+                The predecessors are written to the same path plus '.predecessors'.
+            block_size (int): The number of rows relaxed at a time. Default is 1024.
+
+        Returns:
+            tuple: A MappedDistanceMatrix of shortest path distances and an int32 np.memmap of predecessors,
+                where entry source * size + destination is the node before destination on the path, or -1.
+        """
+        if file_path is None:
+            file_path = self.file_path + '.closure'
+        size = self.size
+        closure = create_mapped_distance_matrix(file_path, self.addresses, digest=self.digest)
+        predecessors = np.memmap(file_path + '.predecessors', dtype=np.int32, mode='w+', shape=(max(size * size, 1),))
+        distances = closure.distances[:size * size].reshape(size, size)
+        previous = predecessors[:size * size].reshape(size, size)
+
+        nodes = np.arange(size, dtype=np.int32)
+        for start in range(0, size, block_size):
+            stop = min(start + block_size, size)
+            distances[start:stop] = self.block(start, stop)
+            previous[start:stop] = np.where(np.isfinite(distances[start:stop]), nodes[start:stop, None], -1)
+            previous[nodes[start:stop], nodes[start:stop]] = -1
+
+        for k in range(size):
+            # Row k does not change while paths through k are relaxed, so one copy serves every block
+            row_k = np.array(distances[k])
+            previous_k = np.array(previous[k])
+            for start in range(0, size, block_size):
+                stop = min(start + block_size, size)
+                rows = distances[start:stop]
+                via = rows[:, k, None] + row_k[None, :]
+                shorter = via < rows
+                if shorter.any():
+                    rows[shorter] = via[shorter]
+                    previous[start:stop][shorter] = np.broadcast_to(previous_k, shorter.shape)[shorter]
+
+        closure.flush()
+        predecessors.flush()
+        return closure, predecessors
+
+    def flush(self):
+        """
+        Writes changed distances back to the file.
+        """
+        self.distances.flush()
+
+
+def create_mapped_distance_matrix(file_path, addresses, packed=False, digest=None):
+    """
+    Creates a memory-mapped distance matrix file in which every distance is unknown.
+
+    Args:
+        file_path (str): The path of the file to create.
+        addresses (iterable): The addresses to intern as nodes, in node index order.
+        packed (bool): Whether to store only the upper triangle of a symmetric matrix. Default is False.
+        digest (str): Optional SHA-256 hex digest of the distance CSV, stored in the header.
+
+    Returns:
+        MappedDistanceMatrix: The writable matrix.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("MappedDistanceMatrix requires NumPy")
+    addresses = list(dict.fromkeys(addresses))
+    size = len(addresses)
+    encoded = '\n'.join(addresses).encode()
+    header = MAPPED_MATRIX_MAGIC + struct.pack('<IIQ', size, packed, len(encoded))
+    header += bytes.fromhex(digest) if digest else bytes(32)
+    header += encoded
+    header += bytes(-len(header) % SNAPSHOT_ALIGNMENT)
+
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'wb') as file:
+        file.write(header)
+
+    length = size * (size + 1) // 2 if packed else size * size
+    distances = np.memmap(file_path, dtype=np.float32, mode='r+', offset=len(header), shape=(max(length, 1),))
+    distances[:] = np.inf
+    matrix = MappedDistanceMatrix(addresses, distances, packed, file_path, digest)
+    for node in range(size):
+        matrix.set(node, node, 0.0)
+    return matrix
+
+
+def open_mapped_distance_matrix(file_path, writable=False):
+    """
+    Opens a distance matrix file created by create_mapped_distance_matrix.
+
+    Args:
+        file_path (str): The path of the file.
+        writable (bool): Whether changes are written back to the file. Default is False.
+
+    Returns:
+        MappedDistanceMatrix: The matrix.
+
+    Raises:
+        ValueError: If the file is not a mapped distance matrix.
+    """
+    if np is None:
+        raise ImportError("MappedDistanceMatrix requires NumPy")
+    with open(file_path, 'rb') as file:
+        fixed = file.read(len(MAPPED_MATRIX_MAGIC) + 16 + 32)
+        if len(fixed) != len(MAPPED_MATRIX_MAGIC) + 16 + 32 or not fixed.startswith(MAPPED_MATRIX_MAGIC):
+            raise ValueError(f"{file_path} is not a mapped distance matrix")
+        size, packed, address_length = struct.unpack('<IIQ', fixed[len(MAPPED_MATRIX_MAGIC):-32])
+        digest = fixed[-32:]
+        addresses = file.read(address_length).decode().split('\n') if size else []
+
+    offset = len(fixed) + address_length
+    offset += -offset % SNAPSHOT_ALIGNMENT
+    length = size * (size + 1) // 2 if packed else size * size
+    distances = np.memmap(file_path, dtype=np.float32, mode='r+' if writable else 'r', offset=offset,
+                          shape=(max(length, 1),))
+    return MappedDistanceMatrix(addresses, distances, bool(packed), file_path, digest.hex() if any(digest) else None)
+
+
+def write_little_endian(file, buffer):
+    """
+    Writes a typed array to a binary file in little-endian byte order whatever the native order is.
+    """
+    if sys.byteorder == 'big':
+        buffer = array(buffer.typecode, buffer)
+        buffer.byteswap()
+    buffer.tofile(file)
+
+
+def save_shortest_paths(file_path, digest, closure, predecessors):
+    """
+    Writes all-pairs shortest paths to a binary cache file. The distances (doubles) and predecessors
+    (32-bit ints) are stored little-endian after the header.
+
+    Args:
+        file_path (str): The path of the cache file.
+        digest (str): The SHA-256 hex digest of the distance CSV the paths were computed from.
+        closure (DistanceMatrix): The shortest path distances.
+        predecessors (array): The shortest path predecessors.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so a partially written cache is never read
+    temporary_path = file_path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(SHORTEST_PATHS_MAGIC)
+        file.write(bytes.fromhex(digest))
+        file.write(struct.pack('<I', closure.size))
+        write_little_endian(file, closure.distances)
+        write_little_endian(file, predecessors)
+    os.replace(temporary_path, file_path)
+
+
+def load_shortest_paths(file_path, digest, matrix):
+    """
+    Reads all-pairs shortest paths from a binary cache file.
+
+    Args:
+        file_path (str): The path of the cache file.
+        digest (str): The SHA-256 hex digest of the distance CSV the paths must match.
+        matrix (DistanceMatrix): The distance matrix loaded from that CSV.
+
+    Returns:
+        tuple: The closure DistanceMatrix and predecessors array, or None if the file is missing or stale.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            header = file.read(len(SHORTEST_PATHS_MAGIC) + 32 + 4)
+            if len(header) != len(SHORTEST_PATHS_MAGIC) + 32 + 4 or not header.startswith(SHORTEST_PATHS_MAGIC):
+                return None
+            if header[len(SHORTEST_PATHS_MAGIC):-4] != bytes.fromhex(digest):
+                return None
+            size = struct.unpack('<I', header[-4:])[0]
+            if size != matrix.size:
+                return None
+            closure = DistanceMatrix(matrix.addresses)
+            closure.distances = array('d')
+            closure.distances.fromfile(file, size * size)
+            predecessors = array('i')
+            predecessors.fromfile(file, size * size)
+    except (OSError, EOFError):
+        return None
+    # The cache is little-endian, so it can be shared between machines
+    if sys.byteorder == 'big':
+        closure.distances.byteswap()
+        predecessors.byteswap()
+    return closure, predecessors
+
+
+def write_sections(file_path, sections):
+    """
+    Writes named binary sections to a snapshot file. The file starts with SNAPSHOT_MAGIC, the
+    SNAPSHOT_VERSION and a table of (name, offset, size) entries, and every section is aligned to
+    SNAPSHOT_ALIGNMENT bytes.
+
+    Args:
+        file_path (str): The path of the snapshot file.
+        sections (dict): Dictionary mapping section name (at most 16 ASCII characters) to a bytes-like object.
+    """
+    buffers = [(name.encode('ascii'), memoryview(buffer).cast('B')) for name, buffer in sections.items()]
+    offset = len(SNAPSHOT_MAGIC) + 8 + len(buffers) * 32
+    table = []
+    for name, buffer in buffers:
+        offset += -offset % SNAPSHOT_ALIGNMENT
+        table.append(struct.pack('<16sQQ', name, offset, len(buffer)))
+        offset += len(buffer)
+
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so a partially written snapshot is never read
+    temporary_path = file_path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(struct.pack('<II', SNAPSHOT_VERSION, len(buffers)))
+        file.write(b''.join(table))
+        for entry, (_, buffer) in zip(table, buffers):
+            file.write(bytes(struct.unpack('<16sQQ', entry)[1] - file.tell()))
+            file.write(buffer)
+    os.replace(temporary_path, file_path)
+
+
+def map_sections(file_path):
+    """
+    Maps the sections of a snapshot file written by write_sections. The file is mapped copy-on-write,
+    so processes mapping the same snapshot share its pages until they modify them.
+
+    Args:
+        file_path (str): The path of the snapshot file.
+
+    Returns:
+        tuple: The mmap, which must stay referenced while the sections are used, and a dictionary
+            mapping section name to a memoryview of its bytes.
+
+    Raises:
+        ValueError: If the file is not a snapshot, was written by another snapshot version, or is
+            truncated so that its section table or a section lies past the end of the file.
+    """
+    header_size = len(SNAPSHOT_MAGIC) + 8
+    with open(file_path, 'rb') as file:
+        length = os.fstat(file.fileno()).st_size
+        if length < header_size or file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{file_path} is not a WGUPS snapshot")
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    try:
+        version, count = struct.unpack('<II', mapping[len(SNAPSHOT_MAGIC):header_size])
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{file_path} is a version {version} snapshot, expected version {SNAPSHOT_VERSION}")
+        table_end = header_size + count * 32
+        if table_end > length:
+            raise ValueError(f"{file_path} is truncated: its section table ends at byte {table_end} of {length}")
+        table = []
+        for index in range(count):
+            name, offset, size = struct.unpack_from('<16sQQ', mapping, header_size + index * 32)
+            name = name.rstrip(b'\0').decode('ascii', 'replace')
+            if offset < table_end or offset + size > length:
+                raise ValueError(f"{file_path} is truncated or corrupt: section {name} "
+                                 f"spans bytes {offset} to {offset + size} of {length}")
+            table.append((name, offset, size))
+    except BaseException:
+        mapping.close()
+        raise
+
+    buffer = memoryview(mapping)
+    sections = {name: buffer[offset:offset + size] for name, offset, size in table}
+    return mapping, sections
+
+
+def share_buffer(buffer):
+    """
+    Copies a typed buffer into a new shared memory block so worker processes can map it without copying.
+
+    Args:
+        buffer (array): The buffer to share, for example DistanceMatrix.distances. Any one-dimensional
+            buffer with a native format works, including memoryviews of a mapped snapshot.
+
+    Returns:
+        tuple: The SharedMemory block, which the caller must close and unlink, and a picklable
+            (name, format, length) descriptor for attach_buffer.
+    """
+    view = memoryview(buffer)
+    data = view.cast('B')
+    block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        block.buf[:len(data)] = data
+    except BaseException:
+        # Never leave an unreferenced block behind
+        block.close()
+        block.unlink()
+        raise
+    return block, (block.name, view.format, view.nbytes // view.itemsize)
+
+
+def attach_buffer(descriptor):
+    """
+    Maps a shared memory block created by share_buffer.
+
+    Args:
+        descriptor (tuple): The (name, format, length) descriptor returned by share_buffer.
+
+    Returns:
+        tuple: The SharedMemory block, which must stay referenced while the view is used, and a
+            read-only typed memoryview over its contents.
+    """
+    name, format, length = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    view = block.buf.toreadonly().cast('B')[:length * struct.calcsize(format)].cast(format)
+    return block, view
+
+
+class PackageState(IntEnum):
+    """
+    Lifecycle state of a package.
+    """
+    UNASSIGNED = 0  # At the hub and not yet assigned to a truck
+    LOADED = 1
+    EN_ROUTE = 2
+    DELIVERED = 3
+
+
+class PackageStateTable:
+    """
+    PackageStateTable tracks the lifecycle state of every package. Besides the id to state
+    mapping it keeps the ids in each state as an insertion-ordered dictionary, so moving a
+    package between states is O(1) and the packages in a state are available as a live view.
+    """
+
+    def __init__(self):
+        self.states = {}  # Dictionary mapping package_id to its PackageState
+        self.members = {state: {} for state in PackageState}  # Ordered sets of package ids per state
+
+    def __len__(self):
+        return len(self.states)
+
+    def add(self, package_id, state=PackageState.UNASSIGNED):
+        """
+        Adds a package in the given state, or moves it there if it is already present.
+        """
+        self.set_state(package_id, state)
+
+    def remove(self, package_id):
+        """
+        Removes a package from the table.
+        """
+        state = self.states.pop(package_id)
+        del self.members[state][package_id]
+
+    def state(self, package_id):
+        """
+        Returns the state of a package, or None if it is not in the table.
+        """
+        return self.states.get(package_id)
+
+    def set_state(self, package_id, state):
+        """
+        Moves a package to a new state.
+        """
+        previous = self.states.get(package_id)
+        if previous is not None:
+            del self.members[previous][package_id]
+        self.states[package_id] = state
+        self.members[state][package_id] = None
+
+    def view(self, state):
+        """
+        Returns a live, read-only view of the package ids in a state, in the order they entered it.
+        """
+        return self.members[state].keys()
+
+    def count(self, state):
+        """
+        Returns the number of packages in a state.
+        """
+        return len(self.members[state])
+
+
+class PackageStore:
+    """
+    PackageStore keeps package data as parallel columns of a NumPy structured array so
+    fleet-wide queries are vectorized filters instead of loops over Package objects.
+    Rows are appended in load order and located by package id through row_index.
+    """
+
+    # Status codes stored in the status column
+    AT_HUB = PackageState.UNASSIGNED
+    LOADED = PackageState.LOADED
+    EN_ROUTE = PackageState.EN_ROUTE
+    DELIVERED = PackageState.DELIVERED
+
+    # Bits stored in the flags column
+    DELAYED = 1
+    TRUCK_RESTRICTED = 2
+    GROUPED = 4
+    WRONG_ADDRESS = 8
+
+    def __init__(self, capacity=1024):
+        """
+        Initializes an empty store.
+
+        Args:
+            capacity (int): The number of rows allocated up front. Default is 1024.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("PackageStore requires NumPy")
+        self.dtype = np.dtype([
+            ('package_id', np.int64),
+            ('node', np.int32),  # Distance matrix node index, -1 if unknown
+            ('deadline', np.int32),  # Minutes since midnight
+            ('weight', np.float64),
+            ('flags', np.uint8),
+            ('required_truck', np.int16),  # 0 if any truck may carry the package
+            ('no_load_before', np.int32),  # Minutes since midnight, -1 if not delayed
+            ('status', np.uint8),
+            ('delivery_time', np.int32),  # Minutes since midnight, -1 until delivered
+        ])
+        self.columns = np.zeros(max(capacity, 1), dtype=self.dtype)
+        self.count = 0
+        self._row_index = {}  # Dictionary mapping package_id to row, None until rebuilt after attach_columns
+
+    @property
+    def row_index(self):
+        """
+        Dictionary mapping package_id to row.
+        """
+        if self._row_index is None:
+            self._row_index = dict(zip(map(str, self.view()['package_id'].tolist()), range(self.count)))
+        return self._row_index
+
+    def attach_columns(self, columns):
+        """
+        Uses existing rows, for example mapped from a snapshot, as the filled rows of the store.
+        The row index is only rebuilt when it is first used.
+        """
+        if columns.dtype != self.dtype:
+            raise ValueError("Columns do not match the PackageStore layout")
+        self.columns = columns
+        self.count = len(columns)
+        self._row_index = None
+
+    def __len__(self):
+        return self.count
+
+    def view(self):
+        """
+        Returns the filled rows of the store.
+        """
+        return self.columns[:self.count]
+
+    def append_packages(self, packages, matrix=None):
+        """
+        Appends a batch of packages to the store. A package whose id is already stored replaces
+        that row in place, keeping its status and delivery time, as the hash table replaces it.
+
+        Args:
+            packages (list): The Package objects to append.
+            matrix (DistanceMatrix): Optional distance matrix used to fill the node column.
+        """
+        # Split off packages that replace a stored row, a later duplicate in the batch replacing an earlier one
+        new_packages = {}
+        for package in packages:
+            if package.package_id in self.row_index:
+                row = self.columns[self.row_index[package.package_id]]
+                row['deadline'] = package.deadline
+                row['weight'] = package.weight
+                self.update_package(package, matrix)
+            else:
+                new_packages[package.package_id] = package
+        packages = list(new_packages.values())
+
+        needed = self.count + len(packages)
+        if needed > len(self.columns):
+            capacity = len(self.columns)
+            while capacity < needed:
+                capacity *= 2
+            columns = np.zeros(capacity, dtype=self.dtype)
+            columns[:self.count] = self.columns[:self.count]
+            self.columns = columns
+
+        rows = self.columns[self.count:needed]
+        rows['package_id'] = [int(package.package_id) for package in packages]
+        rows['deadline'] = [package.deadline for package in packages]
+        rows['weight'] = [package.weight for package in packages]
+        rows['status'] = self.AT_HUB
+        rows['delivery_time'] = -1
+        for offset, package in enumerate(packages):
+            self.row_index[package.package_id] = self.count + offset
+        self.count = needed
+
+        for package in packages:
+            self.update_package(package, matrix)
+
+    def update_package(self, package, matrix=None):
+        """
+        Rewrites the columns derived from a package's address and notes.
+
+        Args:
+            package (Package): The package to update.
+            matrix (DistanceMatrix): Optional distance matrix used to fill the node column.
+        """
+        row = self.columns[self.row_index[package.package_id]]
+        if matrix is not None and package.address in matrix:
+            row['node'] = matrix.node(package.address)
+        else:
+            row['node'] = -1
+        row['no_load_before'] = -1 if package.no_load_before is None else parse_deadline(package.no_load_before)
+        row['required_truck'] = package.required_truck or 0
+
+        flags = 0
+        if package.no_load_before is not None:
+            flags |= self.DELAYED
+        if package.required_truck is not None:
+            flags |= self.TRUCK_RESTRICTED
+        if package.package_accompaniment:
+            flags |= self.GROUPED
+        if parse_note(package.notes).wrong_address:
+            flags |= self.WRONG_ADDRESS
+        row['flags'] = flags
+
+    def rows_for(self, package_ids):
+        """
+        Returns the row numbers of the given package ids.
+        """
+        return np.fromiter((self.row_index[package_id] for package_id in package_ids), dtype=np.int64,
+                           count=len(package_ids))
+
+    def set_status(self, package_ids, status, delivery_time=None):
+        """
+        Sets the status of packages, and optionally their delivery time in minutes since midnight.
+        """
+        rows = self.rows_for(package_ids)
+        self.columns['status'][rows] = status
+        if delivery_time is not None:
+            self.columns['delivery_time'][rows] = delivery_time
+
+    def mask(self, deadline_before=None, status=None, required_truck=None, flags=None, available_at=None):
+        """
+        Returns a boolean mask over the rows matching every given filter.
+
+        Args:
+            deadline_before (int): Only packages due before this many minutes since midnight.
+            status (int or tuple): Only packages with this status, or any of these statuses.
+            required_truck (int): Only packages restricted to this truck.
+            flags (int): Only packages with all of these flag bits set.
+            available_at (int): Only packages that may be loaded at this many minutes since midnight.
+        """
+        columns = self.view()
+        selected = np.ones(self.count, dtype=bool)
+        if deadline_before is not None:
+            selected &= columns['deadline'] < deadline_before
+        if status is not None:
+            selected &= np.isin(columns['status'], np.atleast_1d(status))
+        if required_truck is not None:
+            selected &= columns['required_truck'] == required_truck
+        if flags is not None:
+            selected &= (columns['flags'] & flags) == flags
+        if available_at is not None:
+            selected &= columns['no_load_before'] <= available_at
+        return selected
+
+    def select(self, **filters):
+        """
+        Returns the package ids of the rows matching the filters accepted by mask.
+
+        For example select(deadline_before=10 * 60 + 30, status=PackageStore.AT_HUB) returns every
+        package due before 10:30 AM that has not been loaded.
+        """
+        return self.view()['package_id'][self.mask(**filters)]
+
+
+def is_symmetric(distances):
+    """
+    Returns whether a square list of distance rows is the same in both directions.
+    """
+    return all(distances[source][destination] == distances[destination][source]
+               for source in range(len(distances)) for destination in range(source))
+
+
+def reversal_cost(route, distances, first, last):
+    """
+    Returns how much longer the edges between route positions first and last become when that
+    part of the route is reversed, which is zero for a symmetric matrix.
+    """
+    return sum(distances[route[index + 1]][route[index]] - distances[route[index]][route[index + 1]]
+               for index in range(first, last))
+
+
+def neighbor_list(neighbor_graph, node):
+    """
+    Returns the nearest neighbors of a node in a graph built by DistanceMatrix.nearest_neighbors as a list of ints.
+    """
+    neighbors = neighbor_graph[node]
+    return neighbors.tolist() if np is not None and isinstance(neighbors, np.ndarray) else neighbors
+
+
+class RouteOptimizer:
+    """
+    RouteOptimizer orders delivery stops into a short route from a start node to an end node.
+    It builds a nearest-neighbor route and improves it with 2-opt and Or-opt moves, only trying
+    moves towards each stop's nearest neighbors and skipping stops whose don't-look bit is set.
+    Routes with few stops are instead solved exactly with the Held-Karp dynamic program.
+    With optimize_with_deadlines, stop deadlines are instead treated as hard time windows.
+    Any object with the same optimize method can be used as WGUPS.route_optimizer.
+    """
+
+    def __init__(self, neighbor_count=8, max_segment_length=3, neighbor_graph=None, exact_stop_limit=12):
+        """
+        Initializes the route optimizer.
+
+        Args:
+            neighbor_count (int): The number of nearest neighbors considered per stop. Default is 8.
+            max_segment_length (int): The longest segment of stops Or-opt moves at once. Default is 3.
+            neighbor_graph (list): Optional precomputed nearest neighbors of every matrix node, see
+                DistanceMatrix.nearest_neighbors, used instead of sorting each route's stops.
+            exact_stop_limit (int): Routes with at most this many stops are solved exactly, larger routes
+                use the heuristics. The exact solver takes O(2^n * n^2) time. 0 disables it. Default is 12.
+        """
+        self.neighbor_count = neighbor_count
+        self.max_segment_length = max_segment_length
+        self.neighbor_graph = neighbor_graph
+        self.exact_stop_limit = exact_stop_limit
+
+    def optimize(self, matrix, start_node, stop_nodes, end_node):
+        """
+        Orders stops into a route that starts at start_node and ends at end_node.
+
+        Args:
+            matrix (DistanceMatrix): The distances between nodes.
+            start_node (int): The node the route starts from.
+            stop_nodes (list): The nodes to visit.
+            end_node (int): The node the route ends at.
+
+        Returns:
+            list: The stop nodes in route order.
+        """
+        if len(stop_nodes) < 2:
+            return list(stop_nodes)
+
+        # Work on local indices: 0 is the start, 1..n are the stops and n + 1 is the end
+        nodes = [start_node] + list(stop_nodes) + [end_node]
+        distances = [[matrix.get(source, destination) for destination in nodes] for source in nodes]
+
+        if len(stop_nodes) <= self.exact_stop_limit:
+            route = self.held_karp(distances)
+        else:
+            route = self.heuristic_route(distances, nodes)
+
+        return [nodes[stop] for stop in route[1:-1]]
+
+    def heuristic_route(self, distances, nodes):
+        """
+        Builds a route over local indices with nearest neighbor and improves it with 2-opt and Or-opt.
+        """
+        route = self.nearest_neighbor_route(distances)
+        neighbors = self.neighbor_lists(distances, nodes)
+        symmetric = is_symmetric(distances)
+        while self.two_opt(route, distances, neighbors, symmetric) | self.or_opt(route, distances, neighbors, symmetric):
+            pass
+        return route
+
+    def held_karp(self, distances):
+        """
+        Finds the shortest route over local indices, from 0 through every stop to the last index,
+        with the Held-Karp dynamic program over subsets of stops encoded as bitmasks. With NumPy
+        every subset of the same size is processed at once.
+
+        Returns:
+            list: The local indices in route order, including the start and the end.
+        """
+        end = len(distances) - 1
+        count = end - 1
+        if count == 0:
+            return [0, end]
+        full = (1 << count) - 1
+
+        if np is not None:
+            table = np.array(distances, dtype=np.float64)
+            legs = table[1:end, 1:end]  # legs[i, j] is the distance from stop i + 1 to stop j + 1
+            # cost[mask, j] is the shortest route from the start through the stops in mask ending at stop j + 1
+            cost = np.full((full + 1, count), np.inf)
+            parent = np.full((full + 1, count), -1, dtype=np.int8)
+            bits = 1 << np.arange(count)
+            cost[bits, np.arange(count)] = table[0, 1:end]
+            masks = np.arange(full + 1)
+            sizes = np.zeros(full + 1, dtype=np.int64)
+            for bit in bits:
+                sizes += (masks & bit) != 0
+            for size in range(2, count + 1):
+                layer = masks[sizes == size]
+                for last in range(count):
+                    with_last = layer[(layer & bits[last]) != 0]
+                    candidates = cost[with_last ^ bits[last]] + legs[:, last]
+                    best = np.argmin(candidates, axis=1)
+                    cost[with_last, last] = candidates[np.arange(len(with_last)), best]
+                    parent[with_last, last] = best
+            totals = cost[full] + table[1:end, end]
+            last = int(np.argmin(totals))
+            parent = parent.tolist()
+        else:
+            cost = {(1 << stop, stop): distances[0][stop + 1] for stop in range(count)}
+            parent = {}
+            for mask in range(1, full + 1):
+                for last in range(count):
+                    if not mask & (1 << last) or mask == 1 << last:
+                        continue
+                    previous_mask = mask ^ (1 << last)
+                    best = min((cost[previous_mask, previous] + distances[previous + 1][last + 1], previous)
+                               for previous in range(count) if previous_mask & (1 << previous))
+                    cost[mask, last] = best[0]
+                    parent[mask, last] = best[1]
+            last = min(range(count), key=lambda stop: (cost[full, stop] + distances[stop + 1][end], stop))
+            parent = [[parent.get((mask, stop), -1) for stop in range(count)] for mask in range(full + 1)]
+
+        # Walk the parents back from the best last stop
+        route = [end]
+        mask = full
+        while last >= 0:
+            route.append(last + 1)
+            mask, last = mask ^ (1 << last), parent[mask][last]
+        route.append(0)
+        route.reverse()
+        return route
+
+    def optimality_gap(self, matrix, start_node, stop_nodes, end_node):
+        """
+        Compares the heuristic route with the exact route for the same stops. The exact route takes
+        exponential time, so routes of more than exact_stop_limit stops are not compared.
+
+        Returns:
+            tuple: The length of the heuristic route and the length of the shortest route, or None if
+                there are more than exact_stop_limit stops.
+        """
+        if len(stop_nodes) > self.exact_stop_limit:
+            return None
+        nodes = [start_node] + list(stop_nodes) + [end_node]
+        distances = [[matrix.get(source, destination) for destination in nodes] for source in nodes]
+
+        def length(route):
+            return sum(distances[source][destination] for source, destination in zip(route, route[1:]))
+
+        if len(stop_nodes) < 2:
+            route = list(range(len(nodes)))
+            return length(route), length(route)
+        return length(self.heuristic_route(distances, nodes)), length(self.held_karp(distances))
+
+    def nearest_neighbor_route(self, distances):
+        """
+        Builds a route by repeatedly visiting the nearest unvisited stop.
+        """
+        end = len(distances) - 1
+        unvisited = set(range(1, end))
+        route = [0]
+        while unvisited:
+            row = distances[route[-1]]
+            nearest = min(unvisited, key=lambda stop: (row[stop], stop))
+            unvisited.remove(nearest)
+            route.append(nearest)
+        route.append(end)
+        return route
+
+    def neighbor_lists(self, distances, nodes=None):
+        """
+        Returns the nearest stops of every stop, closest first. With a neighbor graph, a stop's
+        candidates are its precomputed neighbors that are on the route, padded with its nearest
+        other stops when too few of them are. Graph neighbors are closer than any other node, so
+        padding keeps the candidates in distance order without sorting the whole route.
+        """
+        end = len(distances) - 1
+        wanted = min(self.neighbor_count, end - 2)
+        local = {}
+        if self.neighbor_graph is not None and nodes is not None:
+            local = {node: stop for stop, node in enumerate(nodes[1:end], start=1)}
+
+        neighbors = [[]]
+        for stop in range(1, end):
+            candidates = []
+            if local:
+                candidates = [local[node] for node in neighbor_list(self.neighbor_graph, nodes[stop]) if node in local]
+                candidates = [other for other in candidates if other != stop][:self.neighbor_count]
+            if len(candidates) < wanted:
+                row = distances[stop]
+                chosen = set(candidates)
+                chosen.add(stop)
+                candidates += heapq.nsmallest(self.neighbor_count - len(candidates),
+                                              (other for other in range(1, end) if other not in chosen),
+                                              key=lambda other: (row[other], other))
+            neighbors.append(candidates)
+        neighbors.append([])
+        return neighbors
+
+    def two_opt(self, route, distances, neighbors, symmetric=None):
+        """
+        Applies improving 2-opt moves until none remain. A move reverses the stops between the two
+        removed edges, so on an asymmetric matrix the change in length of those reversed edges
+        counts towards its gain.
+
+        Args:
+            route (list): The local indices in route order, changed in place.
+            distances (list): The distances between local indices.
+            neighbors (list): The candidate neighbors of each stop, see neighbor_lists.
+            symmetric (bool): Whether distances is symmetric. Default is None, which checks it.
+
+        Returns:
+            bool: True if the route was changed.
+        """
+        if symmetric is None:
+            symmetric = is_symmetric(distances)
+        position = [0] * len(route)
+        for index, stop in enumerate(route):
+            position[stop] = index
+        last = len(route) - 1
+        queue = list(range(1, last))
+        queued = [True] * len(route)
+        improved = False
+
+        while queue:
+            stop = queue.pop()
+            queued[stop] = False
+            for neighbor in neighbors[stop]:
+                i = position[stop]
+                j = position[neighbor]
+                applied = None
+                # Try connecting stop to neighbor by removing the edges after them, then before them
+                for first, second in ((min(i, j), max(i, j)), (min(i, j) - 1, max(i, j) - 1)):
+                    if first < 0 or second + 1 > last or first >= second:
+                        continue
+                    a, b, c, d = route[first], route[first + 1], route[second], route[second + 1]
+                    gain = distances[a][b] + distances[c][d] - distances[a][c] - distances[b][d]
+                    if not symmetric:
+                        gain -= reversal_cost(route, distances, first + 1, second)
+                    if gain > 1e-9:
+                        applied = (first, second)
+                        break
+                if applied is None:
+                    continue
+                first, second = applied
+                route[first + 1:second + 1] = route[first + 1:second + 1][::-1]
+                for index in range(first + 1, second + 1):
+                    position[route[index]] = index
+                # Clear the don't-look bits of the stops at the changed edges
+                for index in (first, first + 1, second, second + 1):
+                    changed = route[index]
+                    if 0 < changed < last and not queued[changed]:
+                        queued[changed] = True
+                        queue.append(changed)
+                improved = True
+                if not queued[stop]:
+                    queued[stop] = True
+                    queue.append(stop)
+                break
+
+        return improved
+
+    def or_opt(self, route, distances, neighbors, symmetric=None):
+        """
+        Applies improving Or-opt moves, relocating segments of up to max_segment_length stops
+        next to one of their first stop's neighbors, until none remain.
+
+        Args:
+            route (list): The local indices in route order, changed in place.
+            distances (list): The distances between local indices.
+            neighbors (list): The candidate neighbors of each stop, see neighbor_lists.
+            symmetric (bool): Whether distances is symmetric. Default is None, which checks it.
+
+        Returns:
+            bool: True if the route was changed.
+        """
+        if symmetric is None:
+            symmetric = is_symmetric(distances)
+        position = [0] * len(route)
+        for index, stop in enumerate(route):
+            position[stop] = index
+        last = len(route) - 1
+        queue = list(range(1, last))
+        queued = [True] * len(route)
+        improved = False
+
+        while queue:
+            stop = queue.pop()
+            queued[stop] = False
+            move = self.find_or_opt_move(route, position, distances, neighbors, stop, symmetric)
+            if move is None:
+                continue
+            i, length, insert_after, reverse = move
+            # Clear the don't-look bits of the stops around the removed and inserted segment
+            changed_stops = route[i:i + length] + [route[i - 1], route[i + length],
+                                                   route[insert_after], route[insert_after + 1]]
+            segment = route[i:i + length]
+            if reverse:
+                segment.reverse()
+            del route[i:i + length]
+            if insert_after > i:
+                insert_after -= length
+            route[insert_after + 1:insert_after + 1] = segment
+            for index in range(min(i, insert_after + 1), max(i + length, insert_after + length + 1)):
+                position[route[index]] = index
+            for changed in changed_stops:
+                if 0 < changed < last and not queued[changed]:
+                    queued[changed] = True
+                    queue.append(changed)
+            improved = True
+
+        return improved
+
+    def find_or_opt_move(self, route, position, distances, neighbors, stop, symmetric=True):
+        """
+        Finds an improving Or-opt move for the segments starting at a stop. A reversed segment also
+        reverses its inner edges, which changes their length unless the matrix is symmetric.
+
+        Returns:
+            tuple: The segment start position, segment length, the position of the stop the segment is
+                inserted after and whether the segment is reversed, or None if no move improves the route.
+        """
+        last = len(route) - 1
+        i = position[stop]
+        for length in range(1, self.max_segment_length + 1):
+            if i + length > last:
+                break
+            first, final = route[i], route[i + length - 1]
+            before, after = route[i - 1], route[i + length]
+            removal_gain = distances[before][first] + distances[final][after] - distances[before][after]
+            inner_reversal = 0.0 if symmetric else reversal_cost(route, distances, i, i + length - 1)
+            for neighbor in neighbors[stop]:
+                j = position[neighbor]
+                # Insert after the neighbor or after the stop preceding it
+                for insert_after in (j, j - 1):
+                    if insert_after >= last or i - 1 <= insert_after < i + length:
+                        continue
+                    left, right = route[insert_after], route[insert_after + 1]
+                    base = distances[left][right]
+                    forward = distances[left][first] + distances[final][right] - base
+                    backward = distances[left][final] + distances[first][right] - base + inner_reversal
+                    if removal_gain - forward > 1e-9:
+                        return i, length, insert_after, False
+                    if removal_gain - backward > 1e-9:
+                        return i, length, insert_after, True
+        return None
+
+    def optimize_with_deadlines(self, matrix, start_node, stop_nodes, end_node, deadlines, departure_time,
+                                speed_mph=SPEED_MPH):
+        """
+        Orders stops into a short route that reaches every stop by its deadline. Stops are placed
+        by cheapest feasible insertion, tightest deadlines first, and then relocated while that
+        shortens the route. Each insertion is tested in constant time against the arrival time
+        and slack arrays of the current route. A stop that cannot be placed on time is placed
+        where it is least late.
+
+        Args:
+            matrix (DistanceMatrix): The distances between nodes.
+            start_node (int): The node the route starts from.
+            stop_nodes (list): The nodes to visit.
+            end_node (int): The node the route ends at.
+            deadlines (list): The deadline of each stop in minutes since midnight, parallel to stop_nodes.
+            departure_time (float): The time the route starts in minutes since midnight.
+            speed_mph (float): The travel speed. Default is SPEED_MPH.
+
+        Returns:
+            list: The stop nodes in route order.
+        """
+        if not stop_nodes:
+            return []
+
+        # Work on local indices: 0 is the start, 1..n are the stops and n + 1 is the end
+        nodes = [start_node] + list(stop_nodes) + [end_node]
+        distances = [[matrix.get(source, destination) for destination in nodes] for source in nodes]
+        end = len(nodes) - 1
+        windows = [float('inf')] + list(deadlines) + [float('inf')]
+        minutes_per_mile = 60.0 / speed_mph
+
+        route = [0, end]
+        arrival, slack = self.route_schedule(route, distances, windows, departure_time, minutes_per_mile)
+        for stop in sorted(range(1, end), key=lambda stop: (windows[stop], distances[0][stop], stop)):
+            position = self.best_insertion(route, stop, distances, windows, arrival, slack, minutes_per_mile)
+            if position is None:
+                position = self.least_late_insertion(route, stop, distances, windows, arrival, minutes_per_mile)
+            route.insert(position + 1, stop)
+            arrival, slack = self.route_schedule(route, distances, windows, departure_time, minutes_per_mile)
+
+        # Relocate single stops while a feasible shorter position exists
+        improved = True
+        while improved:
+            improved = False
+            for position in range(1, len(route) - 1):
+                stop = route[position]
+                previous, following = route[position - 1], route[position + 1]
+                gain = distances[previous][stop] + distances[stop][following] - distances[previous][following]
+                del route[position]
+                arrival, slack = self.route_schedule(route, distances, windows, departure_time, minutes_per_mile)
+                insert_after = self.best_insertion(route, stop, distances, windows, arrival, slack,
+                                                   minutes_per_mile, gain - 1e-9)
+                if insert_after is None:
+                    insert_after = position - 1
+                else:
+                    improved = True
+                route.insert(insert_after + 1, stop)
+                arrival, slack = self.route_schedule(route, distances, windows, departure_time, minutes_per_mile)
+
+        return [nodes[stop] for stop in route[1:-1]]
+
+    def route_schedule(self, route, distances, windows, departure_time, minutes_per_mile):
+        """
+        Returns the arrival time at each position of a route and the slack of each position, the
+        most the arrival there can be delayed without any later stop missing its deadline.
+        """
+        arrival = [departure_time] * len(route)
+        for position in range(1, len(route)):
+            arrival[position] = (arrival[position - 1]
+                                 + distances[route[position - 1]][route[position]] * minutes_per_mile)
+        slack = [float('inf')] * len(route)
+        for position in range(len(route) - 1, -1, -1):
+            slack[position] = windows[route[position]] - arrival[position]
+            if position + 1 < len(route):
+                slack[position] = min(slack[position], slack[position + 1])
+        return arrival, slack
+
+    def best_insertion(self, route, stop, distances, windows, arrival, slack, minutes_per_mile,
+                       max_cost=float('inf')):
+        """
+        Returns the position after which inserting a stop adds the least distance while keeping
+        every stop on time, or None if no position costs less than max_cost.
+        """
+        best, best_cost = None, max_cost
+        for position in range(len(route) - 1):
+            left, right = route[position], route[position + 1]
+            cost = distances[left][stop] + distances[stop][right] - distances[left][right]
+            if cost >= best_cost:
+                continue
+            # The stop itself must be on time and the detour must fit in the slack of the rest of the route
+            if arrival[position] + distances[left][stop] * minutes_per_mile > windows[stop]:
+                continue
+            if cost * minutes_per_mile > slack[position + 1]:
+                continue
+            best, best_cost = position, cost
+        return best
+
+    def least_late_insertion(self, route, stop, distances, windows, arrival, minutes_per_mile):
+        """
+        Returns the position after which inserting a stop makes it least late, breaking ties by added distance.
+        """
+        def lateness(position):
+            left, right = route[position], route[position + 1]
+            late = arrival[position] + distances[left][stop] * minutes_per_mile - windows[stop]
+            return max(late, 0.0), distances[left][stop] + distances[stop][right] - distances[left][right]
+
+        return min(range(len(route) - 1), key=lateness)
+
+    def arrival_times(self, matrix, start_node, route, departure_time, speed_mph=SPEED_MPH):
+        """
+        Returns the arrival time at each stop of a route in minutes since midnight.
+        """
+        times = []
+        time = departure_time
+        previous = start_node
+        for node in route:
+            time += matrix.get(previous, node) * 60.0 / speed_mph
+            times.append(time)
+            previous = node
+        return times
+
+
+class FleetAssigner:
+    """
+    FleetAssigner splits packages into truck loads subject to truck capacity, distance
+    restrictions, required trucks, package ready times and co-delivery groups. Each group is
+    placed whole by cheapest insertion into the truck routes, most constrained groups first,
+    and groups are then relocated between trucks while that shortens the combined routes.
+    Trucks that can reach a group by its deadline are preferred over trucks that cannot.
+    """
+
+    def __init__(self, max_rounds=10, speed_mph=SPEED_MPH, neighbor_graph=None):
+        """
+        Initializes the fleet assigner.
+
+        Args:
+            max_rounds (int): The maximum number of local search passes over the groups. Default is 10.
+            speed_mph (float): The travel speed used to check deadlines. Default is SPEED_MPH.
+            neighbor_graph (list): Optional precomputed nearest neighbors of every matrix node, see
+                DistanceMatrix.nearest_neighbors. Stops are then only inserted next to their neighbors.
+        """
+        self.max_rounds = max_rounds
+        self.speed_mph = speed_mph
+        self.neighbor_graph = neighbor_graph
+
+    def assign(self, matrix, hub_node, trucks, units):
+        """
+        Assigns load units to trucks. Packages already on a truck stay there: its current stops and
+        load are the starting route and size, so units only fill the remaining capacity and distance.
+
+        Args:
+            matrix (DistanceMatrix): The distances between nodes.
+            hub_node (int): The node index of the hub.
+            trucks (list): The Truck objects to load.
+            units (list): The LoadUnit groups to place.
+
+        Returns:
+            tuple: A dictionary mapping truck_id to the list of package IDs added to it, and the list
+                of LoadUnits that could not be placed on any truck.
+        """
+        self.matrix = matrix
+        self.hub_node = hub_node
+        routes = {}  # Distinct stop nodes in visiting order
+        node_counts = {}  # Packages per stop node
+        sizes = {}
+        for truck in trucks:
+            routes[truck.truck_id] = list(dict.fromkeys(truck.stops))
+            counts = node_counts[truck.truck_id] = {}
+            for node in truck.stops:
+                counts[node] = counts.get(node, 0) + 1
+            sizes[truck.truck_id] = len(truck.packages)
+        placement = {}  # Unit index to truck_id
+        unassigned = []
+
+        # Place the most constrained groups first: restricted trucks, late ready times, early deadlines
+        order = sorted(range(len(units)), key=lambda index: (
+            units[index].required_truck is None, -units[index].ready_time, units[index].deadline,
+            -max(matrix.get(hub_node, node) for node in units[index].nodes)))
+
+        for index in order:
+            unit = units[index]
+            best = None
+            for truck in trucks:
+                if not self.can_carry(truck, unit, sizes):
+                    continue
+                cost, route = self.insert_nodes(routes[truck.truck_id], node_counts[truck.truck_id], unit.nodes)
+                if self.route_cost(route) > truck.distance_restriction:
+                    continue
+                late = not self.on_time(truck, unit)
+                if best is None or (late, cost) < best[:2]:
+                    best = (late, cost, truck, route)
+            if best is None:
+                unassigned.append(unit)
+                continue
+            _, _, truck, route = best
+            self.place(unit, truck.truck_id, route, routes, node_counts, sizes)
+            placement[index] = truck.truck_id
+
+        self.relocate(trucks, units, placement, routes, node_counts, sizes)
+
+        loads = {truck.truck_id: [] for truck in trucks}
+        for index in sorted(placement):
+            loads[placement[index]].extend(units[index].package_ids)
+        return loads, unassigned
+
+    def can_carry(self, truck, unit, sizes):
+        """
+        Returns whether a truck may carry a unit on top of its current load.
+        """
+        if unit.required_truck is not None and unit.required_truck != truck.truck_id:
+            return False
+        if unit.ready_time > truck.departure_time:
+            return False
+        return sizes[truck.truck_id] + len(unit.package_ids) <= truck.max_capacity
+
+    def on_time(self, truck, unit):
+        """
+        Returns whether a truck leaving at its departure time could drive straight to a unit's
+        nearest stop by the unit's deadline. This is necessary, not sufficient, for delivering it on time.
+        """
+        nearest = min(self.matrix.get(self.hub_node, node) for node in unit.nodes)
+        return truck.departure_time + nearest * 60.0 / self.speed_mph <= unit.deadline
+
+    def route_cost(self, route):
+        """
+        Returns the length of a route from the hub through the stops and back to the hub.
+        """
+        stops = [self.hub_node] + route + [self.hub_node]
+        return sum(self.matrix.get(source, destination) for source, destination in zip(stops, stops[1:]))
+
+    def insert_nodes(self, route, node_counts, nodes):
+        """
+        Inserts the stops a route does not visit yet at their cheapest positions.
+
+        Returns:
+            tuple: The added distance and the new route.
+        """
+        route = list(route)
+        added = 0.0
+        for node in nodes:
+            if node in node_counts or node in route:
+                continue
+            stops = [self.hub_node] + route + [self.hub_node]
+            best_position, best_cost = 0, float('inf')
+            for position in self.insertion_positions(stops, node):
+                source, destination = stops[position], stops[position + 1]
+                cost = self.matrix.get(source, node) + self.matrix.get(node, destination) - self.matrix.get(source, destination)
+                if cost < best_cost:
+                    best_position, best_cost = position, cost
+            route.insert(best_position, node)
+            added += best_cost
+        return added, route
+
+    def insertion_positions(self, stops, node):
+        """
+        Returns the positions after which a node may be inserted into a route that starts and ends
+        at the hub: next to the node's nearest neighbors on the route when a neighbor graph is set,
+        otherwise every position.
+        """
+        last = len(stops) - 1
+        if self.neighbor_graph is None:
+            return range(last)
+        # Position of each stop on the route; the hub is both the first and the last stop
+        index = dict(zip(stops, range(last + 1)))
+        index[self.hub_node] = 0
+        neighbors = neighbor_list(self.neighbor_graph, node)
+        positions = set()
+        for neighbor in neighbors:
+            position = index.get(neighbor)
+            if position is not None:
+                # Insert on either side of the neighbor
+                positions.update(other for other in (position - 1, position) if 0 <= other < last)
+        if self.hub_node in neighbors:
+            positions.add(last - 1)
+        return sorted(positions) if positions else range(last)
+
+    def remove_nodes(self, route, node_counts, nodes):
+        """
+        Removes a unit's packages from a route, dropping stops no other package needs.
+
+        Returns:
+            tuple: The saved distance and the new route.
+        """
+        remaining = dict(node_counts)
+        for node in nodes:
+            remaining[node] -= 1
+        new_route = [node for node in route if remaining[node] > 0]
+        return self.route_cost(route) - self.route_cost(new_route), new_route
+
+    def place(self, unit, truck_id, route, routes, node_counts, sizes):
+        """
+        Records a unit as loaded onto a truck with the given route.
+        """
+        routes[truck_id] = route
+        counts = node_counts[truck_id]
+        for node in unit.nodes:
+            counts[node] = counts.get(node, 0) + 1
+        sizes[truck_id] += len(unit.package_ids)
+
+    def unplace(self, unit, truck_id, route, routes, node_counts, sizes):
+        """
+        Records a unit as removed from a truck, leaving the given route.
+        """
+        routes[truck_id] = route
+        counts = node_counts[truck_id]
+        for node in unit.nodes:
+            counts[node] -= 1
+            if counts[node] == 0:
+                del counts[node]
+        sizes[truck_id] -= len(unit.package_ids)
+
+    def relocate(self, trucks, units, placement, routes, node_counts, sizes):
+        """
+        Moves units to other trucks while a move shortens the combined routes.
+        """
+        trucks_by_id = {truck.truck_id: truck for truck in trucks}
+        for _ in range(self.max_rounds):
+            improved = False
+            for index, source_id in list(placement.items()):
+                unit = units[index]
+                saving, source_route = self.remove_nodes(routes[source_id], node_counts[source_id], unit.nodes)
+                if saving <= 1e-9:
+                    continue
+                # Never move a unit from a truck that can make its deadline to one that cannot
+                source_on_time = self.on_time(trucks_by_id[source_id], unit)
+                best = None
+                for truck in trucks:
+                    if truck.truck_id == source_id or not self.can_carry(truck, unit, sizes):
+                        continue
+                    if source_on_time and not self.on_time(truck, unit):
+                        continue
+                    cost, route = self.insert_nodes(routes[truck.truck_id], node_counts[truck.truck_id], unit.nodes)
+                    if cost < saving - 1e-9 and self.route_cost(route) <= truck.distance_restriction:
+                        if best is None or cost < best[0]:
+                            best = (cost, truck.truck_id, route)
+                if best is None:
+                    continue
+                _, target_id, target_route = best
+                self.unplace(unit, source_id, source_route, routes, node_counts, sizes)
+                self.place(unit, target_id, target_route, routes, node_counts, sizes)
+                placement[index] = target_id
+                improved = True
+            if not improved:
+                break
 
 
 class WGUPS:
@@ -43,61 +2078,146 @@ class WGUPS:
         """
         # Initialize the trucks
         self.truck1 = Truck(1)
-        self.truck2 = Truck(2)
-        self.truck3 = Truck(3)
-        self.distance_table = {}  # Dictionary to store distances between hubs
-        self.hash_table = {}  # Dictionary to store packages hashed by package_id
-        self.loaded_packages = []  # List to store package ids for packages that have been loaded onto a truck
-        self.delivered_packages = []  # List to store package ids for packages that have been delivered
-        # Initialize priority and non-priority lists
-        self.top_priority_list = []
-        self.non_priority_list = []
-        self.last_priority_list = []
-        self.truck_one_list = []
-        self.truck_two_list = []
-        self.truck_three_list = []
+        self.truck2 = Truck(2, departure_time=9 * 60 + 5)  # Leaves once the delayed flight has arrived
+        self.truck3 = Truck(3, departure_time=ADDRESS_CORRECTION_TIME)  # Leaves once addresses are corrected
+        self.trucks = [self.truck1, self.truck2, self.truck3]
+        self.fleet_assigner = FleetAssigner()  # Engine used to split packages into truck loads
+        self.distance_matrix = None  # DistanceMatrix storing distances between addresses
+        self.distance_digest = None  # SHA-256 digest of the loaded distance CSV
+        self.address_resolver = None  # AddressResolver over the distance matrix addresses
+        self.neighbor_count = 16  # Number of nearest neighbors kept per node in neighbor_graph
+        self.neighbor_graph = None  # Nearest neighbors of every node, shared with the route engines
+        self.snapshot = None  # mmap of the snapshot file the state was loaded from, if any
+        self.snapshot_sections = None  # Dictionary mapping snapshot section name to its bytes
+        self.shortest_paths = None  # DistanceMatrix of all-pairs shortest path distances
+        self.shortest_path_predecessors = None  # Flat array of shortest path predecessors
+        self.route_optimizer = RouteOptimizer()  # Engine used to order stops into routes
+        self.hash_table = PackageHashTable()  # Hash table to store packages hashed by package_id
+        self.address_index = {}  # Dictionary mapping normalized address to the package ids at that address
+        self.package_store = None  # Optional columnar PackageStore, filled when loading with columnar=True
+        self.delivery_groups = DisjointSet()  # Co-delivery groups merged from 'Must be delivered with' notes
+        self.package_states = PackageStateTable()  # Lifecycle state of every package
         self.hub_address = "4001 SOUTH 700 EAST"  # Hub address
 
-    def load_packages(self, file_path):
+    def iter_package_chunks(self, file_path, chunk_size=1000, stats=None):
         """
-        Loads package data from a CSV file and inserts it into the hash table.
+        Streams package data from a CSV file, yielding validated Package objects in chunks so
+        memory use stays bounded however large the manifest is.
 
         Args:
             file_path (str): The path to the CSV file containing package data.
+            chunk_size (int): The maximum number of packages per chunk. Default is 1000.
+            stats (dict): Optional dictionary whose 'rows' and 'rejected' counts are updated while streaming.
+
+        Yields:
+            list: A list of Package objects.
         """
+        if stats is None:
+            stats = {}
+        stats.setdefault('rows', 0)
+        stats.setdefault('rejected', 0)
+
         # Open the CSV file in read mode
-        with open(file_path, mode='r') as file:
+        with open(file_path, mode='r', newline='') as file:
             # Initialize a flag to identify the start of package data
             flag = False
-            # Create a CSV reader object
-            csv_reader = csv.reader(file)
-            
+            chunk = []
+
             # Iterate through each row in the CSV file
-            for row in csv_reader:
+            for row in csv.reader(file):
                 # Check if the current row indicates the start of package data
-                if row[0] == "Package\nID":
-                    # Set the flag to True when the start is found
-                    flag = True
-                    print('true')
-                
-                # Check if the flag is True and the current row is not a header
-                if (row[0] != "Package\nID" and flag):
-                    # Create a Package object with the data from the row
-                    package = Package(*row[:8])
-                    
-                    # Insert the Package object into the hash table
-                    self.insert_into_hash_table(package)
-
-    def load_distance_data(self, filepath='distance_table.csv'):
+                if not flag:
+                    flag = bool(row) and " ".join(row[0].split()) == "Package ID"
+                    continue
+
+                # Validate and normalize the row, skipping rows that are not packages
+                fields = [field.strip() for field in row[:8]]
+                if len(fields) < 7 or not fields[0].isdigit() or not fields[1]:
+                    if any(fields):
+                        stats['rejected'] += 1
+                    continue
+                if len(fields) < 8 or not fields[7]:
+                    fields[7:] = [None]
+
+                # Create a Package object with the data from the row, rejecting unparseable deadlines or weights
+                try:
+                    chunk.append(Package(*fields))
+                except ValueError:
+                    stats['rejected'] += 1
+                    continue
+                stats['rows'] += 1
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+
+            if chunk:
+                yield chunk
+
+    def insert_packages(self, packages):
+        """
+        Inserts a batch of packages into the hash table.
+
+        Args:
+            packages (list): The Package objects to be inserted.
+        """
+        self.hash_table.reserve(len(self.hash_table) + len(packages))
+        for package in packages:
+            self.insert_into_hash_table(package)
+
+    def load_packages(self, file_path, chunk_size=1000, on_chunk=None, columnar=False, verbose=True):
+        """
+        Loads package data from a CSV file and inserts it into the hash table in chunks.
+
+        Args:
+            file_path (str): The path to the CSV file containing package data.
+            chunk_size (int): The number of packages inserted per batch. Default is 1000.
+            on_chunk (callable): Optional function called with each inserted chunk, for example
+                update_packages_with_notes, so later stages can overlap with loading.
+            columnar (bool): Whether to also fill the columnar package_store. Default is False.
+            verbose (bool): Whether to print the load statistics. Default is True.
+
+        Returns:
+            dict: The number of rows loaded and rejected, the elapsed seconds and the rows per second.
+        """
+        stats = {'rows': 0, 'rejected': 0}
+        start = time.perf_counter()
+
+        if columnar and self.package_store is None:
+            self.package_store = PackageStore()
+
+        for chunk in self.iter_package_chunks(file_path, chunk_size, stats):
+            # Insert the Package objects into the hash table
+            self.insert_packages(chunk)
+            if columnar:
+                self.package_store.append_packages(chunk, self.distance_matrix)
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+        stats['seconds'] = time.perf_counter() - start
+        stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        if verbose:
+            print(f"Loaded {stats['rows']} packages ({stats['rejected']} rows rejected) "
+                  f"at {stats['rows_per_second']:.0f} rows/second")
+        return stats
+
+    def load_distance_data(self, filepath='distance_table.csv', mapped_path=None, packed=False):
         """
         Loads distance data from a CSV file and populates the distance table.
 
         Args:
             filepath (str): The path to the CSV file containing distance data. Default is 'distance_table.csv'.
+            mapped_path (str): Optional path of a float32 memory-mapped matrix file to store the distances in,
+                for networks too large to hold in every process. Other processes can open it with
+                open_mapped_distance_matrix.
+            packed (bool): Whether the mapped matrix stores only the upper triangle. Default is False.
         """
         # List to store source values
         sources = []
 
+        # Hash the file contents so derived data such as shortest paths can be cached
+        with open(filepath, 'rb') as file:
+            self.distance_digest = hashlib.sha256(file.read()).hexdigest()
+
         # Read CSV file and populate the hash table
         with open(filepath, 'r') as file:
             flag = False
@@ -116,28 +2236,35 @@ class WGUPS:
                         # Strip any leading or trailing whitespace, convert to uppercase, and append to the list
                         sources.append(source.split('\n')[1].split(',')[0].strip().upper())
 
-                    # Create the 'Source' key in distance_table and initialize it as an empty dictionary
-                    self.distance_table['Source'] = {}
+                    # Intern every source address to a node index of the distance matrix
+                    if mapped_path is not None:
+                        self.distance_matrix = create_mapped_distance_matrix(mapped_path, sources, packed,
+                                                                             self.distance_digest)
+                    else:
+                        self.distance_matrix = DistanceMatrix(sources)
+                    self.address_resolver = AddressResolver(self.distance_matrix.addresses)
+                    source_nodes = [self.distance_matrix.node(source) for source in sources]
                 elif flag:
                     # Split the string at newline characters, take the second part
                     # Split the result at commas, take the first part
                     # Strip any leading or trailing whitespace, convert to uppercase, and assign to 'destination'
                     destination = row[0].split('\n')[1].split(',')[0].strip().upper()
+                    destination_node = self.distance_matrix.node(destination)
                     index = 0
 
                     # Iterate through each source
-                    for source in sources:
+                    for source_node in source_nodes:
                         try:
                             distance = row[2 + index]
                             float_value = float(distance)
 
                             # Check if the distance is greater than 0
                             if float_value > 0:
-                                # Append the distance to the 'Source' key in distance_table
-                                self.distance_table['Source'].setdefault(source, {})[destination] = float_value
+                                # Store the distance from source to destination
+                                self.distance_matrix.set(source_node, destination_node, float_value)
 
                                 # Add symmetric entry for destination to source with the same distance
-                                self.distance_table['Source'].setdefault(destination, {})[source] = float_value
+                                self.distance_matrix.set(destination_node, source_node, float_value)
                             else:
                                 # Handle case where distance is not greater than 0
                                 pass
@@ -149,6 +2276,17 @@ class WGUPS:
                     # Skip rows until the header row is found
                     pass
 
+        if mapped_path is not None:
+            self.distance_matrix.flush()
+        # Neighbors are found over the distances routes use, so build them once compute_shortest_paths
+        # has run, or when routing starts without shortest paths
+        self.neighbor_graph = self.route_optimizer.neighbor_graph = self.fleet_assigner.neighbor_graph = None
+
+        # Fill the node column of the columnar store now that addresses have node indices
+        if self.package_store is not None:
+            for package in self.hash_table:
+                self.package_store.update_package(package, self.distance_matrix)
+
     def insert_into_hash_table(self, package):
         """
         Inserts a package into the hash table.
@@ -156,20 +2294,43 @@ class WGUPS:
         Args:
             package (Package): The package object to be inserted.
         """
-        # Use package_id as the key for hashing
+        # Use package_id as the key for hashing, replacing any previous package with the same id
         key = package.package_id
-        index = hash(key) % 100
-        
-        # Check if the index exists in the hash_table
-        if index not in self.hash_table:
-            self.hash_table[index] = {key: package}
-        else:
-            # If the index exists, check if the key exists
-            if key in self.hash_table[index]:
-                # Handle collision by chaining (using a list to store multiple values at the same index)
-                self.hash_table[index][key].append(package)
-            else:
-                self.hash_table[index][key] = package
+        previous_package = self.hash_table.get(key)
+        if previous_package is not None:
+            self.unindex_package_address(key, previous_package.address)
+        self.hash_table.insert(key, package)
+        if self.package_states.state(key) is None:
+            self.package_states.add(key)
+
+        # Index the package by its address
+        self.index_package_address(key, package.address)
+
+    def index_package_address(self, package_id, address):
+        """
+        Adds a package id to the address index.
+
+        Args:
+            package_id (str): The package id to index.
+            address (str): The address of the package.
+        """
+        # Each entry is a dictionary used as an insertion-ordered set of package ids
+        self.address_index.setdefault(normalize_address(address), {})[package_id] = None
+
+    def unindex_package_address(self, package_id, address):
+        """
+        Removes a package id from the address index.
+
+        Args:
+            package_id (str): The package id to remove.
+            address (str): The address the package was indexed under.
+        """
+        key = normalize_address(address)
+        package_ids = self.address_index.get(key)
+        if package_ids and package_id in package_ids:
+            del package_ids[package_id]
+            if not package_ids:
+                del self.address_index[key]
 
     def look_up_package(self, address):
         """
@@ -181,17 +2342,11 @@ class WGUPS:
         Returns:
             list: A list of Package objects with matching addresses.
         """
-        # List to store matching packages
-        matching_packages = []
-
-        for index in self.hash_table:
-            for package_id, package in self.hash_table[index].items():
-                # Check if the address matches (case-insensitive)
-                if package.address.upper() == address.upper():
-                    matching_packages.append(package)
+        # Look up the package ids at the normalized address in the address index
+        package_ids = self.address_index.get(normalize_address(address), {})
 
         # Return the list of matching packages
-        return matching_packages
+        return [self.look_up_package_id(package_id) for package_id in package_ids]
 
     def look_up_package_id(self, package_id):
         """
@@ -203,40 +2358,29 @@ class WGUPS:
         Returns:
             Package or None: The Package object with the matching package_id, or None if not found.
         """
-        # Use package_id as the key for hashing
-        key = package_id
-        index = hash(key) % 100
-
-        # Check if the index exists in the hash_table
-        if index in self.hash_table and key in self.hash_table[index]:
-            # Return the package with the matching package_id
-            return self.hash_table[index][key]
-        else:
-            # Return None if the package_id is not found
-            return None
+        # Return the package with the matching package_id, or None if it is not found
+        return self.hash_table.get(package_id)
 
     def print_all_packages(self):
         """
         Prints information for all packages in the hash table.
         """
-        # Iterate through each index in the hash table
-        for index in self.hash_table:
-            # Iterate through each package_id and package in the current index
-            for package_id, package in self.hash_table[index].items():
-                # Print information for each package
-                print(f"Package ID: {package.package_id}")
-                print(f"Address: {package.address}")
-                print(f"City: {package.city}")
-                print(f"State: {package.state}")
-                print(f"Zip Code: {package.zip_code}")
-                print(f"Deadline: {package.deadline}")
-                print(f"Weight: {package.weight}")
-                print(f"Notes: {package.notes}")
-                print(f"Location: {package.location}")
-                print(f"No load before: {package.no_load_before}")
-                print(f"Required Truck: {package.required_truck}")
-                print(f"Package must accompany: {package.package_accompaniment}")
-                print("---")  # Separation between packages
+        # Iterate through each package in the hash table
+        for package in self.hash_table:
+            # Print information for each package
+            print(f"Package ID: {package.package_id}")
+            print(f"Address: {package.address}")
+            print(f"City: {package.city}")
+            print(f"State: {package.state}")
+            print(f"Zip Code: {package.zip_code}")
+            print(f"Deadline: {format_deadline(package.deadline)}")
+            print(f"Weight: {package.weight}")
+            print(f"Notes: {package.notes}")
+            print(f"Location: {package.location or self.hub_address}")
+            print(f"No load before: {package.no_load_before}")
+            print(f"Required Truck: {package.required_truck}")
+            print(f"Package must accompany: {package.package_accompaniment}")
+            print("---")  # Separation between packages
 
     def get_all_package_addresses(self):
         """
@@ -247,11 +2391,10 @@ class WGUPS:
         """
         all_addresses = []
 
-        for index in self.hash_table:
-            for package_id, package in self.hash_table[index].items():
-                address = package.address
-                if address:
-                    all_addresses.append(address)
+        for package_id, package in self.hash_table.items():
+            address = package.address
+            if address:
+                all_addresses.append(address)
 
         return all_addresses
 
@@ -262,363 +2405,523 @@ class WGUPS:
         Returns:
             list: A list of all packages.
         """
-        all_packages = []
-        
-        for index in self.hash_table:
-            for package in self.hash_table[index].items():
-                if not PackageNotFoundError:
-                                all_packages.append(package)
-        return all_packages
-                
+        return list(self.hash_table)
 
     def confirm_matching_addresses(self):
         """
-        Checks if all addresses of packages have matches in the distance table.
-        Returns the addresses that do not have matches, along with partial matches if present.
+        Checks if all addresses of packages have matches in the distance table. Packages whose
+        address matches a source partially or in another spelling are corrected to that source.
+
+        Returns:
+            AddressReport: The sources with no known distance to any other source, the corrected
+                addresses and the addresses with no match.
         """
-        # Create sets to store unique sources, destinations, and missing addresses
-        sources = []
-        destinations = []
-        missing_addresses = []
-
-        # Iterate through keys in the 'Source' column of the distance_table
-        for key in self.distance_table['Source'].keys():
-            sources.append(key)
-
-        # Iterate through values (dictionaries) in the 'Source' column of the distance_table
-        for value in self.distance_table['Source'].values():
-            # Iterate through keys in each dictionary (representing destinations)
-            for key in value.keys():
-                destinations.append(key)
-
-        # Check for sources that are not found in destinations
-        for source in sources:
-            if source not in destinations:
-                # Print a message and add the missing source to the set
-                print(source + ': this source has no matching destination in distance table.')
-                missing_addresses.append(source)
-            else:
-                pass  # Source found in destinations, no action needed
-
-        # Get all unique addresses from the package_table
-        addresses_set = self.get_all_package_addresses()
-
-        # Check for package addresses that are not found in distance_table
-        for address in addresses_set:
-            if address not in sources:
-                # Print a message and add the missing address to the set
-                print(address + ': this package address not found in distance table.')
-                missing_addresses.append(address)
-                
-                # Compare common words in the address and source for potential partial match
-                for source in sources:
-                    source_words = source.split()
-                    address_words = address.split()
-                    common_words = []
-                    for word in source_words:
-                        if word in address_words:
-                            common_words.append(word)
-                    
-                    # If more than 2 common words, consider it a partial match
-                    if len(common_words) > 2:
-                        print('PARTIAL MATCH: ' + address + ' : ' + source)
-                        # Look up package ID for the package with the bad address
-                        packages = self.look_up_package(address)
-            # Add request to update the address for the package
-                        # Update it to the partial match source address
-            # Add confirmation message
-                        for package in packages:
-                            self.edit_package_attribute(package.package_id, 'address', source)
-                            print(f"New address for package: {package.package_id} is {package.address}")
-            else:
-                pass  # Address found in sources, no action needed
+        matrix = self.distance_matrix
+        unconnected_sources = []
+        corrected = []
+        unmatched = []
+
+        # Check for sources that have no known distance to any other address
+        for node, source in enumerate(matrix.addresses):
+            if not any(distance < float('inf') for other, distance in enumerate(matrix.row(node)) if other != node):
+                unconnected_sources.append(source)
+
+        # Resolve each distinct package address once, correcting its packages when it is not verbatim
+        for address, package_ids in list(self.address_index.items()):
+            match = self.address_resolver.resolve(address)
+            if match is None:
+                unmatched.append(AddressMismatch(address, None, 0.0, list(package_ids)))
+                continue
+
+            node, score = match
+            source = matrix.addresses[node]
+            mismatched = [package_id for package_id in package_ids
+                          if self.look_up_package_id(package_id).address != source]
+            if mismatched:
+                for package_id in mismatched:
+                    self.edit_package_attribute(package_id, 'address', source)
+                corrected.append(AddressMismatch(address, source, score, mismatched))
+
+        return AddressReport(unconnected_sources, corrected, unmatched)
     
     def extract_delayed_time(self, text):
-        # Check if the string contains 'Delayed on flight'
-        if 'Delayed on flight' in text:
-            # Define a regex pattern to match time in the format hh:mm am/pm
-            time_pattern = re.compile(r'(\d{1,2}:\d{2} [APMapm]{2})')
-
-            # Search for the time pattern in the text
-            match = time_pattern.search(text)
-            if match:
-                # Return the extracted time
-                return match.group(1)
-
-        # Return None if 'Delayed on flight' is not found or no match is found
-        return None
+        # Return the time a delayed package arrives at the hub, or None
+        return parse_note(text).delay_time
 
     def extract_truck_id(self, text):
-        # Check if the string contains 'Can only be on truck'
-        if 'Can only be on truck' in text:
-            # Extract the numerical truck id using regex
-            truck_id_match = re.search(r'\d+', text)
-
-            if truck_id_match:
-                # Return the extracted numerical truck id
-                return int(truck_id_match.group())
-
-        # Return None if 'Can only be on truck' is not found or no match is found
-        return None
+        # Return the numerical id of the only truck that can carry the package, or None
+        return parse_note(text).required_truck
 
     def extract_package_ids(self, text):
-        # Check if the string contains 'Must be delivered with'
-        if 'Must be delivered with' in text:
-            # Extract comma-delimited numerical package ids using regex
-            package_ids_match = re.search(r'\d+(,\s*\d+)*', text)
-
-            if package_ids_match:
-                # Split the matched string by commas and convert to a list of integers
-                return [int(package_id) for package_id in package_ids_match.group().split(',')]
-
-        # Return an empty list if 'Must be delivered with' is not found or no match is found
-        return None
+        # Return the list of package ids the package must be delivered with, or None
+        delivered_with = parse_note(text).delivered_with
+        return list(delivered_with) if delivered_with is not None else None
     
     def edit_package_attribute(self, package_id, attribute_name, new_value):
         # Use package_id as the key for hashing
         key = package_id
-        index = hash(key) % 100
+        package = self.hash_table.get(key)
 
-        # Check if the index exists in the hash_table
-        if index in self.hash_table and key in self.hash_table[index]:
-            # Get the package from the hash table
-            package = self.hash_table[index][key]
+        # Check if the package exists in the hash_table
+        if package is not None:
             # Check if the attribute exists in the package
             if hasattr(package, attribute_name):
+                # Keep the address index consistent when the address changes
+                if attribute_name == 'address':
+                    self.unindex_package_address(key, package.address)
+                    self.index_package_address(key, new_value)
                 # Update the attribute with the new value
                 setattr(package, attribute_name, new_value)
+                # Keep the columnar store consistent with the package
+                if self.package_store is not None and key in self.package_store.row_index:
+                    self.package_store.update_package(package, self.distance_matrix)
             else:
                 print(f"Error: Package does not have attribute '{attribute_name}'")
         else:
             print(f"Error: Package with package_id '{package_id}' not found in the hash table")
 
 
-    def update_packages_with_notes(self):
+    def update_packages_with_notes(self, packages=None):
         """
         Make changes to package attributes based on package notes
+
+        Args:
+            packages (list): The packages to update. Default is every package in the hash table.
         """
-        for index in self.hash_table:
-            for package_id, package in self.hash_table[index].items():
-                note = package.notes
-
-                # Extract and update 'no_load_before' attribute
-                if note is not None:
-                    try:
-                        no_load_before = self.extract_delayed_time(note.strip())
-                        self.edit_package_attribute(package_id, 'no_load_before', no_load_before)
-                    except TypeError as e:
-                        pass
-
-                    # Extract and update 'required_truck' attribute
-                    try:
-                        required_truck = self.extract_truck_id(note)
-                        self.edit_package_attribute(package_id, 'required_truck', required_truck)
-                    except TypeError as e:
-                        pass
-
-                    # Extract and update 'package_accompaniment' attribute
-                    try:
-                        package_accompaniment = self.extract_package_ids(note)
-                        self.edit_package_attribute(package_id, 'package_accompaniment', package_accompaniment)
-                    except TypeError as e:
-                        pass
-        
-    def optimize_delivery_route_for_all_packages(self):
+        if packages is None:
+            packages = self.hash_table
+        for package in packages:
+            # Parse the note once and apply every constraint directly to the package
+            constraints = parse_note(package.notes)
+            package.no_load_before = constraints.delay_time
+            package.required_truck = constraints.required_truck
+            package.package_accompaniment = constraints.delivered_with
+
+            # Merge the package into one co-delivery group with every package it must be delivered with
+            self.delivery_groups.add(package.package_id)
+            for other_id in constraints.delivered_with or ():
+                self.delivery_groups.union(package.package_id, str(other_id))
+
+            # Keep the columnar store consistent with the package
+            if self.package_store is not None and package.package_id in self.package_store.row_index:
+                self.package_store.update_package(package, self.distance_matrix)
+
+    def apply_address_corrections(self, current_time):
         """
-        Use Dijkstra's algorithm to optimize the delivery route of packages.
-        Returns a list of package IDs in the optimal delivery order.
+        Corrects the address of every package whose note says its address is wrong, once the
+        correction is known at ADDRESS_CORRECTION_TIME. The packages stay unready until then, see
+        make_load_unit, so only trucks leaving after the correction can carry them.
+
+        Args:
+            current_time (int): The time in minutes since midnight.
+
+        Returns:
+            list: The package IDs whose address was changed.
+        """
+        if current_time < ADDRESS_CORRECTION_TIME:
+            return []
+
+        corrected = []
+        for package_id, (address, city, state, zip_code) in ADDRESS_CORRECTIONS.items():
+            package = self.look_up_package_id(package_id)
+            if package is None or not parse_note(package.notes).wrong_address or package.address == address:
+                continue
+            self.edit_package_attribute(package_id, 'city', city)
+            self.edit_package_attribute(package_id, 'state', state)
+            self.edit_package_attribute(package_id, 'zip_code', zip_code)
+            self.edit_package_attribute(package_id, 'address', address)
+            corrected.append(package_id)
+        return corrected
+
+    def compute_shortest_paths(self, cache_dir='.wgups_cache'):
+        """
+        Computes the all-pairs shortest paths of the distance matrix once, reusing a cache file
+        keyed by the distance CSV's content hash when one exists. The shortest paths of a
+        MappedDistanceMatrix are mapped files next to its own file instead, and are not cached.
+
+        Args:
+            cache_dir (str): The directory holding cache files, or None to disable caching. Default is '.wgups_cache'.
+        """
+        if isinstance(self.distance_matrix, MappedDistanceMatrix):
+            # The closure of a mapped matrix is written to mapped files beside it, never read into memory from the cache
+            self.shortest_paths, self.shortest_path_predecessors = self.distance_matrix.shortest_paths()
+            self.build_neighbor_graph()
+            return
+
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(cache_dir, f"shortest_paths_{self.distance_digest}.bin")
+            cached = load_shortest_paths(cache_path, self.distance_digest, self.distance_matrix)
+            if cached is not None:
+                self.shortest_paths, self.shortest_path_predecessors = cached
+                self.build_neighbor_graph()
+                return
+
+        self.shortest_paths, self.shortest_path_predecessors = self.distance_matrix.shortest_paths()
+        if cache_path is not None:
+            save_shortest_paths(cache_path, self.distance_digest, self.shortest_paths, self.shortest_path_predecessors)
+        self.build_neighbor_graph()
+
+    def build_neighbor_graph(self):
+        """
+        Precomputes the neighbor_count nearest neighbors of every node over the distances routes use,
+        and hands them to the route optimizer and fleet assigner so their moves and insertions only
+        consider nearby stops. compute_shortest_paths builds it over the closure, and routing builds
+        it when none has been built yet, for example after use_distance_data or load_snapshot.
+        """
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        self.neighbor_graph = matrix.nearest_neighbors(self.neighbor_count)
+        self.route_optimizer.neighbor_graph = self.neighbor_graph
+        self.fleet_assigner.neighbor_graph = self.neighbor_graph
+
+    def save_snapshot(self, file_path):
+        """
+        Saves the prepared state, after addresses have been confirmed and notes applied, to a
+        snapshot file: the distance matrix and its shortest paths, the package columns and text,
+        the co-delivery groups, and the packages loaded onto each truck in route order, so package
+        states are restored along with the loads they refer to. See load_snapshot.
+
+        Args:
+            file_path (str): The path of the snapshot file.
+
+        Raises:
+            ValueError: If the distances are a MappedDistanceMatrix, which is already a file that
+                open_mapped_distance_matrix maps and would have to be copied into memory to snapshot.
+        """
+        if isinstance(self.distance_matrix, MappedDistanceMatrix):
+            raise ValueError("snapshots store in-memory distances; open a mapped matrix with "
+                             "open_mapped_distance_matrix instead")
+        store = self.package_store
+        if store is None:
+            store = PackageStore(len(self.hash_table))
+            store.append_packages(list(self.hash_table), self.distance_matrix)
+            # A new store has every package at the hub, so copy the tracked states into it
+            for state in PackageState:
+                package_ids = list(self.package_states.view(state))
+                if package_ids:
+                    store.set_status(package_ids, state)
+        columns = store.view()
+
+        # Package ids in row order, and the row of each package's group root
+        package_ids = [None] * store.count
+        for package_id, row in store.row_index.items():
+            package_ids[row] = package_id
+        groups = array('q', (store.row_index.get(self.group_id(package_id), row)
+                             for row, package_id in enumerate(package_ids)))
+
+        # Text fields of every package, each followed by a NUL byte, with the offset where each one starts
+        text = bytearray()
+        text_offsets = array('q')
+        for package_id in package_ids:
+            package = self.look_up_package_id(package_id)
+            for field in SNAPSHOT_TEXT_FIELDS:
+                text_offsets.append(len(text))
+                text += (getattr(package, field) or '').encode() + b'\0'
+
+        # Rows of the packages on each truck in route order, and the number of packages on each truck
+        truck_rows = array('q', (store.row_index[package_id] for truck in self.trucks for package_id in truck.packages))
+        truck_sizes = array('q', (len(truck.packages) for truck in self.trucks))
+
+        closure = self.shortest_paths.distances if self.shortest_paths is not None else array('d')
+        predecessors = self.shortest_path_predecessors if self.shortest_path_predecessors is not None else array('i')
+        write_sections(file_path, {
+            'digest': bytes.fromhex(self.distance_digest) if self.distance_digest else b'',
+            'addresses': '\n'.join(self.distance_matrix.addresses).encode(),
+            'distances': self.distance_matrix.distances,
+            'closure': closure,
+            'predecessors': predecessors,
+            'columns': np.ascontiguousarray(columns).view(np.uint8),
+            'groups': groups,
+            'text_offsets': text_offsets,
+            'text': text,
+            'truck_rows': truck_rows,
+            'truck_sizes': truck_sizes,
+        })
+
+    def load_snapshot(self, file_path, materialize=True):
+        """
+        Restores the prepared state saved by save_snapshot. The distance matrices and package columns
+        are views of the mapped file rather than copies, so without materializing packages a warm start
+        takes constant time however large the manifest is, and processes loading the same snapshot share
+        its pages.
+
+        Args:
+            file_path (str): The path of the snapshot file.
+            materialize (bool): Whether to rebuild the Package objects, hash table, address index, package
+                states, co-delivery groups and truck loads. Without them only the distance data and the
+                columnar package_store are available until materialize_packages is called. Default is True.
+
+        Raises:
+            ValueError: If the file is not a valid snapshot, see map_sections, or lacks a section.
+        """
+        self.snapshot, self.snapshot_sections = map_sections(file_path)
+        sections = self.snapshot_sections
+        missing = [name for name in SNAPSHOT_SECTIONS if name not in sections]
+        if missing:
+            raise ValueError(f"{file_path} is missing snapshot sections {missing}")
+
+        matrix = DistanceMatrix(bytes(sections['addresses']).decode().split('\n'), sections['distances'].cast('d'))
+        shortest_paths = None
+        predecessors = None
+        if len(sections['closure']):
+            shortest_paths = DistanceMatrix(matrix.addresses, sections['closure'].cast('d'))
+            predecessors = sections['predecessors'].cast('i')
+        digest = bytes(sections['digest']).hex() or None
+        self.use_distance_data(matrix, digest, shortest_paths, predecessors)
+
+        self.package_store = PackageStore(1)
+        self.package_store.attach_columns(np.frombuffer(sections['columns'], dtype=self.package_store.dtype))
+
+        if materialize:
+            self.materialize_packages()
+
+    def materialize_packages(self):
+        """
+        Rebuilds the Package objects, the structures indexing them and the truck loads from a loaded snapshot.
         """
+        sections = self.snapshot_sections
+        columns = self.package_store.view()
+        # Split every text field at once, the offsets are only needed for random access
+        fields = bytes(sections['text']).decode().split('\0')
+        groups = sections['groups'].cast('q')
+        field_count = len(SNAPSHOT_TEXT_FIELDS)
+
+        # Read the columns as Python lists once rather than element by element
+        deadlines = columns['deadline'].tolist()
+        weights = columns['weight'].tolist()
+        no_load_before = columns['no_load_before'].tolist()
+        required_trucks = columns['required_truck'].tolist()
+        statuses = columns['status'].tolist()
+
+        packages = []
+        for row in range(len(deadlines)):
+            package_id, address, city, state, zip_code, notes = fields[row * field_count:(row + 1) * field_count]
+            package = Package(package_id, address, city, state, zip_code, format_deadline(deadlines[row]),
+                              weights[row], notes or None)
+            package.no_load_before = format_deadline(no_load_before[row]) if no_load_before[row] >= 0 else None
+            package.required_truck = required_trucks[row] or None
+            package.package_accompaniment = parse_note(package.notes).delivered_with
+            packages.append(package)
+        self.insert_packages(packages)
+
+        for package, status in zip(packages, statuses):
+            if status != PackageState.UNASSIGNED:
+                self.package_states.set_state(package.package_id, PackageState(status))
+
+        # Point every package directly at its group root
+        self.delivery_groups = DisjointSet()
+        for package, root in zip(packages, groups):
+            root_id = packages[root].package_id
+            self.delivery_groups.parent[package.package_id] = root_id
+            self.delivery_groups.size[root_id] = self.delivery_groups.size.get(root_id, 0) + 1
+
+        # Reload each truck with its packages in route order
+        truck_rows = sections['truck_rows'].cast('q')
+        start = 0
+        for truck, size in zip(self.trucks, sections['truck_sizes'].cast('q')):
+            self.set_truck_route(truck, [packages[row].package_id for row in truck_rows[start:start + size]])
+            start += size
+
+    def shortest_path_tree(self, source_node):
+        """
+        Find the shortest paths from a node. Uses the precomputed all-pairs shortest paths when
+        available, otherwise runs Dijkstra's algorithm over the distance matrix.
+
+        Args:
+            source_node (int): The node index to start from.
 
-        # Get all package addresses
-        all_addresses = self.get_all_package_addresses()
+        Returns:
+            list: The previous node on the shortest path to each node, indexed by node.
+        """
+        matrix = self.distance_matrix
+        if self.shortest_path_predecessors is not None:
+            start = source_node * matrix.size
+            return [None if node < 0 else int(node)
+                    for node in self.shortest_path_predecessors[start:start + matrix.size]]
 
-        # Initialize distance and previous dictionaries for Dijkstra's algorithm
-        distances = {address: float('inf') for address in all_addresses}
-        previous = {address: None for address in all_addresses}
-        distances[self.hub_address] = 0
+        distances = [float('inf')] * matrix.size
+        previous = [None] * matrix.size
+        distances[source_node] = 0
 
         # Priority queue for Dijkstra's algorithm
-        priority_queue = [(0, self.hub_address)]
+        priority_queue = [(0, source_node)]
 
         while priority_queue:
-            current_distance, current_address = heapq.heappop(priority_queue)
+            current_distance, current_node = heapq.heappop(priority_queue)
 
-            if current_distance > distances[current_address]:
+            if current_distance > distances[current_node]:
                 continue
 
-            for neighbor, weight in self.distance_table['Source'][current_address].items():
+            for neighbor, weight in enumerate(matrix.row(current_node)):
                 new_distance = current_distance + weight
-                try:
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        previous[neighbor] = current_address
-                        heapq.heappush(priority_queue, (new_distance, neighbor))
-                except KeyError as e:
-                    print(f"Error: {e} while looking up distance in distance table")
-                    exit(1)
-
-        # Reconstruct the optimal route by backtracking from the destination to the hub
-        optimal_route = []
-        for address in all_addresses:
-            current_address = address
-            while current_address != self.hub_address:
-                optimal_route.append(current_address)
-                current_address = previous[current_address]
-
-        # Reverse the route to get the starting from the hub
-        optimal_route.reverse()
-
-        # package_idsConvert addresses to package IDs
-        package_ids = []
-        for address in optimal_route:
-            try:
-                matching_packages = self.look_up_package(address)
-                if matching_packages:
-                    package_ids.extend(package.package_id for package in matching_packages)
-            except KeyError as e:
-                print(f"Error: {e} while matching addresses in package table")
-                exit(1)   
-
-        return package_ids  # Return the package IDs
-        
-    def get_distance(self, source, destination):
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current_node
+                    heapq.heappush(priority_queue, (new_distance, neighbor))
+
+        return previous
+
+    def route_package_ids(self, package_ids, start_node, end_node, departure_time=None):
         """
-        Return the distance between two addresses
+        Orders packages into a delivery route using the route optimizer. Packages sharing an
+        address are delivered at the same stop.
+
+        Args:
+            package_ids (list): The package IDs to order.
+            start_node (int): The node index the route starts from.
+            end_node (int): The node index the route ends at.
+            departure_time (int): Optional time the route starts in minutes since midnight. When given,
+                package deadlines are treated as hard time windows.
+
+        Returns:
+            list: The package IDs in route order.
         """
-        return self.distance_table['Source'][source][destination]    
+        stops = self.group_stops(package_ids)
 
-    def optimize_truck_route(self, truck):
+        # Route over shortest path distances when they have been computed
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        if self.neighbor_graph is None:
+            self.build_neighbor_graph()
+        route = solve_route_task(self.route_optimizer, matrix,
+                                 self.route_task(stops, start_node, end_node, departure_time))
+
+        return [package_id for node in route for package_id in stops[node]]
+
+    def route_task(self, stops, start_node, end_node, departure_time=None):
         """
-        Use Dijkstra's algorithm to optimize the delivery route of packages for loaded truck.
-        Returns a list of package IDs in the optimal delivery order.
+        Builds the route optimizer task for stops grouped by group_stops.
+
+        Returns:
+            tuple: The start node, stop nodes and end node, followed by the deadline of each stop and
+                the departure time when departure_time is given.
         """
-        all_addresses = []
-        # Get all package addresses
-        packages = truck.packages
+        if departure_time is None:
+            return start_node, list(stops), end_node
+        # A stop is due by the earliest deadline of the packages delivered there
+        deadlines = [min(self.look_up_package_id(package_id).deadline for package_id in package_ids)
+                     for package_ids in stops.values()]
+        return start_node, list(stops), end_node, deadlines, departure_time
+
+    def group_stops(self, package_ids):
+        """
+        Groups packages by the distance matrix node of their address. Packages whose address is not
+        in the distance matrix cannot be routed and are left out.
 
-        for package_id in packages:
-            package = self.look_up_package_by_id(package_id)
-            all_addresses.append(package.address)
+        Args:
+            package_ids (list): The package IDs to group.
 
-        # Initialize distance and previous dictionaries for Dijkstra's algorithm
-        distances = {address: float('inf') for address in all_addresses}
-        previous = {address: None for address in all_addresses}
-        distances[self.hub_address] = 0
+        Returns:
+            dict: The package IDs at each node, with nodes in order of first appearance.
+        """
+        stops = {}
+        node_index = self.distance_matrix.node_index
+        for package_id in package_ids:
+            node = node_index.get(self.look_up_package_id(package_id).address)
+            if node is not None:
+                stops.setdefault(node, []).append(package_id)
+        return stops
 
-        # Priority queue for Dijkstra's algorithm
-        priority_queue = [(0, self.hub_address)]
+    def optimize_delivery_route_for_all_packages(self):
+        """
+        Optimize the delivery route of all packages as a single route from the hub back to the hub.
+        Returns a list of package IDs in the optimal delivery order.
+        """
+        hub_node = self.distance_matrix.node(self.hub_address)
+        return self.route_package_ids(list(self.hash_table.keys()), hub_node, hub_node)
 
-        while priority_queue:
-            current_distance, current_address = heapq.heappop(priority_queue)
+    def get_distance(self, source, destination):
+        """
+        Return the distance between two addresses, over shortest paths when they have been computed
+        """
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        return matrix.distance(source, destination)
 
-            if current_distance > distances[current_address]:
-                continue
+    def optimize_truck_route(self, truck):
+        """
+        Optimize the delivery route of packages for loaded truck, from the hub back to the hub.
+        Sets the truck's package IDs in the optimal delivery order.
+        """
+        hub_node = self.distance_matrix.node(self.hub_address)
+        self.set_truck_route(truck, self.route_package_ids(truck.packages, hub_node, hub_node))
 
-            for neighbor, weight in self.distance_table['Source'][current_address].items():
-                new_distance = current_distance + weight
-                try:
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        previous[neighbor] = current_address
-                        heapq.heappush(priority_queue, (new_distance, neighbor))
-                except KeyError as e:
-                    print(f"Error: {e} while looking up distance in distance table")
-                    exit(1)
-
-        # Reconstruct the optimal route by backtracking from the destination to the hub
-        optimal_route = []
-        for address in all_addresses:
-            current_address = address
-            while current_address != self.hub_address:
-                optimal_route.append(current_address)
-                current_address = previous[current_address]
-
-        # Reverse the route to get the starting from the hub
-        optimal_route.reverse()
-
-        # Convert addresses to package IDs
-        package_ids = []
-        for address in optimal_route:
-            try:
-                matching_packages = self.look_up_package(address)
-                if matching_packages:
-                    package_ids.update(package.package_id for package in matching_packages)
-            except KeyError as e:
-                print(f"Error: {e} while matching addresses in package table")
-                exit(1)   
-
-        truck.packages = package_ids
+    def optimize_truck_routes(self, workers=1, time_windows=False, trucks=None):
+        """
+        Optimize the delivery route of every loaded truck, from the hub back to the hub. Routes are
+        independent once the loads are fixed, so with more than one worker they are optimized in a
+        process pool sharing the distance matrix. The routes are the same for any number of workers.
+
+        Args:
+            workers (int): The number of worker processes, or None for one per CPU. Default is 1,
+                which optimizes the routes in this process.
+            time_windows (bool): Whether to treat package deadlines as hard time windows, starting
+                each route at its truck's departure time. Default is False.
+            trucks (list): The trucks to optimize. Default is every truck.
+        """
+        if trucks is None:
+            trucks = self.trucks
+        if self.neighbor_graph is None:
+            self.build_neighbor_graph()
+        hub_node = self.distance_matrix.node(self.hub_address)
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        truck_stops = [self.group_stops(truck.packages) for truck in trucks]
+        tasks = [self.route_task(stops, hub_node, hub_node, truck.departure_time if time_windows else None)
+                 for truck, stops in zip(trucks, truck_stops)]
+
+        if workers == 1 or len(tasks) < 2:
+            routes = [solve_route_task(self.route_optimizer, matrix, task) for task in tasks]
+        else:
+            routes = optimize_routes_parallel(matrix, self.route_optimizer, tasks, workers)
+
+        for truck, stops, route in zip(trucks, truck_stops, routes):
+            self.set_truck_route(truck, [package_id for node in route for package_id in stops[node]])
 
     # MODIFIED TO TAKE POSITION INTO ACCOUNT    
     def optimize_package_list_route(self, packages, current_location):
         """
-        Use Dijkstra's algorithm to optimize the delivery route of packages for loaded truck.
+        Optimize the delivery route of packages from the truck's current location back to the hub.
         
         Args:
             packages (list): A list of package IDs to be delivered.
+            current_location (str): The address the route starts from.
             
         Returns:
-            set: A set of package IDs in the optimal delivery order.
+            list: A list of package IDs in the optimal delivery order.
         """
-        all_addresses = []
-
-        # Populate all_addresses with package addresses
-        for package_id in packages:
-            package = self.look_up_package_by_id(package_id)
-            all_addresses.append(package.address)
-
-        # Initialize distance and previous dictionaries for Dijkstra's algorithm
-        distances = {address: float('inf') for address in all_addresses}
-        previous = {address: None for address in all_addresses}
-        distances[self.hub_address] = 0
-
-        # Priority queue for Dijkstra's algorithm
-        priority_queue = [(0, current_location)]
+        return self.route_package_ids(packages, self.distance_matrix.node(current_location),
+                                      self.distance_matrix.node(self.hub_address))
+            
+    def append_package_to_truck(self, truck, package_id):
+        """
+        Appends a package to a truck's route, measuring the new leg from the truck's last stop over the
+        same distances the route optimizer plans with.
 
-        while priority_queue:
-            current_distance, current_address = heapq.heappop(priority_queue)
+        Args:
+            truck (Truck): The truck to load.
+            package_id (str): The package ID to append.
+        """
+        node = self.distance_matrix.node(self.look_up_package_id(package_id).address)
+        previous_node = truck.last_node
+        if previous_node is None:
+            previous_node = self.distance_matrix.node(self.hub_address)
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        truck.append_package(package_id, node, matrix.get(previous_node, node))
+
+    def set_truck_route(self, truck, package_ids):
+        """
+        Replaces a truck's route with the given package IDs and rebuilds its running route length.
 
-            if current_distance > distances[current_address]:
-                continue
+        Args:
+            truck (Truck): The truck to update.
+            package_ids (list): The package IDs in route order.
+        """
+        truck.clear_route()
+        for package_id in package_ids:
+            self.append_package_to_truck(truck, package_id)
 
-            for neighbor, weight in self.distance_table['Source'][current_address].items():
-                new_distance = current_distance + weight
-                try:
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        previous[neighbor] = current_address
-                        heapq.heappush(priority_queue, (new_distance, neighbor))
-                except KeyError as e:
-                    print(f"Error: {e} while looking up distance in distance table")
-                    exit(1)
-
-        # Reconstruct the optimal route by backtracking from the destination to the hub
-        optimal_route = []
-        for address in all_addresses:
-            current_address = address
-            while current_address != self.hub_address:
-                optimal_route.append(current_address)
-                current_address = previous[current_address]
-
-        # Reverse the route to get the starting from the hub
-        optimal_route.reverse()
-
-        # Convert addresses to package IDs
-        package_ids = []
-        for address in optimal_route:
-            try:
-                matching_packages = self.look_up_package(address)
-                if matching_packages:
-                    package_ids.update(package.package_id for package in matching_packages)
-            except KeyError as e:
-                print(f"Error: {e} while matching addresses in package table")
-                exit(1)   
-
-        return package_ids
-            
     def calculate_truck_distance(self, truck):
         """
-        Calculate the total distance traveled by a truck
+        Calculate the total distance traveled by a truck by walking its whole route.
+        The truck keeps a running route_length, so this is only used to verify it.
         """
 
         # Initialize the total distance to 0
@@ -642,162 +2945,496 @@ class WGUPS:
         # Return the total distance
         return total_distance
 
-    def sort_packages(self, package_ids):
-        # Iterate over the sorted package list
+    def build_load_units(self, package_ids=None):
+        """
+        Groups packages into load units by co-delivery group, carrying the group's combined constraints.
+
+        Args:
+            package_ids (list): The package IDs to group. Default is every package in the hash table.
+
+        Returns:
+            list: The LoadUnit groups.
+
+        Raises:
+            ValueError: If packages in one group are restricted to different trucks.
+        """
+        if package_ids is None:
+            package_ids = list(self.hash_table.keys())
+
+        # Collect each co-delivery group, in the order its first package appears
+        groups = {}
         for package_id in package_ids:
-            # Look up the package by its ID
-            package = self.look_up_package_id(package_id)
+            groups.setdefault(self.group_id(package_id), []).append(package_id)
 
-            # If the package has a deadline and it's not end of day
-            if package.deadline is not None and package.deadline != 'EOD':
-                # Add the package to the first priority list
-                self.top_priority_list.append(package_id)
-                # If the package has accompaniments, add them to the non-priority list
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.non_priority_list.append(package_id)
-
-            # If the package has a specific load time
-            elif package.no_load_before is not None:
-                # Add the package to the last priority list
-                self.last_priority_list.append(package_id)
-
-                # If the package has accompaniments, add them to the non-priority list
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.non_priority_list.append(package_id)
-
-            # If the package is required by truck 1
-            elif package.required_truck == 1:
-                # Add the package to truck 1
-                self.truck_one_list.append(package_id)
-
-                # If the package has accompaniments, add them to truck 1 as well
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.truck_one_list.append(package_id)
-
-            # If the package is required by truck 2
-            elif package.required_truck == 2:
-                # Add the package to truck 2
-                self.truck_two_list.append(package_id)
-
-                # If the package has accompaniments, add them to truck 2 as well
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.truck_two_list.append(package_id)
-
-            # If the package is required by truck 3
-            elif package.required_truck == 3:
-                # Add the package to truck 3
-                self.truck_three_list.append(package_id)
-
-                # If the package has accompaniments, add them to truck 3 as well
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.truck_three_list.append(package_id)
-
-            # If the package's deadline is end of day
-            elif package.deadline == 'EOD':
-                # Add the package to the non-priority list
-                self.non_priority_list.append(package_id)
-
-                # If the package has accompaniments, add them to the non-priority list as well
-                if package.package_accompaniment is not None:
-                    for package_id in package.package_accompaniment:
-                        self.non_priority_list.append(package_id)
-
-            # If the package doesn't fit any of the above conditions, add it to the last priority list
-            else:
-                self.non_priority_list.append(package_id)
-                for package_id in package.package_accompaniment:
-                    self.last_priority_list.append(package_id)
-                    self.non_priority_list.append(package_id)
+        return [self.make_load_unit(group) for group in groups.values()]
+
+    def group_id(self, package_id):
+        """
+        Returns the id of a package's co-delivery group. Packages without a group are their own group.
+        """
+        if package_id in self.delivery_groups:
+            return self.delivery_groups.find(package_id)
+        return package_id
+
+    def make_load_unit(self, package_ids):
+        """
+        Combines the constraints of a group of packages into a LoadUnit. The node of a package whose
+        address is not in the distance matrix is None.
+        """
+        packages = [self.look_up_package_id(package_id) for package_id in package_ids]
+        required_trucks = {package.required_truck for package in packages if package.required_truck is not None}
+        if len(required_trucks) > 1:
+            raise ValueError(f"Packages {package_ids} must be delivered together but require trucks {required_trucks}")
+
+        ready_time = DAY_START
+        for package in packages:
+            if package.no_load_before is not None:
+                ready_time = max(ready_time, parse_deadline(package.no_load_before))
+            if parse_note(package.notes).wrong_address:
+                ready_time = max(ready_time, ADDRESS_CORRECTION_TIME)
+
+        return LoadUnit(
+            package_ids=list(package_ids),
+            nodes=[self.distance_matrix.node_index.get(package.address) for package in packages],
+            required_truck=required_trucks.pop() if required_trucks else None,
+            ready_time=ready_time,
+            deadline=min(package.deadline for package in packages),
+        )
 
     # MODIFY TO TAKE TRUCK POSITION INTO ACCOUNT
     def add_packages_to_truck(self, package_ids, truck):
-        # Iterate over the package IDs
-        if len(truck.packages) > 0:
-            current_address = self.look_up_package_id(truck.packages[-1]).address
-        elif len(truck.packages) == 0:
+        # Start from the truck's last stop, or the hub if it is empty
+        if truck.last_node is not None:
+            current_address = self.distance_matrix.addresses[truck.last_node]
+        else:
             current_address = self.hub_address
         # Optimize the packages as a route
         package_ids = self.optimize_package_list_route(package_ids, current_address) # may be unnecessary
         for package_id in package_ids:
             # Check if the truck has space and if it hasn't exceeded its distance restriction
-            if len(truck.packages) < truck.max_capacity and self.calculate_truck_distance(truck) < truck.distance_restriction:            
+            if len(truck.packages) < truck.max_capacity and truck.route_length < truck.distance_restriction:
                 # Add the package to the truck
-                truck.packages.append(package_id)
-                # Add the package to the loaded packages set
-                self.loaded_packages.a(package_id)
+                self.append_package_to_truck(truck, package_id)
                 # If the truck distance exceeds the restriction after adding the package, remove it
-                if self.calculate_truck_distance(truck) > truck.distance_restriction:
-                    truck.packages.remove(package_id)
-                    self.loaded_packages.remove(package_id)
-        # Remove the loaded packages from the lists
-        self.remove_loaded_packages_from_lists()
-
-    def remove_loaded_packages_from_lists(self):
-        # Iterate over the loaded packages
-        for package_id in self.loaded_packages:
-            # Remove the package from the list it belongs to
-            if package_id in self.first_priority_list:
-                self.first_priority_list.remove(package_id)
-            elif package_id in self.non_priority_list:
-                self.non_priority_list.remove(package_id)
-            elif package_id in self.last_priority_list:
-                self.last_priority_list.remove(package_id)
-            elif package_id in self.truck_one_list:
-                self.truck_one_list.remove(package_id)
-            elif package_id in self.truck_two_list:
-                self.truck_two_list.remove(package_id)
-            elif package_id in self.truck_three_list:
-                self.truck_three_list.remove(package_id)
-            else:
-                pass
+                if truck.route_length > truck.distance_restriction:
+                    truck.remove_last_package()
+                else:
+                    # Mark the package as loaded
+                    self.set_package_state(package_id, PackageState.LOADED)
+
+    def set_package_state(self, package_id, state):
+        """
+        Moves a package to a new lifecycle state, keeping the columnar store consistent.
+
+        Args:
+            package_id (str): The package ID to update.
+            state (PackageState): The new state.
+        """
+        self.package_states.set_state(package_id, state)
+        if self.package_store is not None and package_id in self.package_store.row_index:
+            self.package_store.set_status([package_id], state)
+
+    def unassigned_packages(self):
+        """
+        Returns a live view of the ids of packages not yet assigned to a truck.
+        """
+        return self.package_states.view(PackageState.UNASSIGNED)
+
+    def load_trucks(self, workers=1, time_windows=False):
+        """
+        Assigns every unassigned package to a truck with the fleet assigner and orders each load into a route.
+        Packages already loaded stay on their trucks, so calling it again only places new packages.
+
+        Args:
+            workers (int): The number of processes used to optimize the routes, see optimize_truck_routes.
+            time_windows (bool): Whether routes must meet package deadlines, see optimize_truck_routes.
 
-    def load_trucks(self):
-        # Split the priority list into two halves
-        first_half_length = len(self.priority_list) // 2
-        first_priority_list = self.top_priority_list[:first_half_length]
-        second_priority_list = self.top_priority_list[first_half_length:]
+        Returns:
+            list: The LoadUnit groups that could not be placed on any truck, including groups with a
+                package whose address is not in the distance matrix.
+        """
+        # Wrong-address packages can only go on trucks leaving after the correction, so plan with it applied
+        self.apply_address_corrections(max(truck.departure_time for truck in self.trucks))
+        if self.neighbor_graph is None:
+            self.build_neighbor_graph()
+        hub_node = self.distance_matrix.node(self.hub_address)
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        units = self.build_load_units(list(self.unassigned_packages()))
+        # Groups with an address missing from the distance table cannot be routed, so they stay unassigned
+        routable = [unit for unit in units if None not in unit.nodes]
+        loads, unassigned = self.fleet_assigner.assign(matrix, hub_node, self.trucks, routable)
+        unassigned += [unit for unit in units if None in unit.nodes]
+
+        # Add the new packages to each truck's route, keeping the packages it already carries
+        changed = [truck for truck in self.trucks if loads[truck.truck_id]]
+        for truck in changed:
+            self.set_truck_route(truck, truck.packages + loads[truck.truck_id])
+            for package_id in loads[truck.truck_id]:
+                self.set_package_state(package_id, PackageState.LOADED)
+        # Only trucks whose load changed are routed again
+        self.optimize_truck_routes(workers, time_windows, changed)
+        return unassigned
+
+    def route_optimality_gaps(self):
+        """
+        Compares the route each loaded truck actually drives with the shortest route through the same
+        stops, from the hub back to the hub, ignoring deadlines. The difference is what the routing
+        heuristics and deadlines cost. The exact route takes exponential time in the number of stops,
+        so trucks with more than the route optimizer's exact_stop_limit stops are skipped.
+
+        Returns:
+            list: The (truck_id, stop count, route miles, shortest miles) of each compared truck.
+        """
+        hub_node = self.distance_matrix.node(self.hub_address)
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        gaps = []
+        for truck in self.trucks:
+            stops = list(self.group_stops(truck.packages))
+            if len(stops) > self.route_optimizer.exact_stop_limit:
+                continue
+            nodes = [hub_node] + stops + [hub_node]
+            distances = [[matrix.get(source, destination) for destination in nodes] for source in nodes]
+            route = self.route_optimizer.held_karp(distances)
+            exact = sum(distances[source][destination] for source, destination in zip(route, route[1:]))
+            gaps.append((truck.truck_id, len(stops), self.truck_mileage(truck), exact))
+        return gaps
+
+    def late_packages(self, truck, speed_mph=SPEED_MPH):
+        """
+        Returns the packages a truck delivers after their deadline when it leaves at its departure time.
+        Arrival times follow the truck's legs, measured over the distances routes are planned with.
+
+        Args:
+            truck (Truck): The loaded truck.
+            speed_mph (float): The travel speed. Default is SPEED_MPH.
+
+        Returns:
+            list: The (package_id, arrival time, deadline) of each late package, times in minutes since midnight.
+        """
+        late = []
+        time = truck.departure_time
+        for package_id, leg in zip(truck.packages, truck.legs):
+            time += leg * 60.0 / speed_mph
+            deadline = self.look_up_package_id(package_id).deadline
+            if time > deadline:
+                late.append((package_id, time, deadline))
+        return late
+
+    def use_distance_data(self, matrix, digest, shortest_paths=None, predecessors=None):
+        """
+        Uses an already loaded distance matrix, for example one mapped from shared memory, instead of
+        parsing the distance CSV again.
+
+        Args:
+            matrix (DistanceMatrix): The distance matrix.
+            digest (str): The SHA-256 hex digest of the distance CSV the matrix was loaded from.
+            shortest_paths (DistanceMatrix): Optional all-pairs shortest path distances for the matrix.
+            predecessors (array): Optional shortest path predecessors for the matrix.
+        """
+        self.distance_matrix = matrix
+        self.distance_digest = digest
+        self.address_resolver = AddressResolver(matrix.addresses)
+        self.shortest_paths = shortest_paths
+        self.shortest_path_predecessors = predecessors
+        # Built by the first routing call, so workers and snapshot loads that never route skip it
+        self.neighbor_graph = self.route_optimizer.neighbor_graph = self.fleet_assigner.neighbor_graph = None
+
+    def truck_mileage(self, truck):
+        """
+        Returns the length of a truck's route from the hub through its packages and back to the hub.
+        """
+        if truck.last_node is None:
+            return 0.0
+        matrix = self.shortest_paths if self.shortest_paths is not None else self.distance_matrix
+        return truck.route_length + matrix.get(truck.last_node, self.distance_matrix.node(self.hub_address))
+
+    def write_route_plan(self, file_path):
+        """
+        Writes the route of every truck to a CSV file, one row per package in delivery order.
+
+        Args:
+            file_path (str): The path of the CSV file to write.
+        """
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Truck', 'Stop', 'Package ID', 'Address', 'Deadline', 'Miles'])
+            for truck in self.trucks:
+                miles = 0.0
+                for stop, (package_id, leg) in enumerate(zip(truck.packages, truck.legs), start=1):
+                    miles += leg
+                    package = self.look_up_package_id(package_id)
+                    writer.writerow([truck.truck_id, stop, package_id, package.address,
+                                     format_deadline(package.deadline), f"{miles:.1f}"])
+                writer.writerow([truck.truck_id, len(truck.packages) + 1, '', self.hub_address, '',
+                                 f"{self.truck_mileage(truck):.1f}"])
+
+
+# Distance matrix and optimizer used by each route worker process
+_route_context = {}
+
+
+def attach_distance_matrix(addresses, descriptor):
+    """
+    Maps a distance buffer shared with share_buffer as a read-only DistanceMatrix.
+
+    Args:
+        addresses (list): The matrix addresses in node index order.
+        descriptor (tuple): The share_buffer descriptor of the distances.
+
+    Returns:
+        tuple: The SharedMemory block, which must stay referenced while the matrix is used, and the matrix.
+    """
+    block, view = attach_buffer(descriptor)
+    return block, DistanceMatrix(addresses, view)
 
-        # Load the first half of the priority list into truck 1
-        self.load_packages_to_truck(first_priority_list, self.truck1)
 
-        # Load the second half of the priority list into truck 2
-        self.load_packages_to_truck(second_priority_list, self.truck2)
+def init_route_worker(addresses, descriptor, optimizer, matrix=None):
+    """
+    Process pool initializer that maps the distance matrix shared by optimize_routes_parallel,
+    or uses a MappedDistanceMatrix that was pickled as its file path.
+    """
+    block = None
+    if matrix is None:
+        block, matrix = attach_distance_matrix(addresses, descriptor)
+    _route_context.update(block=block, matrix=matrix, optimizer=optimizer)
+
+
+def solve_route_task(optimizer, matrix, task):
+    """
+    Orders the stops of one route.
+
+    Args:
+        optimizer (RouteOptimizer): The optimizer to use.
+        matrix (DistanceMatrix): The distances between nodes.
+        task (tuple): The start node, the list of stop nodes and the end node, optionally followed by
+            the deadline of each stop and the departure time to route with time windows.
+
+    Returns:
+        list: The stop nodes in route order.
+    """
+    if len(task) > 3:
+        return optimizer.optimize_with_deadlines(matrix, *task)
+    return optimizer.optimize(matrix, *task)
+
+
+def optimize_route_task(task):
+    """
+    Orders the stops of one route in a worker initialized by init_route_worker, see solve_route_task.
+    """
+    return solve_route_task(_route_context['optimizer'], _route_context['matrix'], task)
+
+
+def optimize_routes_parallel(matrix, optimizer, tasks, workers=None):
+    """
+    Orders the stops of several independent routes in a process pool. The distance matrix is
+    placed in shared memory once and mapped read-only by every worker, and each route is
+    optimized by a copy of the same deterministic optimizer, so the result is identical to
+    optimizing the routes one after another. A MappedDistanceMatrix is opened from its file instead.
+
+    Args:
+        matrix (DistanceMatrix): The distances between nodes.
+        optimizer (RouteOptimizer): The optimizer to run in each worker.
+        tasks (list): The task of each route, see solve_route_task.
+        workers (int): The number of worker processes, or None for one per CPU.
+
+    Returns:
+        list: The stop nodes of each route in route order, in the order of tasks.
+    """
+    if isinstance(matrix, MappedDistanceMatrix):
+        # Workers map the same file, so nothing needs to be copied into shared memory
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_route_worker,
+                                 initargs=(None, None, optimizer, matrix)) as pool:
+            return list(pool.map(optimize_route_task, tasks))
 
-        # Load the truck-specific lists into their respective trucks
-        # followed by the non-priority list
-        self.load_packages_to_truck(self.truck1_list + self.non_priority_list, self.truck1)
-        self.load_packages_to_truck(self.truck2_list + self.non_priority_list, self.truck2)
-        self.load_packages_to_truck(self.truck3_list + self.non_priority_list, self.truck3)
+    block, descriptor = share_buffer(matrix.distances)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_route_worker,
+                                 initargs=(matrix.addresses, descriptor, optimizer)) as pool:
+            return list(pool.map(optimize_route_task, tasks))
+    finally:
+        block.close()
+        block.unlink()
 
-        # Load the last priority list into truck 3
-        self.load_packages_to_truck(self.non_priority_list + self.last_priority_list, self.truck3)          
 
+# Distance data mapped from shared memory by each batch worker process
+_batch_context = {}
 
 
-def main():
+def init_batch_worker(digest, addresses, distance_descriptor, closure_descriptor, predecessor_descriptor):
+    """
+    Process pool initializer that maps the distance data shared by run_batch.
+
+    Args:
+        digest (str): The SHA-256 hex digest of the distance CSV.
+        addresses (list): The distance matrix addresses in node index order.
+        distance_descriptor (tuple): The share_buffer descriptor of the distances.
+        closure_descriptor (tuple): The share_buffer descriptor of the shortest path distances.
+        predecessor_descriptor (tuple): The share_buffer descriptor of the shortest path predecessors.
+    """
+    # Keep the blocks referenced so their memory stays mapped for the life of the worker
+    blocks = []
+    matrices = []
+    for descriptor in (distance_descriptor, closure_descriptor):
+        block, matrix = attach_distance_matrix(addresses, descriptor)
+        blocks.append(block)
+        matrices.append(matrix)
+    block, predecessors = attach_buffer(predecessor_descriptor)
+    blocks.append(block)
+
+    _batch_context.update(digest=digest, blocks=blocks, matrix=matrices[0], shortest_paths=matrices[1],
+                          predecessors=predecessors)
+
+
+def plan_manifest(manifest_path, output_dir):
+    """
+    Runs ingestion, note processing, truck assignment and routing for one daily manifest and
+    writes its route plan. Routes treat deadlines as time windows, as a single run does, and
+    packages still delivered late are counted. Must run in a process initialized by init_batch_worker.
+
+    Args:
+        manifest_path (str): The path of the package CSV for the day.
+        output_dir (str): The directory the route plan is written to.
+
+    Returns:
+        dict: The mileage summary of the day.
+    """
+    start = time.perf_counter()
+    wgups = WGUPS()
+    wgups.use_distance_data(_batch_context['matrix'], _batch_context['digest'],
+                            _batch_context['shortest_paths'], _batch_context['predecessors'])
+    # Workers print nothing, run_batch reports the statistics returned in the summary
+    stats = wgups.load_packages(manifest_path, verbose=False)
+    report = wgups.confirm_matching_addresses()
+    wgups.update_packages_with_notes()
+    unassigned = wgups.load_trucks(time_windows=True)
+
+    name = os.path.splitext(os.path.basename(manifest_path))[0]
+    plan_path = os.path.join(output_dir, f"{name}_routes.csv")
+    wgups.write_route_plan(plan_path)
+
+    truck_miles = [wgups.truck_mileage(truck) for truck in wgups.trucks]
+    return {
+        'manifest': name,
+        'plan': plan_path,
+        'packages': stats['rows'],
+        'rejected': stats['rejected'],
+        'unmatched_addresses': sum(len(mismatch.package_ids) for mismatch in report.unmatched),
+        'unassigned': sum(len(unit.package_ids) for unit in unassigned),
+        'late_packages': sum(len(wgups.late_packages(truck)) for truck in wgups.trucks),
+        'truck_miles': truck_miles,
+        'total_miles': sum(truck_miles),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def run_batch(manifest_dir, distance_file='distance_table.csv', output_dir='plans', workers=None,
+              pattern='*.csv', cache_dir='.wgups_cache'):
+    """
+    Plans every daily manifest in a directory in parallel. The distance table is loaded and its
+    shortest paths computed once, then placed in shared memory that every worker maps read-only.
+
+    Args:
+        manifest_dir (str): The directory holding one package CSV per day.
+        distance_file (str): The path to the distance CSV. Default is 'distance_table.csv'.
+        output_dir (str): The directory route plans and summary.csv are written to. Default is 'plans'.
+        workers (int): The number of worker processes, or None for one per CPU.
+        pattern (str): The glob pattern selecting manifests in manifest_dir. Default is '*.csv'.
+        cache_dir (str): The shortest path cache directory, see WGUPS.compute_shortest_paths.
+
+    Returns:
+        list: The summary of each manifest, in manifest name order.
+    """
+    manifests = sorted(glob.glob(os.path.join(manifest_dir, pattern)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file)
+    wgups.compute_shortest_paths(cache_dir)
+
+    blocks = []
+    try:
+        descriptors = []
+        for buffer in (wgups.distance_matrix.distances, wgups.shortest_paths.distances,
+                       wgups.shortest_path_predecessors):
+            block, descriptor = share_buffer(buffer)
+            blocks.append(block)
+            descriptors.append(descriptor)
+
+        initargs = (wgups.distance_digest, wgups.distance_matrix.addresses, *descriptors)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=initargs) as pool:
+            summaries = list(pool.map(plan_manifest, manifests, [output_dir] * len(manifests)))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Manifest', 'Packages', 'Rejected', 'Unmatched Addresses', 'Unassigned', 'Late Packages',
+                         *[f"Truck {truck.truck_id} Miles" for truck in wgups.trucks], 'Total Miles', 'Seconds'])
+        for summary in summaries:
+            writer.writerow([summary['manifest'], summary['packages'], summary['rejected'],
+                             summary['unmatched_addresses'], summary['unassigned'], summary['late_packages'],
+                             *[f"{miles:.1f}" for miles in summary['truck_miles']],
+                             f"{summary['total_miles']:.1f}", f"{summary['seconds']:.3f}"])
+    return summaries
+
+
+def main(argv=None):
     """
     Function containing the main body of the program
     """
+    parser = argparse.ArgumentParser(description='Plan WGUPS delivery routes.')
+    parser.add_argument('--batch', metavar='DIR', help='plan every manifest in DIR in parallel')
+    parser.add_argument('--output', default='plans', help='directory for batch route plans (default: plans)')
+    parser.add_argument('--workers', type=int, default=None, help='number of batch worker processes')
+    parser.add_argument('--gaps', action='store_true',
+                        help="compare each truck's route with the shortest route through its stops")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        start = time.perf_counter()
+        summaries = run_batch(args.batch, output_dir=args.output, workers=args.workers)
+        for summary in summaries:
+            print(f"{summary['manifest']}: {summary['packages']} packages, {summary['total_miles']:.1f} miles, "
+                  f"{summary['unassigned']} unassigned, {summary['late_packages']} late")
+        print(f"Planned {len(summaries)} manifests in {time.perf_counter() - start:.2f} seconds")
+        return
+
     # Create an instance of WGUPS
     wgups = WGUPS()
     # Load packages and distance table
     wgups.load_packages("package_data.csv")
     wgups.load_distance_data("distance_table.csv")
+    wgups.compute_shortest_paths()
     # print(wgups.distance_table)
     # print(*wgups.look_up_package('410 S STATE ST'))
-    missing_addresses = wgups.confirm_matching_addresses()
-    print(missing_addresses)
+    report = wgups.confirm_matching_addresses()
+    for source in report.unconnected_sources:
+        print(f"{source}: this source has no matching destination in distance table.")
+    for mismatch in report.corrected:
+        print(f"Packages {mismatch.package_ids}: {mismatch.address} corrected to {mismatch.source} "
+              f"(match score {mismatch.score:.2f})")
+    for mismatch in report.unmatched:
+        print(f"Packages {mismatch.package_ids}: {mismatch.address} not found in distance table.")
     packages = wgups.get_all_packages()
     wgups.update_packages_with_notes()
     # Print all packages after updates
     # wgups.print_all_packages()
     wgups.optimize_delivery_route_for_all_packages()
-    wgups.load_trucks()
+    unassigned = wgups.load_trucks(time_windows=True)
+    for truck in wgups.trucks:
+        print(f"Truck {truck.truck_id}: {truck.packages} ({truck.route_length:.1f} miles before returning to the hub)")
+        for package_id, arrival, deadline in wgups.late_packages(truck):
+            print(f"  Package {package_id} arrives at {format_deadline(round(arrival))}, "
+                  f"after its {format_deadline(deadline)} deadline")
+    if unassigned:
+        print(f"Packages that could not be loaded: {[unit.package_ids for unit in unassigned]}")
+    if args.gaps:
+        for truck_id, stop_count, miles, exact in wgups.route_optimality_gaps():
+            gap = (miles - exact) / exact * 100 if exact else 0.0
+            print(f"Truck {truck_id}: {stop_count} stops, route {miles:.1f} miles, "
+                  f"shortest route {exact:.1f} miles ({gap:.1f}% gap)")
 
 
 if __name__ == "__main__":
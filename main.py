@@ -1,7 +1,52 @@
 import csv
+from bisect import bisect_right
 from heapq import heappop, heappush
 from datetime import datetime, timedelta
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for StatusArrays
+    np = None
+
+SPEED_MPH = 18
+DAY_START = datetime.strptime("08:00 AM", "%I:%M %p")
+DELAYED_ARRIVAL_TIME = datetime.strptime("09:05 AM", "%I:%M %p")
+ADDRESS_CORRECTION_TIME = datetime.strptime("10:20 AM", "%I:%M %p")
+CORRECTED_ADDRESS = ("9", "410 S State St", "Salt Lake City", "UT", "84111")
+TIME_FORMAT = "%Y-%m-%d %I:%M:%S %p"
+END_OF_DAY = DAY_START.replace(hour=23, minute=59)
+# Abbreviations applied to address words so package and distance table spellings compare equal
+ADDRESS_ABBREVIATIONS = {"NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W", "STATION": "STA"}
+
+# Event kinds, in the order events at the same time are processed
+PACKAGE_ARRIVAL = 0
+ADDRESS_CORRECTION = 1
+DEPARTURE = 2
+DELIVERY = 3
+RETURN = 4
+REPORT = 5
+
+# Package status codes returned by snapshots
+AT_HUB = 0
+EN_ROUTE = 1
+DELIVERED = 2
+DELAYED = 3
+STATUS_NAMES = ("At Hub", "En Route", "Delivered", "Delayed")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+def parse_deadline(deadline):
+    # Deadlines are "10:30 AM" style times or "EOD"
+    deadline = " ".join(deadline.upper().split())
+    if deadline == "EOD":
+        return END_OF_DAY
+    return datetime.strptime(deadline, "%I:%M %p")
+
+def canonical_address(address):
+    words = address.upper().replace(",", " ").split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
+HUB_ADDRESS = canonical_address("4001 South 700 East")
+
 class Package:
     def __init__(self, package_id, address, city, state, zip_code, deadline, weight, notes=None):
         self.package_id = package_id
@@ -10,6 +55,7 @@ class Package:
         self.state = state
         self.zip_code = zip_code
         self.deadline = deadline
+        self.due_time = parse_deadline(deadline)  # Deadline as a time of day, END_OF_DAY for EOD
         self.weight = weight
         self.notes = notes
         self.delivery_status = "At Hub"
@@ -28,16 +74,225 @@ class Package:
         yield 'delivery_time', self.delivery_time
 
 class Truck:
-    def __init__(self, truck_id, max_capacity=16):
+    def __init__(self, truck_id, max_capacity=16, departure_time=DAY_START):
         self.truck_id = truck_id
         self.max_capacity = max_capacity
+        self.departure_time = departure_time
         self.packages = []
+        self.mileage = 0.0
+        self.route_times = []  # Minutes since midnight of the departure and each arrival
+        self.route_mileage = []  # Cumulative mileage at each of route_times
+
+    def record_stop(self, time, mileage):
+        self.route_times.append(minutes_since_midnight(time))
+        self.route_mileage.append(mileage)
+
+    def mileage_at(self, time):
+        # Mileage driven by a time, interpolating along the leg in progress at 18 mph
+        minutes = minutes_since_midnight(time)
+        index = bisect_right(self.route_times, minutes) - 1
+        if index < 0:
+            return 0.0
+        if index + 1 == len(self.route_times):
+            return self.route_mileage[index]
+        driven = (minutes - self.route_times[index]) * SPEED_MPH / 60
+        return min(self.route_mileage[index] + driven, self.route_mileage[index + 1])
+
+    def total_mileage(self):
+        return self.route_mileage[-1] if self.route_mileage else 0.0
+
+class StatusTimeline:
+    """
+    Per-package status timeline recorded once from a complete simulation. The status of a
+    package at any time is found by binary search over its transition times, so the day can
+    be scrubbed through without re-simulating.
+    """
+    def __init__(self):
+        self.times = {}  # package_id -> transition times, in increasing order
+        self.statuses = {}  # package_id -> status entered at each transition time
+
+    def record(self, package_id, time, status):
+        # Events are processed in time order, so appending keeps each list sorted
+        self.times.setdefault(package_id, []).append(time)
+        self.statuses.setdefault(package_id, []).append(status)
+
+    def status_at(self, package_id, time):
+        # Returns (status, time the status was entered), or None for an unknown package
+        times = self.times.get(package_id)
+        if not times:
+            return None
+        index = max(bisect_right(times, time) - 1, 0)
+        return self.statuses[package_id][index], times[index]
+
+    def snapshot(self, time):
+        return {package_id: self.status_at(package_id, time) for package_id in self.times}
+
+def minutes_since_midnight(time):
+    return time.hour * 60 + time.minute + time.second / 60
+
+class StatusArrays:
+    """
+    Status timeline flattened into NumPy arrays of ready, departure and delivery times (in
+    minutes since midnight, infinite if never reached), so the status of every package at once
+    is a vectorized comparison.
+    """
+    def __init__(self, timeline):
+        if np is None:
+            raise ImportError("StatusArrays requires NumPy")
+        self.package_ids = list(timeline.times)
+        self.rows = {package_id: row for row, package_id in enumerate(self.package_ids)}
+        count = len(self.package_ids)
+        self.ready = np.full(count, -np.inf, dtype=np.float32)
+        self.departure = np.full(count, np.inf, dtype=np.float32)
+        self.delivery = np.full(count, np.inf, dtype=np.float32)
+        for row, package_id in enumerate(self.package_ids):
+            statuses = timeline.statuses[package_id]
+            times = timeline.times[package_id]
+            if statuses[0] == "Delayed":
+                self.ready[row] = np.inf
+            for status, time in zip(statuses[1:], times[1:]):
+                minutes = minutes_since_midnight(time)
+                if status == "At Hub":
+                    self.ready[row] = minutes
+                elif status == "En Route":
+                    self.departure[row] = minutes
+                elif status == "Delivered":
+                    self.delivery[row] = minutes
+
+    def snapshot(self, times):
+        # Status codes of every package at one time, or a (times, packages) array for many times
+        minutes = np.asarray([minutes_since_midnight(time) if isinstance(time, datetime) else time
+                              for time in np.atleast_1d(times)], dtype=np.float32)[:, None]
+        # Delivery never precedes departure, and a delayed package has not departed, so the
+        # codes are sums of comparisons: AT_HUB 0, EN_ROUTE 1, DELIVERED 1 + 1, DELAYED 3
+        codes = (self.departure <= minutes).view(np.uint8)
+        codes += (self.delivery <= minutes).view(np.uint8)
+        codes += (self.ready > minutes).view(np.uint8) * np.uint8(DELAYED)
+        return codes[0] if np.ndim(times) == 0 else codes
+
+    def export(self, path, time):
+        # Write the snapshot at a time as CSV, or as a compact .npy structured array otherwise
+        codes = self.snapshot(time)
+        if path.endswith('.csv'):
+            with open(path, mode='w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(["package_id", "status"])
+                writer.writerows(zip(self.package_ids, (STATUS_NAMES[code] for code in codes)))
+        else:
+            records = np.zeros(len(codes), dtype=[('package_id', 'U16'), ('status', np.uint8)])
+            records['package_id'] = self.package_ids
+            records['status'] = codes
+            np.save(path, records)
+
+class DeliverySimulation:
+    """
+    Heap-driven discrete-event simulation of a delivery day. The clock jumps straight from one
+    event to the next, and each truck keeps a single pending event on the heap, so a day costs
+    O(events log events) however finely status reports are requested.
+    """
+    def __init__(self, wgups, timeline=None):
+        self.wgups = wgups
+        self.timeline = timeline
+        self.events = []
+        self.sequence = 0  # Tie breaker keeping events at the same time in scheduling order
+
+    def set_status(self, package, time, status):
+        package.delivery_status = status
+        if self.timeline is not None:
+            self.timeline.record(package.package_id, time, status)
+
+    def schedule(self, time, kind, payload=None):
+        heappush(self.events, (time, kind, self.sequence, payload))
+        self.sequence += 1
+
+    def schedule_day(self):
+        packages = [package for truck in self.wgups.trucks for package in truck.packages]
+        delayed = {package for package in packages if package.notes and 'Delayed' in package.notes}
+        for package in packages:
+            package.delivery_time = None
+            self.set_status(package, DAY_START, "Delayed" if package in delayed else "At Hub")
+        if delayed:
+            self.schedule(DELAYED_ARRIVAL_TIME, PACKAGE_ARRIVAL, list(delayed))
+        self.schedule(ADDRESS_CORRECTION_TIME, ADDRESS_CORRECTION, CORRECTED_ADDRESS)
+
+        for truck in self.wgups.trucks:
+            truck.mileage = 0.0
+            truck.route_times = []
+            truck.route_mileage = []
+            if not truck.packages:
+                continue
+            # A truck cannot leave before its delayed or misaddressed packages are ready
+            departure_time = truck.departure_time
+            for package in truck.packages:
+                if package in delayed:
+                    departure_time = max(departure_time, DELAYED_ARRIVAL_TIME)
+                if package.package_id == CORRECTED_ADDRESS[0]:
+                    departure_time = max(departure_time, ADDRESS_CORRECTION_TIME)
+            self.schedule(departure_time, DEPARTURE, truck)
+
+    def schedule_reports(self, start_time, end_time, time_interval=None):
+        report_time = start_time
+        while report_time <= end_time:
+            self.schedule(report_time, REPORT)
+            if not time_interval:
+                if report_time == end_time:
+                    break
+                report_time = end_time
+            else:
+                report_time += timedelta(minutes=time_interval)
+
+    def travel(self, truck, time, origin, index):
+        # Schedule the truck's arrival at its next package, or back at the hub
+        if index < len(truck.packages):
+            destination = self.wgups.get_package_address(truck.packages[index])
+            kind = DELIVERY
+        else:
+            destination = HUB_ADDRESS
+            kind = RETURN
+        distance = self.wgups.calculate_distance([origin], destination)
+        if distance is None:
+            raise ValueError(f"Truck {truck.truck_id} has no distance from {origin} to {destination}")
+        self.schedule(time + timedelta(hours=distance / SPEED_MPH), kind, (truck, index, destination, distance))
+
+    def run(self, end_time=None):
+        # Without an end time the whole day is simulated
+        while self.events and (end_time is None or self.events[0][0] <= end_time):
+            time, kind, _, payload = heappop(self.events)
+            if kind == PACKAGE_ARRIVAL:
+                for package in payload:
+                    self.set_status(package, time, "At Hub")
+            elif kind == ADDRESS_CORRECTION:
+                package = self.wgups.look_up_package(payload[0])
+                if package:
+                    package.address, package.city, package.state, package.zip_code = payload[1:]
+            elif kind == DEPARTURE:
+                payload.record_stop(time, payload.mileage)
+                for package in payload.packages:
+                    self.set_status(package, time, "En Route")
+                self.travel(payload, time, HUB_ADDRESS, 0)
+            elif kind == DELIVERY:
+                truck, index, address, distance = payload
+                truck.mileage += distance
+                truck.record_stop(time, truck.mileage)
+                package = truck.packages[index]
+                self.set_status(package, time, "Delivered")
+                package.delivery_time = time.strftime(TIME_FORMAT)
+                self.travel(truck, time, address, index + 1)
+            elif kind == RETURN:
+                truck, _, _, distance = payload
+                truck.mileage += distance
+                truck.record_stop(time, truck.mileage)
+            elif kind == REPORT:
+                for truck in self.wgups.trucks:
+                    self.wgups.update_truck_status(truck, time)
 
 class WGUPS:
     def __init__(self):
         self.trucks = [Truck(1), Truck(2), Truck(3)]  # Three trucks
         self.distance_table = {}
         self.hash_table = {}
+        self.timeline = None
+        self.status_arrays = None
 
     def load_packages(self, file_path):
         with open(file_path, mode='r') as file:
@@ -48,7 +303,7 @@ class WGUPS:
                     flag = True
                     print('true')
                 if (row[0] != "Package\nID" and flag): 
-                    package = Package(*row[:7])
+                    package = Package(*row[:8])
                     print(row)
                     self.insert_into_hash_table(package)
 
@@ -65,7 +320,7 @@ class WGUPS:
             if header_row_index is None:
                 raise ValueError("Header row not found")
 
-            header = rows[header_row_index][2:]
+            header = [self.extract_address(location) for location in rows[header_row_index][2:]]
             self.distance_table = {location: {} for location in header}
 
             for i, row in enumerate(rows[header_row_index + 1:]):
@@ -73,22 +328,21 @@ class WGUPS:
                 for j, distance in enumerate(row[2:]):
                     try:
                         distance_value = float(distance)
-                        destination_address = self.extract_address(header[j])
+                        destination_address = header[j]
+                        # The file only fills the lower triangle, distances are the same both ways
                         self.distance_table[origin_address][destination_address] = distance_value
+                        self.distance_table[destination_address][origin_address] = distance_value
                     except ValueError:
                         pass
 
     def insert_into_hash_table(self, package):
+        # Each bucket maps package_id to package, so colliding ids are chained rather than dropped
         index = hash(package.package_id) % 100
-        if index not in self.hash_table:
-            self.hash_table[index] = package
+        self.hash_table.setdefault(index, {}).setdefault(package.package_id, package)
 
     def look_up_package(self, package_id):
         index = hash(package_id) % 100
-        if index in self.hash_table:
-            package = self.hash_table[index]
-            return package
-        return None
+        return self.hash_table.get(index, {}).get(package_id)
 
     def dijkstra(self, start, end):
         distances = {location: float('inf') for location in self.distance_table}
@@ -126,33 +380,43 @@ class WGUPS:
         return path
 
     def optimize_delivery_routes(self):
+        # Every truck starts and ends at the hub, so the addresses reachable from it are the same for all of them
+        optimized_route = {location for location in self.distance_table if self.dijkstra(HUB_ADDRESS, location)}
+        loaded = set()
         for truck in self.trucks:
-            start_location = "WGUPS Hub"
-            end_location = "WGUPS Hub"
-            optimized_route = self.dijkstra(start_location, end_location)
-            truck.packages = self.route_truck_based_on_deadline(truck, optimized_route)
-
-    def route_truck_based_on_deadline(self, truck, optimized_route):
+            truck.packages = []  # Re-optimizing replaces the previous loads instead of adding to them
+            truck.packages = self.route_truck_based_on_deadline(truck, optimized_route, loaded)
+        # A recorded day no longer matches the new loads
+        self.timeline = None
+        self.status_arrays = None
+
+    def route_trucks(self):
+        # Route the trucks the first time they are needed, so replaying the day keeps the same loads
+        if not any(truck.packages for truck in self.trucks):
+            self.optimize_delivery_routes()
+
+    def route_truck_based_on_deadline(self, truck, optimized_route, loaded):
+        # Packages already in loaded are on another truck and are skipped
         sorted_packages = sorted(
-            [package for index in self.hash_table 
-                for package in self.hash_table[index]
-                if self.get_package_address(package) in optimized_route],
-            key=lambda package: package.deadline
+            [package for index in self.hash_table
+                for package in self.hash_table[index].values()
+                if package.package_id not in loaded and self.get_package_address(package) in optimized_route],
+            key=lambda package: (package.due_time, int(package.package_id))
         )
 
-        truck_packages = []
-        current_time = datetime.strptime("08:00 AM", "%I:%M %p")
+        current_time = truck.departure_time
 
         for package in sorted_packages:
-            if current_time < package.deadline * 60 and len(truck_packages) < truck.max_capacity:
+            if current_time < package.due_time and len(truck.packages) < truck.max_capacity:
                 truck.packages.append(package)
+                loaded.add(package.package_id)
 
                 distance_to_package = self.calculate_distance(
-                    ["WGUPS Hub", self.get_package_address(package)],
-                    "WGUPS Hub"
+                    [HUB_ADDRESS, self.get_package_address(package)],
+                    HUB_ADDRESS
                 )
                 if distance_to_package is not None:
-                    travel_time = timedelta(hours=distance_to_package / 18)
+                    travel_time = timedelta(hours=distance_to_package / SPEED_MPH)
                     current_time += travel_time
                     current_time += timedelta(minutes=15)  # 15 minutes assumed for delivery
 
@@ -180,32 +444,56 @@ class WGUPS:
 
         return total_distance
 
-    def simulate_delivery(self, start_time, end_time, time_interval):
-        self.optimize_delivery_routes()
+    def simulate_delivery(self, start_time, end_time, time_interval=None):
+        self.route_trucks()
 
-        current_time = start_time
-        while current_time <= end_time:
-            for truck in self.trucks:
-                print(f"\nTruck {truck.truck_id} Status at {current_time.strftime('%Y-%m-%d %I:%M:%S %p')}:")
-                self.update_package_statuses(truck, current_time)
-                self.update_truck_status(truck, current_time)
-
-            current_time += timedelta(minutes=time_interval)
+        # Replay the day from the first departure, reporting status between start_time and end_time
+        simulation = DeliverySimulation(self)
+        simulation.schedule_day()
+        simulation.schedule_reports(start_time, end_time, time_interval)
+        simulation.run(end_time)
 
         # Print the total mileage after all trucks have completed their routes
         self.print_total_mileage()
 
+    def simulate_day(self):
+        # Simulate the whole day once, recording every package's status timeline
+        self.route_trucks()
+        self.timeline = StatusTimeline()
+        simulation = DeliverySimulation(self, self.timeline)
+        simulation.schedule_day()
+        simulation.run()
+        self.status_arrays = None
+        return self.timeline
+
+    def snapshot(self, time):
+        # Status codes for all packages at a time (or times), in self.status_arrays.package_ids order.
+        # Only reads the day recorded by simulate_day, so a status query never re-routes or re-simulates
+        if self.timeline is None:
+            raise RuntimeError("simulate_day must run before taking a snapshot")
+        if self.status_arrays is None:
+            self.status_arrays = StatusArrays(self.timeline)
+        return self.status_arrays.snapshot(time)
+
+    def export_snapshot(self, path, time):
+        self.snapshot(time)
+        self.status_arrays.export(path, time)
+
+    def print_status_window(self, start_time, end_time, time_interval=5):
+        # Print package statuses from the recorded timeline, without re-simulating
+        current_time = start_time
+        while current_time <= end_time:
+            print(f"\nPackage Status at {current_time.strftime(TIME_FORMAT)}:")
+            for package_id, (status, since) in self.timeline.snapshot(current_time).items():
+                print(f"  Package {package_id}: {status} since {since.strftime('%I:%M %p')}")
+            current_time += timedelta(minutes=time_interval)
+
     def update_package_statuses(self, truck, current_time):
+        codes = self.snapshot(current_time)
+        rows = self.status_arrays.rows
         for package in truck.packages:
-            if package.delivery_time is not None:
-                delivery_time = datetime.strptime(package.delivery_time, "%Y-%m-%d %I:%M:%S %p")
-                if current_time >= delivery_time:
-                    package.delivery_status = "Delivered"
-                elif current_time >= delivery_time - timedelta(minutes=15):
-                    package.delivery_status = "En Route"
-                else:
-                    package.delivery_status = "At Hub"
-
+            if package.package_id in rows:
+                package.delivery_status = STATUS_NAMES[codes[rows[package.package_id]]]
                 print(f"  Package {package.package_id}: {package.delivery_status} at {package.delivery_time}")
 
     def update_truck_status(self, truck, current_time):
@@ -214,36 +502,32 @@ class WGUPS:
         for package in truck.packages:
             print(f"  Package {package.package_id}: {package.delivery_status} at {package.delivery_time}")
 
-        # Print the total mileage after the truck has completed its route
-        print(f"\nTotal Mileage Traveled by Truck {truck.truck_id}: {self.calculate_total_mileage(truck):.2f} miles")
+        # Print the mileage driven so far, read from the truck's cumulative mileage
+        print(f"\nMileage Traveled by Truck {truck.truck_id}: {truck.mileage_at(current_time):.2f} miles")
 
     def calculate_total_mileage(self, truck):
-        return sum(
-            self.calculate_distance(["WGUPS Hub", self.get_package_address(package)] + ["WGUPS Hub"])
-            for package in truck.packages
-        )
+        # Mileage of the truck's simulated route, cached as cumulative mileage on the truck
+        return truck.total_mileage()
 
     def print_total_mileage(self):
-        total_mileage = sum(
-            self.calculate_distance(["WGUPS Hub", self.get_package_address(package)] + ["WGUPS Hub"])
-            for truck in self.trucks for package in truck.packages
-        )
+        total_mileage = sum(self.calculate_total_mileage(truck) for truck in self.trucks)
 
         print(f"\nTotal Mileage Traveled by All Trucks: {total_mileage:.2f} miles")
 
     def get_package_address(self, package):
+        # Packages are keyed in the distance table by their canonical street address
         if isinstance(package, Package):
-            return f"{package.address},{package.city},{package.state},{package.zip_code}"
+            return canonical_address(package.address)
         elif isinstance(package, tuple) and len(package) >= 5:
             # Ensure the tuple has at least 5 elements before accessing them
-            return f"{package[1]},{package[2]},{package[3]},{package[4]}"
+            return canonical_address(package[1])
         else:
             return None  # Return None for unsupported types or insufficient data
 
     def extract_address(self, full_address):
-        # Extract only the relevant part of the address
-        parts = full_address.split(",")
-        return ",".join(parts[0:4])
+        # Extract the street address, the line after the location name, e.g. "1060 Dalton Ave S"
+        lines = full_address.split("\n")
+        return canonical_address(lines[1].split(",")[0] if len(lines) > 1 else lines[0])
 
     def check_total_mileage(self):
         print("\nChecking Total Mileage:")
@@ -254,38 +538,34 @@ class WGUPS:
     def run_checks(self):
         self.check_total_mileage()
 
-# Create an instance of WGUPS
-wgups = WGUPS()
-
-# Load packages and distance table
-wgups.load_packages("package_details.csv")
-wgups.load_distance_table("distance_table.csv")
-
-package_9_wrong_address = Package("9", "Wrong Address", "Salt Lake City", "UT", "84111", "10:20 AM", "2", "At Hub")
-wgups.insert_into_hash_table(package_9_wrong_address)
-
-# Look up a package by ID
-package_9 = wgups.look_up_package("9")
-if package_9:
-    package_9.delivery_status = "At Hub"
-    package_9.delivery_time = None
-
-# Set the delivery time for package #9 after the correction
-package_9_corrected = wgups.look_up_package("9")
-if package_9_corrected:
-    package_9_corrected.delivery_time = "1900-01-01 10:20:00 AM"
-
-# Scenario 1: Between 8:35 a.m. and 9:25 a.m.
-start_time_1 = datetime.strptime("08:35 AM", "%I:%M %p")
-end_time_1 = datetime.strptime("09:25 AM", "%I:%M %p")
-wgups.simulate_delivery(start_time_1, end_time_1, time_interval=5)
-
-# Scenario 2: Between 9:35 a.m. and 10:25 a.m.
-start_time_2 = datetime.strptime("09:35 AM", "%I:%M %p")
-end_time_2 = datetime.strptime("10:25 AM", "%I:%M %p")
-wgups.simulate_delivery(start_time_2, end_time_2, time_interval=5)
-
-# Scenario 3: Between 12:03 p.m. and 1:12 p.m.
-start_time_3 = datetime.strptime("12:03 PM", "%I:%M %p")
-end_time_3 = datetime.strptime("01:12 PM", "%I:%M %p")
-wgups.simulate_delivery(start_time_3, end_time_3, time_interval=5)
+if __name__ == "__main__":
+    # Create an instance of WGUPS
+    wgups = WGUPS()
+
+    # Load packages and distance table
+    wgups.load_packages("package_data.csv")
+    wgups.load_distance_table("distance_table.csv")
+
+    package_9_wrong_address = Package("9", "Wrong Address", "Salt Lake City", "UT", "84111", "10:20 AM", "2", "At Hub")
+    wgups.insert_into_hash_table(package_9_wrong_address)
+
+    # Simulate the day once; the address of package #9 is corrected at 10:20 during the simulation
+    wgups.simulate_day()
+
+    # Scenario 1: Between 8:35 a.m. and 9:25 a.m.
+    start_time_1 = datetime.strptime("08:35 AM", "%I:%M %p")
+    end_time_1 = datetime.strptime("09:25 AM", "%I:%M %p")
+    wgups.print_status_window(start_time_1, end_time_1, time_interval=5)
+
+    # Scenario 2: Between 9:35 a.m. and 10:25 a.m.
+    start_time_2 = datetime.strptime("09:35 AM", "%I:%M %p")
+    end_time_2 = datetime.strptime("10:25 AM", "%I:%M %p")
+    wgups.print_status_window(start_time_2, end_time_2, time_interval=5)
+
+    # Scenario 3: Between 12:03 p.m. and 1:12 p.m.
+    start_time_3 = datetime.strptime("12:03 PM", "%I:%M %p")
+    end_time_3 = datetime.strptime("01:12 PM", "%I:%M %p")
+    wgups.print_status_window(start_time_3, end_time_3, time_interval=5)
+
+    # Print the total mileage after all trucks have completed their routes
+    wgups.print_total_mileage()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture
+def package_file():
+    return os.path.join(REPO_DIR, 'package_data.csv')
+
+
+@pytest.fixture
+def distance_file():
+    return os.path.join(REPO_DIR, 'distance_table.csv')
+
+
+@pytest.fixture
+def prepared(package_file, distance_file, tmp_path):
+    """
+    Returns a function building a WGUPS in the state main() routes from: packages and distances
+    loaded, shortest paths computed, addresses confirmed and notes applied.
+    """
+    from deliveries_v2 import WGUPS
+
+    def prepare(columnar=False):
+        wgups = WGUPS()
+        wgups.load_packages(package_file, columnar=columnar)
+        wgups.load_distance_data(distance_file)
+        wgups.compute_shortest_paths(str(tmp_path / 'cache'))
+        wgups.confirm_matching_addresses()
+        wgups.update_packages_with_notes()
+        return wgups
+
+    return prepare
@@ -0,0 +1,57 @@
+import pytest
+
+from deliveries_v2 import AddressResolver
+
+SOURCES = ['4001 South 700 East', '5100 S 2700 W', '100 S MAIN ST', '100 N MAIN ST', '300 State St Ste 200']
+
+
+@pytest.fixture
+def resolver():
+    return AddressResolver(SOURCES)
+
+
+@pytest.mark.parametrize('address, node', [
+    ('4001 S 700 E', 0),
+    ('4001 SOUTH 700 EAST', 0),
+    ('5100 South 2700 West', 1),
+    ('5100 s. 2700 w.', 1),
+    ('  5100   S 2700 W ', 1),
+    ('300 STATE STREET SUITE 200', 4),
+])
+def test_abbreviation_variants_match_exactly(resolver, address, node):
+    assert resolver.resolve(address) == (node, 1.0)
+
+
+def test_token_order_variants_match_by_tokens(resolver):
+    assert resolver.resolve('2700 W 5100 S') == (1, 1.0)
+    node, score = resolver.resolve('5100 S 2700 W Apt 3')
+    assert node == 1
+    assert score == pytest.approx(4 / 6)
+
+
+def test_best_partial_match_wins(resolver):
+    node, score = resolver.resolve('300 State St Room 200')
+    assert node == 4
+    assert score == pytest.approx(4 / 5)
+
+
+def test_ambiguous_matches_resolve_to_the_lowest_node(resolver):
+    # Both MAIN ST sources share 100, MAIN and ST and differ only in direction
+    node, score = resolver.resolve('100 MAIN ST')
+    assert node == 2
+    assert score == pytest.approx(3 / 4)
+    assert resolver.resolve('100 NORTH MAIN ST') == (3, 1.0)
+
+
+def test_duplicate_canonical_addresses_keep_the_first_node():
+    assert AddressResolver(['5100 S 2700 W', '5100 South 2700 West']).resolve('5100 S 2700 W') == (0, 1.0)
+
+
+@pytest.mark.parametrize('address', ['999 NOWHERE BLVD', 'MAIN ST', '100 MAIN', '4001 S 900 W', ''])
+def test_no_match_returns_none(resolver, address):
+    assert resolver.resolve(address) is None
+
+
+def test_min_common_tokens():
+    resolver = AddressResolver(SOURCES, min_common_tokens=2)
+    assert resolver.resolve('MAIN ST') == (2, pytest.approx(2 / 4))
@@ -0,0 +1,67 @@
+import contextlib
+import csv
+import io
+import os
+import shutil
+
+from deliveries_v2 import run_batch
+
+
+def shared_memory_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+def test_run_batch_matches_single_run(prepared, package_file, distance_file, tmp_path, capfd):
+    manifest_dir = tmp_path / 'days'
+    manifest_dir.mkdir()
+    for day in ('monday', 'tuesday'):
+        shutil.copy(package_file, manifest_dir / f"{day}.csv")
+    output_dir = tmp_path / 'plans'
+    blocks = shared_memory_blocks()
+
+    summaries = run_batch(str(manifest_dir), distance_file, str(output_dir), workers=2,
+                          cache_dir=str(tmp_path / 'cache'))
+    assert capfd.readouterr().out == ''  # Workers leave reporting to the caller
+    assert [summary['manifest'] for summary in summaries] == ['monday', 'tuesday']
+    assert shared_memory_blocks() == blocks
+
+    wgups = prepared()
+    wgups.load_trucks(time_windows=True)
+    wgups.write_route_plan(str(tmp_path / 'single.csv'))
+    expected = (tmp_path / 'single.csv').read_text()
+    for summary in summaries:
+        assert summary['packages'] == 40
+        assert summary['unassigned'] == 0
+        assert summary['late_packages'] == sum(len(wgups.late_packages(truck)) for truck in wgups.trucks) == 0
+        assert summary['total_miles'] == sum(wgups.truck_mileage(truck) for truck in wgups.trucks)
+        assert open(summary['plan']).read() == expected
+
+    with open(output_dir / 'summary.csv', newline='') as file:
+        rows = list(csv.reader(file))
+    assert [row[0] for row in rows[1:]] == ['monday', 'tuesday']
+    assert [row[rows[0].index('Late Packages')] for row in rows[1:]] == ['0', '0']
+
+
+def test_run_batch_reports_unmatched_addresses(package_file, distance_file, tmp_path):
+    manifest_dir = tmp_path / 'days'
+    manifest_dir.mkdir()
+    shutil.copy(package_file, manifest_dir / 'monday.csv')
+    with open(package_file, newline='') as file:
+        rows = list(csv.reader(file))
+    for row in rows:
+        if row[0] == '2':
+            row[1] = '999 NOWHERE BLVD'
+    with open(manifest_dir / 'tuesday.csv', 'w', newline='') as file:
+        csv.writer(file).writerows(rows)
+    output_dir = tmp_path / 'plans'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summaries = run_batch(str(manifest_dir), distance_file, str(output_dir), workers=2,
+                              cache_dir=str(tmp_path / 'cache'))
+    # The bad address only affects its own manifest
+    monday, tuesday = summaries
+    assert (monday['unmatched_addresses'], monday['unassigned']) == (0, 0)
+    assert (tuesday['unmatched_addresses'], tuesday['unassigned']) == (1, 1)
+    with open(tuesday['plan'], newline='') as file:
+        planned = [row[2] for row in list(csv.reader(file))[1:] if row[2]]
+    assert sorted(planned, key=int) == [str(package_id) for package_id in range(1, 41) if package_id != 2]
@@ -0,0 +1,65 @@
+from deliveries_v2 import DisjointSet
+
+
+def test_find_adds_singleton_groups():
+    groups = DisjointSet()
+    assert '1' not in groups
+    assert groups.find('1') == '1'
+    assert '1' in groups
+    assert groups.group_size('1') == 1
+
+
+def test_union_merges_groups_transitively():
+    groups = DisjointSet()
+    groups.union('13', '15')
+    groups.union('19', '15')
+    groups.union('20', '21')
+    assert groups.find('13') == groups.find('15') == groups.find('19')
+    assert groups.find('20') == groups.find('21') != groups.find('13')
+    assert groups.group_size('19') == 3
+
+    # Joining one member of each group joins the groups
+    root = groups.union('21', '13')
+    assert {groups.find(package_id) for package_id in ('13', '15', '19', '20', '21')} == {root}
+    assert groups.group_size('20') == 5
+
+
+def test_repeated_unions_do_not_change_the_group():
+    groups = DisjointSet()
+    root = groups.union('1', '2')
+    assert groups.union('1', '2') == root
+    assert groups.union('2', '1') == root
+    assert groups.union('1', '1') == root
+    assert groups.group_size('1') == 2
+    assert sum(groups.size.values()) == 2
+
+
+def test_union_by_size_keeps_the_larger_root():
+    groups = DisjointSet()
+    large = groups.union('1', '2')
+    groups.union('1', '3')
+    assert groups.union('4', '1') == large
+
+
+def test_find_compresses_paths():
+    groups = DisjointSet()
+    # Build a chain 0 <- 1 <- ... <- 9 by hand, as repeated unions without balancing would
+    for package_id in range(10):
+        groups.add(package_id)
+        if package_id:
+            groups.parent[package_id] = package_id - 1
+    groups.size = {0: 10}
+
+    def depth(package_id):
+        steps = 0
+        while groups.parent[package_id] != package_id:
+            package_id = groups.parent[package_id]
+            steps += 1
+        return steps
+
+    assert depth(9) == 9
+    assert groups.find(9) == 0
+    assert depth(9) < 9
+    groups.find(9)
+    assert depth(9) <= 3
+    assert all(groups.find(package_id) == 0 for package_id in range(10))
@@ -0,0 +1,108 @@
+from deliveries_v2 import ADDRESS_CORRECTION_TIME, Package, PackageState, parse_deadline
+
+
+def truck_of(wgups, package_id):
+    return next(truck for truck in wgups.trucks if package_id in truck.packages)
+
+
+def test_load_trucks_respects_constraints(prepared):
+    wgups = prepared()
+    unassigned = wgups.load_trucks(time_windows=True)
+    assert unassigned == []
+
+    loaded = [package_id for truck in wgups.trucks for package_id in truck.packages]
+    assert sorted(loaded, key=int) == [str(package_id) for package_id in range(1, 41)]
+    assert len(wgups.unassigned_packages()) == 0
+    assert all(wgups.package_states.state(package_id) == PackageState.LOADED for package_id in loaded)
+
+    for truck in wgups.trucks:
+        assert len(truck.packages) <= truck.max_capacity
+        assert wgups.truck_mileage(truck) <= truck.distance_restriction
+        for package_id in truck.packages:
+            package = wgups.look_up_package_id(package_id)
+            if package.required_truck is not None:
+                assert package.required_truck == truck.truck_id
+            if package.no_load_before is not None:
+                assert parse_deadline(package.no_load_before) <= truck.departure_time
+        assert wgups.late_packages(truck) == []
+
+    # Co-delivery groups ride on one truck
+    group = {'13', '14', '15', '16', '19', '20'}
+    assert len({truck_of(wgups, package_id).truck_id for package_id in group}) == 1
+
+
+def test_wrong_address_is_corrected_at_correction_time(prepared):
+    wgups = prepared(columnar=True)
+    package = wgups.look_up_package_id('9')
+    assert package.address == '300 STATE ST'
+
+    assert wgups.apply_address_corrections(ADDRESS_CORRECTION_TIME - 1) == []
+    assert package.address == '300 STATE ST'
+
+    wgups.load_trucks()
+    assert (package.address, package.city, package.state, package.zip_code) == \
+           ('410 S STATE ST', 'SALT LAKE CITY', 'UT', '84111')
+    assert wgups.look_up_package('410 S STATE ST').count(package) == 1
+    assert package not in wgups.look_up_package('300 STATE ST')
+
+    node = wgups.distance_matrix.node('410 S STATE ST')
+    truck = truck_of(wgups, '9')
+    assert truck.departure_time >= ADDRESS_CORRECTION_TIME
+    assert truck.stops[truck.packages.index('9')] == node
+    store = wgups.package_store
+    assert store.view()['node'][store.row_index['9']] == node
+
+    # Applying the correction again changes nothing
+    assert wgups.apply_address_corrections(ADDRESS_CORRECTION_TIME) == []
+
+
+def test_load_trucks_again_keeps_loads(prepared):
+    wgups = prepared()
+    wgups.load_trucks(time_windows=True)
+    loads = {truck.truck_id: sorted(truck.packages) for truck in wgups.trucks}
+    mileage = [wgups.truck_mileage(truck) for truck in wgups.trucks]
+
+    assert wgups.load_trucks(time_windows=True) == []
+    assert {truck.truck_id: sorted(truck.packages) for truck in wgups.trucks} == loads
+    assert [wgups.truck_mileage(truck) for truck in wgups.trucks] == mileage
+
+
+def test_load_trucks_adds_new_packages_to_existing_loads(prepared):
+    wgups = prepared()
+    wgups.load_trucks()
+    loads = {truck.truck_id: set(truck.packages) for truck in wgups.trucks}
+
+    new_ids = [str(package_id) for package_id in range(41, 46)]
+    wgups.insert_packages([Package(package_id, '1060 Dalton Ave S', 'Salt Lake City', 'UT', '84104', 'EOD', '5')
+                           for package_id in new_ids])
+    assert sorted(wgups.unassigned_packages(), key=int) == new_ids
+
+    assert wgups.load_trucks() == []
+    assert len(wgups.unassigned_packages()) == 0
+    for truck in wgups.trucks:
+        assert loads[truck.truck_id] <= set(truck.packages)
+        assert len(truck.packages) <= truck.max_capacity
+        assert len(truck.packages) == len(truck.stops) == len(truck.legs)
+    loaded = [package_id for truck in wgups.trucks for package_id in truck.packages]
+    assert sorted(loaded, key=int) == [str(package_id) for package_id in range(1, 46)]
+
+
+def test_legs_and_lateness_use_the_routing_distances(prepared):
+    wgups = prepared()
+    wgups.load_trucks(time_windows=True)
+    matrix = wgups.shortest_paths
+    hub_node = matrix.node(wgups.hub_address)
+    for truck in wgups.trucks:
+        stops = [hub_node] + truck.stops
+        assert truck.legs == [matrix.get(source, destination) for source, destination in zip(stops, stops[1:])]
+        assert wgups.truck_mileage(truck) == sum(truck.legs) + matrix.get(truck.stops[-1], hub_node)
+        assert abs(wgups.calculate_truck_distance(truck) - truck.route_length) < 1e-9
+
+        # Leaving at noon makes the packages due in the morning late
+        truck.departure_time = 12 * 60
+        arrivals = wgups.route_optimizer.arrival_times(matrix, hub_node, truck.stops, truck.departure_time)
+        late = [(package_id, arrival, wgups.look_up_package_id(package_id).deadline)
+                for package_id, arrival in zip(truck.packages, arrivals)
+                if arrival > wgups.look_up_package_id(package_id).deadline]
+        assert wgups.late_packages(truck) == late
+    assert any(wgups.late_packages(truck) for truck in wgups.trucks)
@@ -0,0 +1,107 @@
+import pytest
+
+from deliveries_v2 import WGUPS, Package, PackageHashTable, fnv1a_hash
+
+
+def test_fnv1a_hash_is_stable():
+    # Reference values of 64-bit FNV-1a, independent of PYTHONHASHSEED
+    assert fnv1a_hash('') == 0xcbf29ce484222325
+    assert fnv1a_hash('a') == 0xaf63dc4c8601ec8c
+    assert fnv1a_hash(1) == fnv1a_hash('1')
+
+
+def test_insert_get_update_delete():
+    table = PackageHashTable(capacity=4)
+    table.insert('1', 'first')
+    table.insert('2', 'second')
+    assert len(table) == 2
+    assert table.get('1') == 'first'
+    assert table.get('3') is None
+    assert table.get('3', 'missing') == 'missing'
+    assert '2' in table and '3' not in table
+
+    table.insert('1', 'replaced')
+    assert len(table) == 2
+    assert table.get('1') == 'replaced'
+
+    table.update('2', 'updated')
+    assert table.get('2') == 'updated'
+    with pytest.raises(KeyError):
+        table.update('3', 'missing')
+
+    assert table.delete('1') == 'replaced'
+    assert len(table) == 1
+    assert '1' not in table
+    with pytest.raises(KeyError):
+        table.delete('1')
+
+
+def test_resizes_past_load_factor():
+    table = PackageHashTable(capacity=4, load_factor=0.75)
+    for key in range(1000):
+        table.insert(str(key), key)
+        assert len(table) <= table.load_factor * len(table.buckets)
+    assert len(table) == 1000
+    assert all(table.get(str(key)) == key for key in range(1000))
+    assert sorted(table.keys(), key=int) == [str(key) for key in range(1000)]
+    assert sorted(table) == list(range(1000))
+    assert dict(table.items()) == {str(key): key for key in range(1000)}
+
+
+def test_reserve_avoids_resizing_during_bulk_insert():
+    table = PackageHashTable()
+    table.reserve(10000)
+    capacity = len(table.buckets)
+    assert 10000 <= table.load_factor * capacity
+    for key in range(10000):
+        table.insert(str(key), key)
+    assert len(table.buckets) == capacity
+
+
+def test_bucket_layout_is_deterministic():
+    first = PackageHashTable(capacity=8)
+    second = PackageHashTable(capacity=8)
+    for key in ('1', '2', '3', '40'):
+        first.insert(key, key)
+        second.insert(key, key)
+    assert [[entry[0] for entry in bucket] for bucket in first.buckets] == \
+           [[entry[0] for entry in bucket] for bucket in second.buckets]
+
+
+def test_rejects_invalid_parameters():
+    with pytest.raises(ValueError):
+        PackageHashTable(capacity=0)
+    with pytest.raises(ValueError):
+        PackageHashTable(load_factor=0)
+
+
+def looked_up(wgups, address):
+    return sorted(package.package_id for package in wgups.look_up_package(address))
+
+
+def test_address_index_follows_address_changes_and_resizes():
+    wgups = WGUPS()
+    buckets = len(wgups.hash_table.buckets)
+    for package_id in range(1, 201):
+        street = '100 MAIN ST' if package_id % 2 else '200 STATE ST'
+        wgups.insert_into_hash_table(Package(str(package_id), street, 'Salt Lake City', 'UT', '84101', 'EOD', 1))
+    # Growing the table rehashes every package, but the index still finds them all
+    assert len(wgups.hash_table.buckets) > buckets
+    assert looked_up(wgups, '100 Main St') == sorted(str(package_id) for package_id in range(1, 201, 2))
+    assert len(looked_up(wgups, '200 state st')) == 100
+
+    # Editing an address directly moves the package to the new address
+    wgups.edit_package_attribute('1', 'address', '300 ELM ST')
+    assert '1' not in looked_up(wgups, '100 MAIN ST')
+    assert looked_up(wgups, '300 ELM ST') == ['1']
+
+    # Replacing a package under the same id reindexes it under the new package's address
+    wgups.insert_into_hash_table(Package('1', '400 Oak Ave', 'Salt Lake City', 'UT', '84101', 'EOD', 1))
+    assert looked_up(wgups, '300 ELM ST') == []
+    assert looked_up(wgups, '400 OAK AVE') == ['1']
+
+    # An explicit resize keeps the index consistent with the moved entries
+    wgups.hash_table.resize(len(wgups.hash_table.buckets) * 4)
+    assert looked_up(wgups, '400 OAK AVE') == ['1']
+    assert len(looked_up(wgups, '100 MAIN ST')) == 99
+    assert all(package.address == '100 MAIN ST' for package in wgups.look_up_package('100 MAIN ST'))
@@ -0,0 +1,74 @@
+from deliveries_v2 import EOD, WGUPS, parse_deadline
+
+HEADER = '"Package\nID",Address,City ,State,Zip,"Delivery\nDeadline","Weight\nKILO",Special Notes\n'
+
+
+def write_manifest(tmp_path, rows):
+    path = tmp_path / 'manifest.csv'
+    path.write_text('WGUPS Package File,,,,,,,\n' + HEADER + ''.join(row + '\n' for row in rows))
+    return str(path)
+
+
+def test_load_packages(package_file):
+    wgups = WGUPS()
+    stats = wgups.load_packages(package_file)
+    assert stats['rows'] == 40
+    assert stats['rejected'] == 0
+    assert len(wgups.hash_table) == 40
+
+    package = wgups.look_up_package_id('1')
+    assert package.address == '195 W OAKLAND AVE'
+    assert package.deadline == 10 * 60 + 30
+    assert package.weight == 21.0
+    assert package.notes is None
+    assert wgups.look_up_package_id('2').deadline == EOD
+    assert wgups.look_up_package_id('9').notes == 'Wrong address listed'
+
+
+def test_iter_package_chunks_respects_chunk_size(package_file):
+    stats = {}
+    chunks = list(WGUPS().iter_package_chunks(package_file, chunk_size=15, stats=stats))
+    assert [len(chunk) for chunk in chunks] == [15, 15, 10]
+    assert [package.package_id for chunk in chunks for package in chunk] == [str(i) for i in range(1, 41)]
+    assert stats == {'rows': 40, 'rejected': 0}
+
+
+def test_iter_package_chunks_rejects_invalid_rows(tmp_path):
+    path = write_manifest(tmp_path, [
+        ' 1 , 195 W Oakland Ave ,Salt Lake City,UT,84115,10:30 AM,21, ',
+        'x,195 W Oakland Ave,Salt Lake City,UT,84115,10:30 AM,21,',  # Id is not numeric
+        '3,,Salt Lake City,UT,84115,EOD,2,',  # No address
+        '4,380 W 2880 S,Salt Lake City,UT,84115,noon,4,',  # Unparseable deadline
+        '5,410 S State St,Salt Lake City,UT,84111,EOD,heavy,',  # Unparseable weight
+        ',,,,,,,',  # Blank rows are skipped without being counted
+        '6,410 S State St,Salt Lake City,UT,84111,EOD,88,Can only be on truck 2',
+    ])
+    stats = {}
+    packages = [package for chunk in WGUPS().iter_package_chunks(path, stats=stats) for package in chunk]
+    assert [package.package_id for package in packages] == ['1', '6']
+    assert packages[0].address == '195 W OAKLAND AVE'
+    assert packages[0].notes is None  # Blank notes are stored as None
+    assert packages[1].notes == 'Can only be on truck 2'
+    assert stats == {'rows': 2, 'rejected': 4}
+
+
+def test_load_packages_with_notes_callback(package_file):
+    wgups = WGUPS()
+    wgups.load_packages(package_file, chunk_size=7, on_chunk=wgups.update_packages_with_notes)
+    assert wgups.look_up_package_id('3').required_truck == 2
+    assert parse_deadline(wgups.look_up_package_id('6').no_load_before) == 9 * 60 + 5
+    assert wgups.look_up_package_id('14').package_accompaniment == (15, 19)
+    assert wgups.delivery_groups.find('13') == wgups.delivery_groups.find('20')
+
+
+def test_load_distance_data(distance_file):
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file)
+    matrix = wgups.distance_matrix
+    assert matrix.size == 27
+    assert matrix.addresses[0] == '4001 SOUTH 700 EAST'
+    hub = matrix.node('4001 SOUTH 700 EAST')
+    park = matrix.node('1060 DALTON AVE S')
+    assert matrix.get(hub, park) == matrix.get(park, hub) == 7.2
+    assert matrix.get(hub, hub) == 0.0
+    assert len(wgups.distance_digest) == 64
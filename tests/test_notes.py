@@ -0,0 +1,39 @@
+import pytest
+
+from deliveries_v2 import NO_CONSTRAINTS, NoteConstraints, parse_note
+
+
+@pytest.mark.parametrize('note, expected', [
+    # Truck requirement
+    ('Can only be on truck 2', NoteConstraints(None, 2, None, False)),
+    ('Can only be on truck 12', NoteConstraints(None, 12, None, False)),
+    ('Can only be on truck', NoteConstraints(None, None, None, False)),
+    # Delayed packages cannot be loaded before the given time
+    ('Delayed on flight---will not arrive to depot until 9:05 am',
+     NoteConstraints('9:05 am', None, None, False)),
+    ('Delayed on flight, arrives 10:20 AM', NoteConstraints('10:20 AM', None, None, False)),
+    ('Delayed on flight', NoteConstraints(None, None, None, False)),
+    # Co-delivery lists
+    ('Must be delivered with 15, 19', NoteConstraints(None, None, (15, 19), False)),
+    ('Must be delivered with 13,15', NoteConstraints(None, None, (13, 15), False)),
+    ('Must be delivered with 4', NoteConstraints(None, None, (4,), False)),
+    # Wrong address
+    ('Wrong address listed', NoteConstraints(None, None, None, True)),
+    # Several constraints in one note
+    ('Can only be on truck 2; Delayed on flight until 9:05 am',
+     NoteConstraints('9:05 am', 2, None, False)),
+    # Blank or unknown text
+    ('', NO_CONSTRAINTS),
+    (None, NO_CONSTRAINTS),
+    ('Leave at the back door', NoteConstraints(None, None, None, False)),
+    ('can only be on truck 2', NoteConstraints(None, None, None, False)),
+])
+def test_parse_note(note, expected):
+    assert parse_note(note) == expected
+
+
+def test_parse_note_is_memoized():
+    parse_note.cache_clear()
+    first = parse_note('Can only be on truck 3')
+    assert parse_note('Can only be on truck 3') is first
+    assert parse_note.cache_info().hits == 1
@@ -0,0 +1,58 @@
+import pytest
+
+from deliveries_v2 import EOD, WGUPS, Package, PackageStore
+
+np = pytest.importorskip('numpy')
+
+
+def make_package(package_id, deadline='EOD', weight='2', notes=None):
+    return Package(package_id, '410 S State St', 'Salt Lake City', 'UT', '84111', deadline, weight, notes)
+
+
+def test_append_and_select():
+    store = PackageStore(capacity=1)
+    store.append_packages([make_package('1', '10:30 AM'), make_package('2'), make_package('3', '9:00 AM')])
+    assert len(store) == 3
+    assert store.row_index == {'1': 0, '2': 1, '3': 2}
+    assert store.select(deadline_before=10 * 60 + 30).tolist() == [3]
+    assert store.select(deadline_before=EOD, status=PackageStore.AT_HUB).tolist() == [1, 3]
+
+    store.set_status(['1'], PackageStore.DELIVERED, delivery_time=9 * 60)
+    assert store.select(status=PackageStore.AT_HUB).tolist() == [2, 3]
+    assert store.view()['delivery_time'].tolist() == [9 * 60, -1, -1]
+
+
+def test_duplicate_id_updates_row_in_place():
+    store = PackageStore()
+    store.append_packages([make_package('1', '10:30 AM', '2'), make_package('2')])
+    store.set_status(['1'], PackageStore.LOADED)
+
+    store.append_packages([make_package('1', '9:00 AM', '5', 'Can only be on truck 2'), make_package('3')])
+    assert len(store) == 3
+    assert store.view()['package_id'].tolist() == [1, 2, 3]
+    row = store.view()[store.row_index['1']]
+    assert row['deadline'] == 9 * 60
+    assert row['weight'] == 5.0
+    assert row['status'] == PackageStore.LOADED
+    assert store.select(deadline_before=10 * 60 + 30).tolist() == [1]
+
+
+def test_duplicate_id_within_a_batch():
+    store = PackageStore()
+    store.append_packages([make_package('1', '10:30 AM'), make_package('1', '9:00 AM')])
+    assert len(store) == 1
+    assert store.view()['deadline'].tolist() == [9 * 60]
+
+
+def test_columnar_load_matches_hash_table(package_file):
+    wgups = WGUPS()
+    wgups.load_packages(package_file, chunk_size=7, columnar=True)
+    wgups.load_packages(package_file, chunk_size=7, columnar=True)  # Loading again replaces every row
+    wgups.update_packages_with_notes()
+    store = wgups.package_store
+    assert len(store) == len(wgups.hash_table) == 40
+    for package in wgups.hash_table:
+        row = store.view()[store.row_index[package.package_id]]
+        assert row['deadline'] == package.deadline
+        assert row['required_truck'] == (package.required_truck or 0)
+    assert sorted(store.select(flags=PackageStore.TRUCK_RESTRICTED).tolist()) == [3, 18, 36, 38]
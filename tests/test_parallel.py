@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+from array import array
+
+import pytest
+
+from deliveries_v2 import RouteOptimizer, attach_buffer, optimize_routes_parallel, share_buffer
+
+np = pytest.importorskip('numpy')
+
+
+def shared_memory_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.mark.parametrize('buffer', [
+    array('d', [0.5, 1.5, 2.5]),
+    array('i', [-1, 0, 7]),
+    memoryview(array('d', [0.5, 1.5, 2.5]).tobytes()).cast('d'),
+    np.arange(3, dtype=np.float64),
+])
+def test_share_and_attach_buffer(buffer):
+    block, descriptor = share_buffer(buffer)
+    try:
+        attached, view = attach_buffer(descriptor)
+        assert list(view) == list(memoryview(buffer).tolist())
+        assert view.readonly
+        view.release()
+        attached.close()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_optimize_routes_parallel_matches_sequential(prepared):
+    wgups = prepared()
+    matrix = wgups.shortest_paths
+    hub_node = matrix.node(wgups.hub_address)
+    optimizer = RouteOptimizer(exact_stop_limit=4)
+    tasks = [(hub_node, list(range(start, matrix.size, 3)), hub_node) for start in range(1, 4)]
+    blocks = shared_memory_blocks()
+
+    routes = optimize_routes_parallel(matrix, optimizer, tasks, workers=2)
+    assert routes == [optimizer.optimize(matrix, *task) for task in tasks]
+    assert shared_memory_blocks() == blocks
+
+
+def test_parallel_routing_after_snapshot_load(prepared, tmp_path):
+    wgups = prepared()
+    path = str(tmp_path / 'state.snapshot')
+    wgups.save_snapshot(path)
+
+    expected = prepared()
+    expected.load_trucks(time_windows=True)
+
+    restored = type(wgups)()
+    restored.load_snapshot(path)
+    sequential = type(wgups)()
+    sequential.load_snapshot(path)
+    sequential.load_trucks(time_windows=True)
+    blocks = shared_memory_blocks()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert restored.load_trucks(workers=2, time_windows=True) == []
+    assert shared_memory_blocks() == blocks
+
+    assert [truck.packages for truck in restored.trucks] == [truck.packages for truck in sequential.trucks]
+    assert [restored.truck_mileage(truck) for truck in restored.trucks] == \
+           [sequential.truck_mileage(truck) for truck in sequential.trucks]
+    assert [sorted(truck.packages) for truck in restored.trucks] == [sorted(truck.packages) for truck in expected.trucks]
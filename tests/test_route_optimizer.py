@@ -0,0 +1,209 @@
+import itertools
+import random
+
+import pytest
+
+import deliveries_v2
+from deliveries_v2 import DAY_START, EOD, DistanceMatrix, RouteOptimizer
+
+
+def random_matrix(rng, size, symmetric):
+    matrix = DistanceMatrix([str(node) for node in range(size)])
+    for source in range(size):
+        matrix.set(source, source, 0.0)
+        for destination in range(source + 1, size):
+            distance = round(rng.uniform(1, 20), 1)
+            matrix.set(source, destination, distance)
+            matrix.set(destination, source, distance if symmetric else round(rng.uniform(1, 20), 1))
+    return matrix
+
+
+def length(matrix, nodes):
+    return sum(matrix.get(source, destination) for source, destination in zip(nodes, nodes[1:]))
+
+
+def brute_force_length(matrix, start, stops, end):
+    return min(length(matrix, [start, *order, end]) for order in itertools.permutations(stops))
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+@pytest.mark.parametrize('symmetric', [True, False])
+def test_held_karp_matches_brute_force(monkeypatch, numpy, symmetric):
+    if numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(deliveries_v2, 'np', None)
+    rng = random.Random(25)
+    optimizer = RouteOptimizer()
+    for stop_count in range(1, 8):
+        for _ in range(3):
+            matrix = random_matrix(rng, stop_count + 2, symmetric)
+            stops = list(range(1, stop_count + 1))
+            end = stop_count + 1 if rng.random() < 0.5 else 0
+            route = optimizer.optimize(matrix, 0, stops, end)
+            assert sorted(route) == stops
+            assert length(matrix, [0, *route, end]) == pytest.approx(brute_force_length(matrix, 0, stops, end))
+
+
+def test_optimality_gap_respects_the_exact_stop_limit():
+    matrix = random_matrix(random.Random(7), 8, symmetric=True)
+    optimizer = RouteOptimizer(exact_stop_limit=5)
+    heuristic, exact = optimizer.optimality_gap(matrix, 0, [1, 2, 3, 4, 5], 0)
+    assert exact == pytest.approx(brute_force_length(matrix, 0, [1, 2, 3, 4, 5], 0))
+    assert heuristic >= exact - 1e-9
+    assert optimizer.optimality_gap(matrix, 0, [1, 2, 3, 4, 5, 6], 0) is None
+
+
+def test_route_optimality_gaps_compare_the_driven_routes(prepared):
+    wgups = prepared()
+    wgups.load_trucks(time_windows=True)
+    gaps = {truck_id: (stop_count, miles, exact) for truck_id, stop_count, miles, exact in wgups.route_optimality_gaps()}
+    assert len(gaps) == len(wgups.trucks)
+    for truck in wgups.trucks:
+        stop_count, miles, exact = gaps[truck.truck_id]
+        assert miles == wgups.truck_mileage(truck)
+        assert exact <= miles + 1e-9
+
+    # Trucks with more stops than the exact solver handles are skipped
+    limit = min(stop_count for stop_count, _, _ in gaps.values())
+    wgups.route_optimizer.exact_stop_limit = limit
+    assert [truck_id for truck_id, _, _, _ in wgups.route_optimality_gaps()] == \
+           [truck_id for truck_id, (stop_count, _, _) in gaps.items() if stop_count <= limit]
+
+
+def route_cost(distances, route):
+    return sum(distances[source][destination] for source, destination in zip(route, route[1:]))
+
+
+def random_distances(rng, size, symmetric):
+    matrix = random_matrix(rng, size, symmetric)
+    return [[matrix.get(source, destination) for destination in range(size)] for source in range(size)]
+
+
+def all_neighbors(distances):
+    end = len(distances) - 1
+    return [[]] + [[other for other in range(1, end) if other != stop] for stop in range(1, end)] + [[]]
+
+
+@pytest.mark.parametrize('symmetric', [True, False])
+def test_two_opt_leaves_no_improving_reversal(symmetric):
+    rng = random.Random(6)
+    optimizer = RouteOptimizer()
+    for _ in range(20):
+        distances = random_distances(rng, 12, symmetric)
+        route = list(range(12))
+        before = route_cost(distances, route)
+        neighbors = all_neighbors(distances)
+        # Each improving move shortens the route, so repeating the pass reaches a local optimum
+        for _ in range(100):
+            if not optimizer.two_opt(route, distances, neighbors):
+                break
+        assert sorted(route) == list(range(12)) and (route[0], route[-1]) == (0, 11)
+        length = route_cost(distances, route)
+        assert length <= before + 1e-9
+        for first in range(0, 10):
+            for second in range(first + 1, 11):
+                reversed_route = route[:first + 1] + route[first + 1:second + 1][::-1] + route[second + 1:]
+                assert route_cost(distances, reversed_route) >= length - 1e-9
+
+
+def test_two_opt_prices_reversed_edges_on_asymmetric_distances():
+    # Reversing 2, 3 shortens the two end edges by 8 but the inner edge grows from 1 to 10
+    distances = [[0, 1, 9, 9, 9],
+                 [9, 0, 5, 1, 9],
+                 [9, 9, 0, 1, 1],
+                 [9, 9, 10, 0, 5],
+                 [9, 9, 9, 9, 0]]
+    route = [0, 1, 2, 3, 4]
+    assert not RouteOptimizer().two_opt(route, distances, all_neighbors(distances))
+    assert route == [0, 1, 2, 3, 4]
+    # Priced as if the matrix were symmetric, the move looks like a gain and the route gets longer
+    assert RouteOptimizer().two_opt(route, distances, all_neighbors(distances), symmetric=True)
+    assert route_cost(distances, route) > 12
+
+
+@pytest.mark.parametrize('symmetric', [True, False])
+def test_or_opt_leaves_no_improving_relocation(symmetric):
+    rng = random.Random(7)
+    optimizer = RouteOptimizer(max_segment_length=3)
+    for _ in range(20):
+        distances = random_distances(rng, 12, symmetric)
+        route = list(range(12))
+        before = route_cost(distances, route)
+        neighbors = all_neighbors(distances)
+        for _ in range(100):
+            if not optimizer.or_opt(route, distances, neighbors):
+                break
+        assert sorted(route) == list(range(12)) and (route[0], route[-1]) == (0, 11)
+        length = route_cost(distances, route)
+        assert length <= before + 1e-9
+        for start in range(1, 11):
+            for size in range(1, 4):
+                if start + size > 11:
+                    break
+                segment, rest = route[start:start + size], route[:start] + route[start + size:]
+                for insert in range(1, len(rest)):
+                    for moved in (segment, segment[::-1]):
+                        assert route_cost(distances, rest[:insert] + moved + rest[insert:]) >= length - 1e-9
+
+
+def test_heuristic_terminates_on_asymmetric_distances():
+    rng = random.Random(16)
+    optimizer = RouteOptimizer(exact_stop_limit=0)
+    for _ in range(20):
+        matrix = random_matrix(rng, 18, symmetric=False)
+        route = optimizer.optimize(matrix, 0, list(range(1, 17)), 17)
+        assert sorted(route) == list(range(1, 17))
+
+
+def test_neighbor_lists_pad_graph_neighbors_with_the_nearest_stops():
+    rng = random.Random(24)
+    matrix = random_matrix(rng, 30, symmetric=True)
+    nodes = [0, *rng.sample(range(1, 30), 10), 0]
+    distances = [[matrix.get(source, destination) for destination in nodes] for source in nodes]
+    expected = RouteOptimizer(neighbor_count=4).neighbor_lists(distances)
+
+    # Few of each node's graph neighbors are on the route, so most lists are padded
+    optimizer = RouteOptimizer(neighbor_count=4, neighbor_graph=matrix.nearest_neighbors(4))
+    assert optimizer.neighbor_lists(distances, nodes) == expected
+
+
+def deadline_matrix():
+    # 0 is the start and 3 the end. The shortest route visits 1 before 2, reaching 2 after 5.5 miles,
+    # while going to 2 first reaches it after 5 miles at the cost of a much longer route
+    matrix = DistanceMatrix(['START', 'B', 'A', 'END'])
+    for source, destination, distance in ((0, 1, 1.0), (0, 2, 5.0), (0, 3, 6.0), (1, 2, 4.5), (1, 3, 6.0), (2, 3, 1.0)):
+        matrix.set(source, destination, distance)
+        matrix.set(destination, source, distance)
+    return matrix
+
+
+def test_deadlines_reorder_a_route_the_shortest_route_makes_late():
+    matrix = deadline_matrix()
+    optimizer = RouteOptimizer()
+    departure = DAY_START
+    deadlines = [EOD, departure + 17]  # Stop 2 is due 17 minutes after departure
+
+    assert optimizer.optimize(matrix, 0, [1, 2], 3) == [1, 2]
+    assert optimizer.arrival_times(matrix, 0, [1, 2], departure)[1] > deadlines[1]
+
+    route = optimizer.optimize_with_deadlines(matrix, 0, [1, 2], 3, deadlines, departure)
+    assert route == [2, 1]
+    arrivals = optimizer.arrival_times(matrix, 0, route, departure)
+    assert arrivals[0] <= deadlines[1]
+
+
+def test_deadlines_place_an_unreachable_stop_where_it_is_least_late():
+    matrix = deadline_matrix()
+    optimizer = RouteOptimizer()
+    departure = DAY_START
+    # Even driving straight to stop 2 takes 16.7 minutes, so it cannot make a 10 minute deadline
+    deadlines = [EOD, departure + 10]
+
+    route = optimizer.optimize_with_deadlines(matrix, 0, [1, 2], 3, deadlines, departure)
+    assert route == [2, 1]
+    assert optimizer.arrival_times(matrix, 0, route, departure)[0] == pytest.approx(departure + 5 * 60 / 18)
+
+    # Every stop is still routed when none of them can be on time
+    route = optimizer.optimize_with_deadlines(matrix, 0, [1, 2], 3, [departure + 1, departure + 1], departure)
+    assert sorted(route) == [1, 2]
@@ -0,0 +1,172 @@
+import struct
+from array import array
+
+import pytest
+
+import deliveries_v2
+from deliveries_v2 import (SHORTEST_PATHS_MAGIC, WGUPS, DistanceMatrix, MappedDistanceMatrix,
+                           create_mapped_distance_matrix, load_shortest_paths, save_shortest_paths)
+
+INF = float('inf')
+DIGEST = 'ab' * 32
+
+
+def make_matrix():
+    matrix = DistanceMatrix(['A', 'B', 'C', 'D'])
+    for source, destination, distance in ((0, 1, 1.0), (1, 2, 2.0), (0, 2, 5.0), (2, 3, 1.5)):
+        matrix.set(source, destination, distance)
+        matrix.set(destination, source, distance)
+    return matrix
+
+
+def test_shortest_paths():
+    closure, predecessors = make_matrix().shortest_paths()
+    assert closure.get(0, 2) == 3.0
+    assert closure.get(0, 3) == 4.5
+    assert closure.get(3, 0) == 4.5
+    # The path from A to D runs A, B, C, D
+    assert predecessors[0 * 4 + 3] == 2
+    assert predecessors[0 * 4 + 2] == 1
+    assert predecessors[0 * 4 + 1] == 0
+    assert predecessors[0 * 4 + 0] == -1
+
+
+def test_shortest_paths_without_numpy(monkeypatch):
+    expected = make_matrix().shortest_paths()
+    monkeypatch.setattr(deliveries_v2, 'np', None)
+    closure, predecessors = make_matrix().shortest_paths()
+    assert list(closure.distances) == list(expected[0].distances)
+    assert list(predecessors) == list(expected[1])
+
+
+def test_disconnected_nodes_stay_unreachable():
+    matrix = DistanceMatrix(['A', 'B', 'C'])
+    matrix.set(0, 1, 1.0)
+    closure, predecessors = matrix.shortest_paths()
+    assert closure.get(0, 2) == INF
+    assert predecessors[0 * 3 + 2] == -1
+
+
+def test_cache_round_trip(tmp_path):
+    matrix = make_matrix()
+    closure, predecessors = matrix.shortest_paths()
+    path = str(tmp_path / 'cache' / 'paths.bin')
+    save_shortest_paths(path, DIGEST, closure, predecessors)
+
+    cached_closure, cached_predecessors = load_shortest_paths(path, DIGEST, matrix)
+    assert list(cached_closure.distances) == list(closure.distances)
+    assert list(cached_predecessors) == list(predecessors)
+    assert cached_closure.addresses == matrix.addresses
+
+
+def test_cache_is_little_endian(tmp_path):
+    matrix = make_matrix()
+    closure, predecessors = matrix.shortest_paths()
+    path = tmp_path / 'paths.bin'
+    save_shortest_paths(str(path), DIGEST, closure, predecessors)
+
+    data = path.read_bytes()
+    header = len(SHORTEST_PATHS_MAGIC) + 32 + 4
+    assert struct.unpack_from('<I', data, header - 4) == (4,)
+    assert list(struct.unpack_from('<16d', data, header)) == list(closure.distances)
+    assert list(struct.unpack_from('<16i', data, header + 16 * 8)) == list(predecessors)
+
+
+def test_stale_or_missing_cache_is_ignored(tmp_path):
+    matrix = make_matrix()
+    path = str(tmp_path / 'paths.bin')
+    assert load_shortest_paths(path, DIGEST, matrix) is None
+
+    save_shortest_paths(path, DIGEST, *matrix.shortest_paths())
+    assert load_shortest_paths(path, 'cd' * 32, matrix) is None
+    assert load_shortest_paths(path, DIGEST, DistanceMatrix(['A', 'B'])) is None
+
+    with open(path, 'r+b') as file:
+        file.truncate(100)
+    assert load_shortest_paths(path, DIGEST, matrix) is None
+
+
+@pytest.mark.parametrize('packed', [False, True])
+def test_mapped_shortest_paths_stay_mapped(tmp_path, packed):
+    pytest.importorskip('numpy')
+    dense = make_matrix()
+    matrix = create_mapped_distance_matrix(str(tmp_path / 'matrix.bin'), dense.addresses, packed)
+    for source in range(dense.size):
+        for destination in range(dense.size):
+            matrix.set(source, destination, dense.get(source, destination))
+
+    expected, expected_predecessors = dense.shortest_paths()
+    closure, predecessors = matrix.shortest_paths(block_size=3)
+    assert isinstance(closure, MappedDistanceMatrix)
+    assert closure.file_path == str(tmp_path / 'matrix.bin.closure')
+    assert (tmp_path / 'matrix.bin.closure.predecessors').exists()
+    assert [closure.get(source, destination) for source in range(4) for destination in range(4)] == \
+           list(expected.distances)
+    assert predecessors.tolist() == list(expected_predecessors)
+
+
+def test_mapped_distances_are_not_copied_into_memory(distance_file, tmp_path):
+    pytest.importorskip('numpy')
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file, mapped_path=str(tmp_path / 'matrix.bin'))
+    wgups.compute_shortest_paths(str(tmp_path / 'cache'))
+    assert isinstance(wgups.shortest_paths, MappedDistanceMatrix)
+    assert not (tmp_path / 'cache').exists()
+
+    dense = WGUPS()
+    dense.load_distance_data(distance_file)
+    dense.compute_shortest_paths(None)
+    hub = wgups.distance_matrix.node_index[wgups.distance_matrix.addresses[0]]
+    assert [round(distance, 3) for distance in wgups.shortest_paths.row(hub).tolist()] == \
+           [round(distance, 3) for distance in dense.shortest_paths.row(hub)]
+
+    with pytest.raises(ValueError, match='mapped'):
+        wgups.save_snapshot(str(tmp_path / 'state.snapshot'))
+
+
+def test_mapped_distances_ignore_a_warm_cache(distance_file, tmp_path):
+    pytest.importorskip('numpy')
+    dense = WGUPS()
+    dense.load_distance_data(distance_file)
+    dense.compute_shortest_paths(str(tmp_path / 'cache'))
+    assert list((tmp_path / 'cache').iterdir())
+
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file, mapped_path=str(tmp_path / 'matrix.bin'))
+    wgups.compute_shortest_paths(str(tmp_path / 'cache'))
+    assert isinstance(wgups.shortest_paths, MappedDistanceMatrix)
+    assert not isinstance(wgups.shortest_path_predecessors, array)
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_nearest_neighbors_of_disconnected_nodes(monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(deliveries_v2, 'np', None)
+    matrix = DistanceMatrix(['A', 'B', 'C', 'D'])
+    matrix.set(0, 1, 1.0)
+    matrix.set(1, 0, 1.0)
+    # Most rows have fewer than 3 finite distances, so unreachable nodes fill them in index order
+    assert [list(neighbors) for neighbors in matrix.nearest_neighbors(3)] == \
+           [[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]]
+
+
+def test_neighbor_graph_is_built_once(distance_file, tmp_path, monkeypatch):
+    calls = []
+    nearest_neighbors = DistanceMatrix.nearest_neighbors
+    monkeypatch.setattr(DistanceMatrix, 'nearest_neighbors',
+                        lambda matrix, k: calls.append(matrix) or nearest_neighbors(matrix, k))
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file)
+    wgups.compute_shortest_paths(str(tmp_path / 'cache'))
+    assert calls == [wgups.shortest_paths]
+
+    # Without shortest paths, routing builds the graph over the distance matrix
+    calls.clear()
+    wgups = WGUPS()
+    wgups.load_distance_data(distance_file)
+    hub_node = wgups.distance_matrix.node(wgups.hub_address)
+    assert wgups.route_package_ids([], hub_node, hub_node) == []
+    assert calls == [wgups.distance_matrix]
+    assert wgups.route_optimizer.neighbor_graph is wgups.neighbor_graph
@@ -0,0 +1,115 @@
+import contextlib
+import io
+from datetime import datetime
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def simulated(package_file, distance_file):
+    wgups = main.WGUPS()
+    with contextlib.redirect_stdout(io.StringIO()):
+        wgups.load_packages(package_file)
+    wgups.load_distance_table(distance_file)
+    wgups.simulate_day()
+    return wgups
+
+
+def test_distance_table_is_keyed_by_package_addresses(simulated):
+    table = simulated.distance_table
+    assert len(table) == 27
+    assert table[main.HUB_ADDRESS]['1060 DALTON AVE S'] == table['1060 DALTON AVE S'][main.HUB_ADDRESS] == 7.2
+    for index in simulated.hash_table:
+        for package in simulated.hash_table[index].values():
+            assert simulated.get_package_address(package) in table
+
+
+def test_simulate_day_delivers_every_loaded_package(simulated):
+    loaded = [package for truck in simulated.trucks for package in truck.packages]
+    assert loaded
+    assert len({package.package_id for package in loaded}) == len(loaded)
+    for package in loaded:
+        assert package.delivery_status == "Delivered"
+        assert package.delivery_time is not None
+    assert simulated.look_up_package('9').address == "410 S State St"
+
+
+def test_delivery_times_follow_route_mileage(simulated):
+    for truck in simulated.trucks:
+        if not truck.packages:
+            continue
+        departure = truck.route_times[0]
+        mileage = 0.0
+        origin = main.HUB_ADDRESS
+        for package in truck.packages:
+            destination = simulated.get_package_address(package)
+            mileage += simulated.distance_table[origin][destination]
+            delivered = datetime.strptime(package.delivery_time, main.TIME_FORMAT)
+            # Delivery times are recorded to the minute, mileage accrues at SPEED_MPH
+            expected = departure + mileage * 60 / main.SPEED_MPH
+            assert abs(main.minutes_since_midnight(delivered) - expected) < 1
+            origin = destination
+        mileage += simulated.distance_table[origin][main.HUB_ADDRESS]
+        assert truck.total_mileage() == pytest.approx(mileage)
+        assert truck.mileage_at(datetime.strptime("11:59 PM", "%I:%M %p")) == pytest.approx(mileage)
+    total = sum(truck.total_mileage() for truck in simulated.trucks)
+    assert 0 < total < 140 * len(simulated.trucks)
+
+
+def test_unknown_address_raises(simulated):
+    truck = simulated.trucks[0]
+    package = truck.packages[0]
+    package.address = "1 Nowhere Rd"
+    simulation = main.DeliverySimulation(simulated)
+    with pytest.raises(ValueError, match="1 NOWHERE RD"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation.travel(truck, main.DAY_START, main.HUB_ADDRESS, 0)
+
+
+def loads(wgups):
+    return [[package.package_id for package in truck.packages] for truck in wgups.trucks]
+
+
+def test_snapshot_requires_a_simulated_day(package_file, distance_file):
+    wgups = main.WGUPS()
+    with contextlib.redirect_stdout(io.StringIO()):
+        wgups.load_packages(package_file)
+    wgups.load_distance_table(distance_file)
+    with pytest.raises(RuntimeError):
+        wgups.snapshot(main.DAY_START)
+    assert not any(truck.packages for truck in wgups.trucks)
+
+
+def test_status_queries_do_not_reroute(simulated):
+    pytest.importorskip('numpy')
+    before = loads(simulated)
+    timeline = simulated.timeline
+
+    noon = datetime.strptime("12:00 PM", "%I:%M %p")
+    codes = simulated.snapshot(noon)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for truck in simulated.trucks:
+            simulated.update_package_statuses(truck, noon)
+        simulated.simulate_delivery(main.DAY_START, noon)
+    assert loads(simulated) == before
+    assert simulated.timeline is timeline
+    assert (simulated.snapshot(noon) == codes).all()
+
+    end_of_day = simulated.snapshot(main.END_OF_DAY)
+    rows = simulated.status_arrays.rows
+    for truck in simulated.trucks:
+        for package in truck.packages:
+            assert end_of_day[rows[package.package_id]] == main.DELIVERED
+    assert simulated.snapshot(main.DAY_START)[rows['6']] == main.DELAYED
+
+
+def test_rerouting_does_not_duplicate_packages(simulated):
+    before = loads(simulated)
+    simulated.optimize_delivery_routes()
+    assert loads(simulated) == before
+    assert simulated.timeline is None
+    simulated.simulate_day()
+    assert loads(simulated) == before
+    assert sum(map(len, before)) == len({package_id for load in before for package_id in load})
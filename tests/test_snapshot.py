@@ -0,0 +1,127 @@
+import struct
+
+import pytest
+
+from deliveries_v2 import (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, WGUPS, PackageState, map_sections, parse_deadline,
+                           write_sections)
+
+pytest.importorskip('numpy')
+
+PACKAGE_FIELDS = ('package_id', 'address', 'city', 'state', 'zip_code', 'deadline', 'weight', 'notes',
+                  'required_truck', 'package_accompaniment')
+
+
+def package_fields(wgups):
+    # Delay times are stored in minutes, so '9:05 am' comes back as '9:05 AM'
+    return {package.package_id: tuple(getattr(package, field) for field in PACKAGE_FIELDS) +
+            (package.no_load_before and parse_deadline(package.no_load_before),)
+            for package in wgups.hash_table}
+
+
+def test_snapshot_round_trip(prepared, tmp_path):
+    wgups = prepared()
+    path = str(tmp_path / 'state.snapshot')
+    wgups.save_snapshot(path)
+
+    restored = WGUPS()
+    restored.load_snapshot(path)
+    assert package_fields(restored) == package_fields(wgups)
+    assert restored.distance_digest == wgups.distance_digest
+    assert restored.distance_matrix.addresses == wgups.distance_matrix.addresses
+    assert list(restored.distance_matrix.distances) == list(wgups.distance_matrix.distances)
+    assert list(restored.shortest_paths.distances) == list(wgups.shortest_paths.distances)
+    assert list(restored.shortest_path_predecessors) == list(wgups.shortest_path_predecessors)
+    for package_id in wgups.hash_table.keys():
+        assert restored.group_id(package_id) == restored.group_id(wgups.group_id(package_id))
+        assert restored.package_states.state(package_id) == PackageState.UNASSIGNED
+    # The neighbor graph is only built once routing needs it
+    assert restored.neighbor_graph is None
+    restored.load_trucks()
+    assert restored.neighbor_graph.tolist() == wgups.neighbor_graph.tolist()
+
+
+def test_snapshot_without_materializing(prepared, tmp_path):
+    wgups = prepared()
+    path = str(tmp_path / 'state.snapshot')
+    wgups.save_snapshot(path)
+
+    restored = WGUPS()
+    restored.load_snapshot(path, materialize=False)
+    assert len(restored.hash_table) == 0
+    assert sorted(restored.package_store.select(required_truck=2).tolist()) == [3, 18, 36, 38]
+    restored.materialize_packages()
+    assert package_fields(restored) == package_fields(wgups)
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_snapshot_keeps_states_and_loads(prepared, tmp_path, columnar):
+    wgups = prepared(columnar=columnar)
+    wgups.load_trucks(time_windows=True)
+    wgups.set_package_state('15', PackageState.DELIVERED)
+    path = str(tmp_path / 'state.snapshot')
+    wgups.save_snapshot(path)
+
+    restored = WGUPS()
+    restored.load_snapshot(path)
+    for package_id in wgups.hash_table.keys():
+        assert restored.package_states.state(package_id) == wgups.package_states.state(package_id)
+    assert restored.package_states.state('15') == PackageState.DELIVERED
+    assert [truck.packages for truck in restored.trucks] == [truck.packages for truck in wgups.trucks]
+    assert [truck.legs for truck in restored.trucks] == [truck.legs for truck in wgups.trucks]
+    assert package_fields(restored)['9'] == package_fields(wgups)['9']  # Corrected address is kept
+
+    # Nothing is left to place, so loading again keeps the restored routes
+    assert restored.load_trucks(time_windows=True) == []
+    assert [truck.packages for truck in restored.trucks] == [truck.packages for truck in wgups.trucks]
+
+
+def write_header(path, version=SNAPSHOT_VERSION, count=0, table=b''):
+    path.write_bytes(SNAPSHOT_MAGIC + struct.pack('<II', version, count) + table)
+
+
+def test_map_sections_round_trip(tmp_path):
+    path = str(tmp_path / 'sections.bin')
+    write_sections(path, {'first': b'abc', 'second': bytes(100), 'empty': b''})
+    mapping, sections = map_sections(path)
+    assert {name: bytes(view) for name, view in sections.items()} == \
+           {'first': b'abc', 'second': bytes(100), 'empty': b''}
+    sections.clear()
+
+
+def test_map_sections_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'')
+    with pytest.raises(ValueError, match='not a WGUPS snapshot'):
+        map_sections(str(path))
+    path.write_bytes(b'NOTASNAPSHOT' + bytes(100))
+    with pytest.raises(ValueError, match='not a WGUPS snapshot'):
+        map_sections(str(path))
+    write_header(path, version=SNAPSHOT_VERSION + 1)
+    with pytest.raises(ValueError, match='version'):
+        map_sections(str(path))
+
+
+def test_map_sections_rejects_truncated_files(tmp_path):
+    path = tmp_path / 'truncated.bin'
+    write_header(path, count=3)
+    with pytest.raises(ValueError, match='section table'):
+        map_sections(str(path))
+
+    table_end = len(SNAPSHOT_MAGIC) + 8 + 32
+    write_header(path, count=1, table=struct.pack('<16sQQ', b'columns', table_end, 1000))
+    with pytest.raises(ValueError, match='section columns'):
+        map_sections(str(path))
+
+    snapshot = tmp_path / 'state.snapshot'
+    write_sections(str(snapshot), {'columns': bytes(1000)})
+    data = snapshot.read_bytes()
+    snapshot.write_bytes(data[:-1])
+    with pytest.raises(ValueError, match='section columns'):
+        map_sections(str(snapshot))
+
+
+def test_load_snapshot_rejects_missing_sections(tmp_path):
+    path = str(tmp_path / 'partial.snapshot')
+    write_sections(path, {'digest': b'', 'addresses': b'HUB'})
+    with pytest.raises(ValueError, match='missing snapshot sections'):
+        WGUPS().load_snapshot(path)